@@ -0,0 +1,109 @@
+"""
+Agent Worker Pool Module
+Runs agent calls off the event loop or as native coroutines, with bounded concurrency
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the pool's wait queue is full"""
+
+
+class AgentWorkerPool:
+    """Bounded execution of agent calls with queue-depth accounting
+
+    Synchronous calls (``run``) go to a thread pool of ``max_workers``; coroutines
+    (``arun``) stay on the event loop, limited to ``max_async`` in flight.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queue: int = 64, max_async: int = 256):
+        self.max_workers = max_workers
+        self.max_queue = max_queue  # 0 means unbounded
+        self.max_async = max_async
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self._async_slots = asyncio.Semaphore(max_async)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but still waiting for a worker"""
+        return self.in_flight - self.running
+
+    def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _admit(self):
+        with self._lock:
+            if self.max_queue and self.queue_depth >= self.max_queue:
+                self.rejected += 1
+                raise PoolSaturatedError(f"{self.queue_depth} queries already waiting for a worker")
+            self.in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on a worker thread without blocking the event loop"""
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, func, *args)
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of ``max_async`` slots for the duration of the block, e.g. a streamed response
+
+        Admission (and ``PoolSaturatedError``) happens on entry, before any waiting.
+        """
+        self._admit()
+        try:
+            async with self._async_slots:
+                with self._lock:
+                    self.running += 1
+                try:
+                    yield
+                finally:
+                    with self._lock:
+                        self.running -= 1
+        finally:
+            self._release()
+
+    async def arun(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Await ``func(*args)`` on the event loop, holding one of ``max_async`` slots"""
+        async with self.slot():
+            return await func(*args)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool occupancy and counters"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "max_async": self.max_async,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        """Stop accepting work and wait for running calls"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,106 @@
+"""
+Agent Registry Module
+Builds each agent type once and shares LLM clients between agents with identical settings
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+from tavily import TavilyClient
+
+from rag_components import (
+    AdvancedRetrievalAgent,
+    ConservativeRAGAgent,
+    FastRAGAgent,
+    RAGConfig,
+    SERAGAgent,
+)
+from sparse_index import BM25Index
+
+AGENT_TYPES = ("standard", "advanced", "conservative", "fast", "auto")
+
+
+def _openai_llm(model_name: str, temperature: float, max_tokens: int) -> BaseChatModel:
+    return ChatOpenAI(model_name=model_name, temperature=temperature, max_tokens=max_tokens)
+
+
+class AgentRegistry:
+    """Lazily constructed, process-wide agents drawn on by /query and /evaluation/run
+
+    ``llm_factory(model_name, temperature, max_tokens)`` creates chat clients; one client
+    is shared by every agent whose configuration asks for the same settings.
+    """
+
+    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None, config: RAGConfig = None,
+                 sparse_index: BM25Index = None,
+                 llm_factory: Callable[[str, float, int], BaseChatModel] = _openai_llm):
+        self.vectorstore = vectorstore
+        self.tavily_client = tavily_client
+        self.config = config or RAGConfig()
+        self.sparse_index = sparse_index
+        self.llm_factory = llm_factory
+        self._llms: Dict[Tuple[str, float, int], BaseChatModel] = {}
+        self._agents: Dict[str, SERAGAgent] = {}
+        self._build_times: Dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def llm_for(self, config: RAGConfig) -> BaseChatModel:
+        """Shared chat client for ``config``'s model, temperature and token limit"""
+        key = (config.model_name, config.temperature, config.max_tokens)
+        with self._lock:
+            if key not in self._llms:
+                self._llms[key] = self.llm_factory(*key)
+            return self._llms[key]
+
+    def _build(self, agent_type: str) -> SERAGAgent:
+        if agent_type == "standard":
+            return SERAGAgent(self.vectorstore, self.tavily_client, self.config,
+                              llm=self.llm_for(self.config), sparse_index=self.sparse_index)
+        if agent_type == "advanced":
+            return AdvancedRetrievalAgent(self.vectorstore, self.tavily_client, self.config,
+                                          llm=self.llm_for(self.config), sparse_index=self.sparse_index)
+        if agent_type in ("fast", "auto"):
+            # "auto" takes the ReAct loop only when retrieval confidence is low
+            return FastRAGAgent(self.vectorstore, self.tavily_client, self.config, llm=self.llm_for(self.config),
+                                sparse_index=self.sparse_index, route_to_react=agent_type == "auto")
+        conservative_config = ConservativeRAGAgent.default_config(
+            model_name=self.config.model_name,
+            retrieval_strategy=self.config.retrieval_strategy,
+            rrf_k=self.config.rrf_k
+        )
+        return ConservativeRAGAgent(self.vectorstore, self.tavily_client, self.llm_for(conservative_config),
+                                    self.sparse_index, config=conservative_config)
+
+    def get(self, agent_type: str) -> SERAGAgent:
+        """Return the agent for ``agent_type``, building it on first use"""
+        if agent_type not in AGENT_TYPES:
+            raise ValueError(f"Unknown agent type: {agent_type}")
+        agent = self._agents.get(agent_type)
+        if agent is not None:
+            return agent
+        with self._lock:
+            if agent_type not in self._agents:
+                start_time = time.time()
+                self._agents[agent_type] = self._build(agent_type)
+                self._build_times[agent_type] = time.time() - start_time
+            return self._agents[agent_type]
+
+    def build_all(self) -> Dict[str, SERAGAgent]:
+        """Construct every agent type up front"""
+        return {agent_type: self.get(agent_type) for agent_type in AGENT_TYPES}
+
+    def built(self, agent_type: str) -> Optional[SERAGAgent]:
+        """Return the agent if it has already been built, without building it"""
+        return self._agents.get(agent_type)
+
+    def stats(self) -> Dict[str, Any]:
+        """Built agents, their construction times and the number of shared LLM clients"""
+        return {
+            "agents": sorted(self._agents),
+            "build_times": dict(self._build_times),
+            "llm_clients": len(self._llms),
+        }
@@ -0,0 +1,207 @@
+"""
+Semantic Answer Cache Module
+Serves previous agent responses for questions whose embeddings are near-identical
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+@dataclass
+class _CacheEntry:
+    question: str
+    response: Dict[str, Any]
+    created: float
+
+
+class _Namespace:
+    """One namespace's entries, with their unit vectors as rows of a preallocated matrix
+
+    ``entries`` maps matrix row -> entry in least- to most-recently-used order; rows freed by
+    expiry or eviction are reused, so a lookup is one product over the rows in use.
+    """
+
+    def __init__(self, capacity: int, dimension: int):
+        self.capacity = capacity
+        self.vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        self.created = np.zeros(capacity)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self.free: List[int] = []
+        self.size = 0  # rows ever used; rows past it are still zero
+
+    def add(self, vector: np.ndarray, entry: _CacheEntry):
+        """Store ``entry`` in a free row, evicting the least recently used entry when full"""
+        if len(self.entries) >= self.capacity:
+            row, _ = self.entries.popitem(last=False)
+        elif self.free:
+            row = self.free.pop()
+        else:
+            row = self.size
+            self.size += 1
+        self.vectors[row] = vector
+        self.created[row] = entry.created
+        self.live[row] = True
+        self.entries[row] = entry
+
+    def expire(self, cutoff: float):
+        """Free every row created before ``cutoff``"""
+        for row in np.flatnonzero(self.live[:self.size] & (self.created[:self.size] < cutoff)).tolist():
+            self.live[row] = False
+            del self.entries[row]
+            self.free.append(row)
+
+    def best(self, vector: np.ndarray) -> Tuple[int, float]:
+        """Row most similar to the unit ``vector`` and its cosine similarity"""
+        similarities = self.vectors[:self.size] @ vector
+        similarities[~self.live[:self.size]] = -np.inf
+        row = int(np.argmax(similarities))
+        return row, float(similarities[row])
+
+
+class SemanticAnswerCache:
+    """Per-namespace (agent type) response cache keyed on query embedding similarity
+
+    Entries expire after ``ttl`` seconds, each namespace keeps at most ``max_entries``
+    (least recently used evicted first), and everything is dropped when ``version_fn``
+    reports that the underlying index changed.
+    """
+
+    def __init__(self, embeddings: Embeddings, similarity_threshold: float = 0.95, ttl: float = 3600,
+                 max_entries: int = 1000, version_fn: Optional[Callable[[], Any]] = None):
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version_fn = version_fn
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._version = version_fn() if version_fn else None
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else array
+
+    def invalidate(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._namespaces.clear()
+            self.invalidations += 1
+
+    def _check_version(self) -> Any:
+        """Return the current index version, dropping every entry if it changed since the last check"""
+        if self.version_fn is None:
+            return None
+        version = self.version_fn()
+        if version != self._version:
+            self._version = version
+            self.invalidate()
+        return version
+
+    def _lookup(self, namespace: str, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            if space is not None:
+                space.expire(now - self.ttl)
+            if space is None or not space.entries:
+                self.misses += 1
+                return None
+            row, similarity = space.best(vector)
+            if similarity < self.similarity_threshold:
+                self.misses += 1
+                return None
+            entry = space.entries[row]
+            space.entries.move_to_end(row)
+            self.hits += 1
+            self.saved_seconds += entry.response.get("response_time", 0.0)
+            return {
+                **entry.response,
+                "cached": True,
+                "cache_similarity": similarity,
+                "cached_question": entry.question,
+            }
+
+    def lookup(self, namespace: str, question: str) -> Tuple[Optional[Dict[str, Any]], np.ndarray, Any]:
+        """Return (cached response or None, query vector and index version to pass to ``store`` on a miss)"""
+        start_time = time.time()
+        vector = self._normalize(self.embeddings.embed_query(question))
+        version = self._check_version()
+        cached = self._lookup(namespace, vector)
+        if cached is not None:
+            cached["response_time"] = time.time() - start_time
+        return cached, vector, version
+
+    async def alookup(self, namespace: str, question: str) -> Tuple[Optional[Dict[str, Any]], np.ndarray, Any]:
+        """Async variant of ``lookup``"""
+        start_time = time.time()
+        vector = self._normalize(await self.embeddings.aembed_query(question))
+        version = self._check_version()
+        cached = self._lookup(namespace, vector)
+        if cached is not None:
+            cached["response_time"] = time.time() - start_time
+        return cached, vector, version
+
+    def store(self, namespace: str, question: str, vector: np.ndarray, response: Dict[str, Any],
+              version: Any = None):
+        """Cache a freshly computed response; error responses are never cached
+
+        ``version`` is the index version ``lookup`` returned: an answer computed while the
+        index changed is dropped instead of outliving the refresh until its TTL.
+        """
+        if response.get("error") or self.max_entries <= 0:
+            return
+        if self.version_fn is not None and self.version_fn() != version:
+            return
+        with self._lock:
+            space = self._namespaces.get(namespace)
+            if space is None:
+                space = self._namespaces[namespace] = _Namespace(self.max_entries, len(vector))
+            # Timings describe the original computation, not a cache hit
+            stored = {key: value for key, value in response.items() if key != "timings"}
+            space.add(vector, _CacheEntry(question, stored, time.time()))
+
+    def get_or_compute(self, namespace: str, question: str,
+                       compute: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a cached response for a similar question, or compute and cache one"""
+        cached, vector, version = self.lookup(namespace, question)
+        if cached is not None:
+            return cached
+        response = compute(question)
+        self.store(namespace, question, vector, response, version)
+        return response
+
+    async def aget_or_compute(self, namespace: str, question: str,
+                              compute: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Async variant of ``get_or_compute``"""
+        cached, vector, version = await self.alookup(namespace, question)
+        if cached is not None:
+            return cached
+        response = await compute(question)
+        self.store(namespace, question, vector, response, version)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, saved agent latency and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "entries": sum(len(namespace.entries) for namespace in self._namespaces.values()),
+            "invalidations": self.invalidations,
+            "similarity_threshold": self.similarity_threshold,
+        }
@@ -5,13 +5,18 @@ Provides REST API endpoints for the RAG system
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from contextlib import AsyncExitStack, aclosing
 import os
+import asyncio
 import sys
+import json
+import time
 import logging
-from pathlib import Path
-from datetime import datetime
+
+import structlog
 
 # Configure logging
 logging.basicConfig(
@@ -23,20 +28,30 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
+# Structured events (e.g. per-request stage timings) go through the same handlers as JSON lines
+structlog.configure(
+    processors=[structlog.processors.JSONRenderer()],
+    logger_factory=structlog.stdlib.LoggerFactory()
+)
 
 # Import our RAG components from the module
 try:
     from rag_components import (
-        SERAGAgent,
-        AdvancedRetrievalAgent,
-        ConservativeRAGAgent,
-        RAGConfig,
         DocumentProcessor,
         VectorStoreManager,
+        IncrementalIndexer,
         RAGEvaluator,
-        GoldenTestCase
+        save_evaluation_results
     )
     from tavily import TavilyClient
+    from agent_pool import AgentWorkerPool, PoolSaturatedError
+    from agent_registry import AGENT_TYPES, AgentRegistry
+    from answer_cache import SemanticAnswerCache
+    from batch_query import run_batch
+    from jobs import JobManager
+    from tracing import stage_histograms
+    from metrics import Exposition, MetricsMiddleware, RequestMetrics, single
+    from vector_index import index_type_of
     logger.info("RAG components imported successfully")
 except ImportError as e:
     logger.error(f"Import error: {e}")
@@ -58,46 +73,99 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request rate, in-flight count and latency per route
+request_metrics = RequestMetrics()
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
 # Global variables for RAG components
 vectorstore = None
-standard_agent = None
-advanced_agent = None
-conservative_agent = None
+sparse_index = None
+agent_registry = None
+rag_evaluator = None
 config = None
+indexer = None
+vector_manager = None
+agent_pool = None
+async_agents = True
+answer_cache = None
+job_manager = JobManager()
+evaluation_jobs = None
+index_sync_task = None
 
 async def initialize_rag_components():
     """Initialize RAG components on startup"""
-    global vectorstore, standard_agent, advanced_agent, conservative_agent, config
+    global vectorstore, agent_registry, config, indexer, vector_manager
+    global agent_pool, async_agents, answer_cache, sparse_index, evaluation_jobs
     
     try:
         logger.info("Initializing RAG components...")
         
+        # Check for API keys
+        if not os.environ.get("OPENAI_API_KEY"):
+            raise ValueError("OPENAI_API_KEY environment variable not set")
+        if not os.environ.get("TAVILY_API_KEY"):
+            raise ValueError("TAVILY_API_KEY environment variable not set")
+        
         # Set up configuration
-        config = RAGConfig()
+        from config import get_data_path, get_rag_config, settings
+        config = get_rag_config()
         logger.info(f"Configuration loaded: {config}")
         
-        # Process documents
-        from config import get_data_path
         data_path = get_data_path()
-        if not data_path.exists():
-            raise FileNotFoundError(f"Data directory not found: {data_path}")
+        vector_manager = VectorStoreManager(config)
+        if settings.index_build_on_startup:
+            # Process documents
+            if not data_path.exists():
+                raise FileNotFoundError(f"Data directory not found: {data_path}")
+                
+            processor = DocumentProcessor(str(data_path), config)
+            documents = processor.load_documents()
+            logger.info(f"Loaded {len(documents)} documents")
             
-        processor = DocumentProcessor(str(data_path), config)
-        documents = processor.load_documents()
-        logger.info(f"Loaded {len(documents)} documents")
+            if not documents:
+                raise ValueError("No documents loaded from data directory")
+            
+            # Load the dense and BM25 index snapshot for this corpus, embedding only on a miss
+            vectorstore, sparse_index = vector_manager.load_or_create_indexes(documents, processor)
+            # Publish it too, so workers following the published key serve this corpus
+            snapshot_key = vector_manager.snapshot_key(documents)
+            if vector_manager.published_key() != snapshot_key:
+                vector_manager.publish(snapshot_key)
+        else:
+            # Serve the artifact published by `solviq-index build`; nothing is embedded here
+            indexes = vector_manager.load_published_indexes()
+            if indexes is None:
+                raise FileNotFoundError(f"No published index in {config.index_dir}; run `solviq-index build`")
+            vectorstore, sparse_index = indexes
+            snapshot_key = vector_manager.published_key()
+            processor = DocumentProcessor(str(data_path), config)
+        # Follows snapshots other workers publish; refreshes need the data directory
+        indexer = IncrementalIndexer(vectorstore, processor, vector_manager, sparse_index, snapshot_key)
+        logger.info(f"Vector store ready (retrieval strategy: {config.retrieval_strategy})")
+        
+        # Tavily client
+        tavily_client = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
         
-        if not documents:
-            raise ValueError("No documents loaded from data directory")
+        # Initialize agents once; /query and /evaluation/run share them and their LLM clients
+        agent_registry = AgentRegistry(vectorstore, tavily_client, config, sparse_index)
+        agent_registry.build_all()
         
-        # Create vector store
-        vector_manager = VectorStoreManager()
-        vectorstore = vector_manager.create_vectorstore(documents)
-        logger.info("Vector store created successfully")
+        # Run agents as native coroutines (or on worker threads) so the event loop stays free
+        agent_pool = AgentWorkerPool(settings.agent_workers, settings.agent_max_queue, settings.agent_max_async)
+        async_agents = settings.async_agents
         
-        # Initialize agents
-        standard_agent = SERAGAgent(vectorstore, config)
-        advanced_agent = AdvancedRetrievalAgent(vectorstore, config)
-        conservative_agent = ConservativeRAGAgent(vectorstore, config)
+        # Evaluations run as background jobs, a few at a time
+        evaluation_jobs = JobManager(max_running=settings.evaluation_workers)
+        
+        # Semantic answer cache, flushed whenever the incremental indexer changes or swaps the index
+        if settings.answer_cache_enabled:
+            answer_cache = SemanticAnswerCache(
+                vector_manager.embeddings,
+                similarity_threshold=settings.answer_cache_threshold,
+                ttl=settings.answer_cache_ttl,
+                max_entries=settings.answer_cache_size,
+                version_fn=lambda: indexer.version if indexer is not None else 0
+            )
         
         logger.info("All RAG agents initialized successfully")
         logger.info("SolvIQ is ready as the intelligence layer for Solution Engineers!")
@@ -107,14 +175,59 @@ async def initialize_rag_components():
         logger.exception("Full traceback:")
         raise HTTPException(status_code=500, detail=f"Failed to initialize RAG components: {str(e)}")
 
+async def follow_published_index(interval: float):
+    """Swap in snapshots published by other workers or `solviq-index update` every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await asyncio.to_thread(indexer.sync_published):
+                logger.info(f"Switched to published index {indexer.key}")
+        except Exception as e:
+            logger.warning(f"Published index check failed: {e}")
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup"""
+    global index_sync_task
     await initialize_rag_components()
+    from config import settings
+    if settings.index_sync_interval > 0:
+        index_sync_task = asyncio.create_task(follow_published_index(settings.index_sync_interval))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain the agent pool and persist pending embedding cache entries"""
+    if index_sync_task is not None:
+        index_sync_task.cancel()
+    job_manager.shutdown()
+    if evaluation_jobs is not None:
+        evaluation_jobs.shutdown()
+    if agent_pool is not None:
+        agent_pool.shutdown()
+    if vector_manager is not None and hasattr(vector_manager.embeddings, "flush"):
+        vector_manager.embeddings.flush()
+
+class SlotStreamingResponse(StreamingResponse):
+    """Streaming response that runs ``release`` however it ends
+    
+    Covers disconnects and send failures before the body is iterated, which would otherwise
+    leave the generator unstarted and its agent pool slot held.
+    """
+    
+    def __init__(self, content, release: Callable[[], Awaitable[Any]], **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.release()
 
 class QueryRequest(BaseModel):
     question: str
-    agent_type: str = "advanced"  # "standard", "advanced", "conservative"
+    agent_type: str = "advanced"  # "standard", "advanced", "conservative", "fast", "auto"
+    include_timings: bool = False  # Return per-stage timing spans
 
 class QueryResponse(BaseModel):
     answer: str
@@ -122,49 +235,13 @@ class QueryResponse(BaseModel):
     response_time: float
     agent_type: str
     model: str
+    cached: bool = False
+    timings: Optional[List[Dict[str, Any]]] = None
+    route: Optional[str] = None  # fast, web or react, for the fast and auto agents
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize RAG components on startup"""
-    global vectorstore, standard_agent, advanced_agent, conservative_agent
-    
-    try:
-        print("🚀 Initializing SE RAG Agent API...")
-        
-        # Check for API keys
-        if not os.environ.get("OPENAI_API_KEY"):
-            raise ValueError("OPENAI_API_KEY environment variable not set")
-        if not os.environ.get("TAVILY_API_KEY"):
-            raise ValueError("TAVILY_API_KEY environment variable not set")
-        
-        # Configuration
-        config = RAGConfig()
-        from config import get_data_path
-        data_path = str(get_data_path())
-        
-        # Document processing
-        processor = DocumentProcessor(data_path, config)
-        documents = processor.load_documents()
-        chunks = processor.chunk_documents(documents)
-        
-        # Vector store creation
-        vector_manager = VectorStoreManager(config)
-        vectorstore = vector_manager.create_advanced_vectorstore(chunks)
-        
-        # Tavily client
-        tavily_client = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
-        
-        # Initialize agents
-        standard_agent = SERAGAgent(vectorstore, tavily_client, config)
-        advanced_agent = AdvancedRetrievalAgent(vectorstore, tavily_client, config)
-        conservative_agent = ConservativeRAGAgent(vectorstore, tavily_client)
-        
-        print("✅ SolvIQ API initialized successfully!")
-        print("⚡ SolvIQ is ready as the intelligence layer for Solution Engineers!")
-        
-    except Exception as e:
-        print(f"❌ Failed to initialize RAG components: {e}")
-        raise e
+class BatchQueryRequest(BaseModel):
+    questions: List[str]
+    agent_type: str = "advanced"  # "standard", "advanced", "conservative", "fast", "auto"
 
 @app.get("/")
 async def root():
@@ -176,8 +253,12 @@ async def root():
         "status": "running",
         "endpoints": {
             "query": "/query",
+            "query_stream": "/query/stream",
+            "query_batch": "/query/batch",
+            "query_batch_jobs": "/query/batch/jobs",
             "health": "/health",
             "agents": "/agents",
+            "index_refresh": "/index/refresh",
             "docs": "/docs"
         }
     }
@@ -185,47 +266,303 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    embeddings = getattr(vector_manager, "embeddings", None)
     return {
         "status": "healthy",
         "components": {
             "vectorstore": vectorstore is not None,
-            "standard_agent": standard_agent is not None,
-            "advanced_agent": advanced_agent is not None,
-            "conservative_agent": conservative_agent is not None
-        }
+            "sparse_index": sparse_index is not None,
+            **{
+                f"{agent_type}_agent": agent_registry is not None and agent_registry.built(agent_type) is not None
+                for agent_type in AGENT_TYPES
+            }
+        },
+        "agent_registry": agent_registry.stats() if agent_registry is not None else None,
+        "retrieval_strategy": config.retrieval_strategy if config is not None else None,
+        "index_type": index_type_of(vectorstore.index) if vectorstore is not None else None,
+        "sparse_index": sparse_index.stats() if sparse_index is not None else None,
+        "embedding_cache": embeddings.stats() if hasattr(embeddings, "stats") else None,
+        "agent_pool": agent_pool.stats() if agent_pool is not None else None,
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "stage_latency": stage_histograms.summary(),
+        "jobs": job_manager.stats(),
+        "evaluation_jobs": evaluation_jobs.stats() if evaluation_jobs is not None else None
     }
 
+def render_metrics() -> str:
+    """Prometheus text exposition of request, agent, stage, cache, pool, job and index metrics"""
+    out = Exposition()
+    out.counter("http_requests_total", "HTTP requests by method, route template and status", (
+        ({"method": m, "route": r, "status": s}, n) for (m, r, s), n in sorted(request_metrics.requests.items())
+    ))
+    out.gauge("http_requests_in_flight", "HTTP requests currently being served", single(request_metrics.in_flight))
+    out.histogram("http_request_duration_seconds", "HTTP request latency including streamed bodies",
+                  (({"method": m, "route": r}, h) for (m, r), h in sorted(request_metrics.request_latency.items())))
+    out.counter("answers_total", "Answered questions by agent type and outcome (computed, cached, error)",
+                (({"agent_type": a, "outcome": o}, n) for (a, o), n in sorted(request_metrics.answers.items())))
+    out.histogram("answer_duration_seconds", "Time to answer one question, per agent type",
+                  (({"agent_type": a}, h) for a, h in sorted(request_metrics.answer_latency.items())))
+    routed = {a: agent_registry.built(a) for a in ("fast", "auto")} if agent_registry is not None else {}
+    out.counter("agent_routes_total", "Questions per route (fast, web, react) taken by the fast and auto agents", (
+        ({"agent_type": a, "route": r}, n) for a, agent in routed.items() if agent is not None
+        for r, n in agent.routes.items()
+    ))
+    
+    # LLM, embedding, search and Tavily calls are the per-stage spans recorded by the agents
+    stages = stage_histograms.histograms()
+    out.counter("stage_calls_total", "Timed agent stage calls (llm, embed, faiss_search, tavily, tool:<name>, ...)",
+                (({"stage": name}, h.count) for name, h in sorted(stages.items())))
+    out.counter("stage_errors_total", "Agent stage calls that raised",
+                (({"stage": name}, n) for name, n in sorted(stage_histograms.errors.items())))
+    out.histogram("stage_duration_seconds", "Agent stage latency",
+                  (({"stage": name}, h) for name, h in sorted(stages.items())))
+    out.counter("llm_tokens_total", "LLM tokens reported by the provider",
+                (({"kind": kind}, n) for kind, n in sorted(stage_histograms.tokens.items())))
+    
+    caches = {"answer": answer_cache, "embedding": getattr(vector_manager, "embeddings", None)}
+    cache_stats = {name: cache.stats() for name, cache in caches.items() if hasattr(cache, "stats")}
+    out.counter("cache_hits_total", "Cache hits", (({"cache": name}, s["hits"]) for name, s in cache_stats.items()))
+    out.counter("cache_misses_total", "Cache misses",
+                (({"cache": name}, s["misses"]) for name, s in cache_stats.items()))
+    out.gauge("cache_hit_ratio", "Hits over lookups since startup",
+              (({"cache": name}, s["hit_rate"]) for name, s in cache_stats.items()))
+    out.gauge("cache_entries", "Entries held", (({"cache": name}, s["entries"]) for name, s in cache_stats.items()))
+    
+    pool = agent_pool.stats() if agent_pool is not None else None
+    out.gauge("agent_pool_running", "Agent calls executing", single(pool and pool["running"]))
+    out.gauge("agent_pool_queue_depth", "Agent calls waiting for a worker", single(pool and pool["queue_depth"]))
+    out.counter("agent_pool_completed_total", "Agent calls finished", single(pool and pool["completed"]))
+    out.counter("agent_pool_rejected_total", "Agent calls rejected with 503", single(pool and pool["rejected"]))
+    out.gauge("jobs", "Background jobs by kind and status", [
+        ({"kind": kind, "status": status}, n)
+        for kind, manager in (("batch", job_manager), ("evaluation", evaluation_jobs)) if manager is not None
+        for status, n in manager.stats().items()
+    ])
+    
+    out.gauge("index_vectors", "Vectors in the FAISS index",
+              single(vectorstore.index.ntotal if vectorstore is not None else None))
+    sparse = sparse_index.stats() if sparse_index is not None else {}
+    out.gauge("sparse_index_size", "BM25 index size", (({"unit": unit}, n) for unit, n in sparse.items()))
+    return out.text()
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus-style metrics in text exposition format"""
+    return PlainTextResponse(render_metrics(), media_type=Exposition.CONTENT_TYPE)
+
+def select_agent(agent_type: str):
+    """Look up the initialized agent for ``agent_type``"""
+    if agent_type not in AGENT_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid agent_type. Use 'standard', 'advanced', 'conservative', 'fast', or 'auto'")
+    
+    if agent_registry is None or agent_pool is None:
+        raise HTTPException(status_code=500, detail="Agent not initialized")
+    return agent_registry.get(agent_type)
+
+async def answer_question(agent, agent_type: str, question: str) -> Dict[str, Any]:
+    """Answer through the agent pool (and answer cache) without blocking the event loop"""
+    start_time = time.perf_counter()
+    if async_agents and answer_cache is not None:
+        response = await agent_pool.arun(answer_cache.aget_or_compute, agent_type, question, agent.arespond_to_rfp)
+    elif async_agents:
+        response = await agent_pool.arun(agent.arespond_to_rfp, question)
+    elif answer_cache is not None:
+        response = await agent_pool.run(answer_cache.get_or_compute, agent_type, question, agent.respond_to_rfp)
+    else:
+        response = await agent_pool.run(agent.respond_to_rfp, question)
+    request_metrics.answer_finished(agent_type, time.perf_counter() - start_time,
+                                    error=bool(response.get("error")), cached=response.get("cached", False))
+    return response
+
+async def when_pool_has_capacity(func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """Await ``func(*args)``, retrying with backoff while the agent pool is saturated
+    
+    Batch and evaluation jobs wait for capacity instead of failing on a busy server.
+    """
+    delay = 0.1
+    while True:
+        try:
+            return await func(*args)
+        except PoolSaturatedError:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
 @app.post("/query", response_model=QueryResponse)
 async def query_rag(request: QueryRequest):
     """Query the RAG system"""
     try:
         # Select agent based on type
-        if request.agent_type == "standard":
-            agent = standard_agent
-        elif request.agent_type == "advanced":
-            agent = advanced_agent
-        elif request.agent_type == "conservative":
-            agent = conservative_agent
-        else:
-            raise HTTPException(status_code=400, detail="Invalid agent_type. Use 'standard', 'advanced', or 'conservative'")
-        
-        if not agent:
-            raise HTTPException(status_code=500, detail="Agent not initialized")
+        agent = select_agent(request.agent_type)
         
-        # Get response
-        response = agent.respond_to_rfp(request.question)
+        # Get response without blocking other requests on the event loop
+        try:
+            response = await answer_question(agent, request.agent_type, request.question)
+        except PoolSaturatedError as e:
+            raise HTTPException(status_code=503, detail=f"Server busy: {e}")
         
         return QueryResponse(
             answer=response["answer"],
             sources=response["sources"],
             response_time=response["response_time"],
             agent_type=request.agent_type,
-            model=response["model"]
+            model=response["model"],
+            cached=response.get("cached", False),
+            timings=response.get("timings", []) if request.include_timings else None,
+            route=response.get("route")
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
+@app.post("/query/stream")
+async def query_rag_stream(request: QueryRequest):
+    """Stream tool steps, retrieved sources and answer tokens as server-sent events
+    
+    Events: ``tool``, ``retrieval``, ``token``, then ``done`` (full response plus
+    ``time_to_first_token``) or ``error``.
+    """
+    agent = select_agent(request.agent_type)
+    
+    # Take the concurrency slot before the response starts so saturation is still a 503
+    stack = AsyncExitStack()
+    try:
+        await stack.enter_async_context(agent_pool.slot())
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=f"Server busy: {e}")
+    
+    async def events():
+        if answer_cache is None:
+            async for event in agent.astream_rfp(request.question):
+                yield event
+            return
+        cached, vector, version = await answer_cache.alookup(request.agent_type, request.question)
+        if cached is not None:
+            yield {"event": "token", "text": cached["answer"]}
+            yield {**cached, "event": "done", "time_to_first_token": cached["response_time"]}
+            return
+        async for event in agent.astream_rfp(request.question):
+            if event["event"] == "done":
+                answer_cache.store(request.agent_type, request.question, vector,
+                                   {k: v for k, v in event.items() if k not in ("event", "time_to_first_token")},
+                                   version)
+            yield event
+    
+    async def event_stream():
+        start_time = time.perf_counter()
+        async for event in events():
+            if event["event"] in ("done", "error"):
+                request_metrics.answer_finished(request.agent_type, time.perf_counter() - start_time,
+                                                error=event["event"] == "error",
+                                                cached=event.get("cached", False))
+            if event["event"] == "done":
+                event["agent_type"] = request.agent_type
+            yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    
+    return SlotStreamingResponse(
+        event_stream(),
+        release=stack.aclose,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def start_batch(request: BatchQueryRequest):
+    """Validate a batch request and return its event iterator"""
+    from config import settings
+    
+    agent = select_agent(request.agent_type)
+    if not request.questions:
+        raise HTTPException(status_code=400, detail="No questions provided")
+    if len(request.questions) > settings.batch_max_questions:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {settings.batch_max_questions} questions per batch")
+    
+    async def answer(question: str) -> Dict[str, Any]:
+        response = await when_pool_has_capacity(answer_question, agent, request.agent_type, question)
+        return {key: value for key, value in response.items() if key != "timings"}
+    
+    return run_batch(
+        request.questions,
+        answer,
+        max_concurrency=settings.batch_max_concurrency,
+        embeddings=vector_manager.embeddings if vector_manager is not None else None,
+        dedupe_threshold=settings.batch_dedupe_threshold
+    )
+
+@app.post("/query/batch")
+async def query_rag_batch(request: BatchQueryRequest):
+    """Answer a list of questions concurrently, streaming server-sent events as they complete
+    
+    Events: one ``result`` per question (with ``index``, ``question_time`` and
+    ``duplicate_of`` for near-identical questions answered once), then ``done``
+    with ``throughput`` in questions per second.
+    """
+    events = start_batch(request)
+    
+    async def event_stream():
+        async with aclosing(events):
+            async for event in events:
+                if event["event"] == "done":
+                    event["agent_type"] = request.agent_type
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/query/batch/jobs")
+async def submit_batch_job(request: BatchQueryRequest):
+    """Start a batch as a background job; poll ``/query/batch/jobs/{job_id}`` for results"""
+    events = start_batch(request)
+    
+    async def run(job):
+        # Cancelling the job closes the batch, which cancels its in-flight answers
+        async with aclosing(events):
+            async for event in events:
+                if event["event"] == "done":
+                    return {key: value for key, value in event.items() if key != "event"}
+                job.results.append({key: value for key, value in event.items() if key != "event"})
+    
+    job = job_manager.submit("query_batch", {"agent_type": request.agent_type}, run)
+    job.total = len(request.questions)
+    return {"job_id": job.job_id, "status": job.status, "total": job.total}
+
+@app.get("/query/batch/jobs/{job_id}")
+async def get_batch_job(job_id: str, offset: int = 0):
+    """Job status plus results completed since ``offset`` (pass back ``next_offset``)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(offset)
+
+@app.delete("/query/batch/jobs/{job_id}")
+async def cancel_batch_job(job_id: str):
+    """Cancel a queued or running batch job; completed results are kept"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.task is not None:
+        await asyncio.wait({job.task}, timeout=5)
+    return {"job_id": job.job_id, "status": job.status}
+
+@app.post("/index/refresh")
+def refresh_index():
+    """Re-index changed files in the data directory into the live vector store and publish it
+    
+    Other workers swap the published snapshot in within ``INDEX_SYNC_INTERVAL`` seconds.
+    """
+    if indexer is None:
+        raise HTTPException(status_code=500, detail="Index not initialized")
+    try:
+        stats = indexer.refresh()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(f"Index refresh: {stats}")
+    return stats
+
 @app.get("/agents")
 async def list_agents():
     """List available agents"""
@@ -251,6 +588,20 @@ async def list_agents():
                 "features": ["High precision", "Strict thresholds", "Reliable enterprise responses", "Compliance focus"],
                 "chunk_size": 600,
                 "chunk_overlap": 50
+            },
+            {
+                "type": "fast",
+                "description": "Single-pass agent: one retrieval, one LLM call",
+                "features": ["Lowest latency", "Hybrid retrieval", "Web fallback on low retrieval confidence", "Cited sources"],
+                "chunk_size": 800,
+                "chunk_overlap": 100
+            },
+            {
+                "type": "auto",
+                "description": "Routes each question to the fast path or the ReAct agent by retrieval confidence",
+                "features": ["Fast path for well-covered questions", "ReAct reasoning for the rest", "Confidence-based routing", "Enterprise focus"],
+                "chunk_size": 800,
+                "chunk_overlap": 100
             }
         ]
     }
@@ -286,55 +637,106 @@ async def get_golden_dataset():
         return {"error": f"Failed to generate golden dataset: {str(e)}"}
 
 
-@app.post("/evaluation/run")
-async def run_evaluation(agent_type: str = "standard"):
-    """Run RAGAS evaluation on the golden dataset"""
-    try:
-        # Initialize evaluator
-        evaluator = RAGEvaluator()
-        golden_dataset = evaluator.generate_golden_dataset()
-        
-        # Get the appropriate agent
-        if agent_type == "advanced":
-            agent = AdvancedRetrievalAgent(vectorstore, config)
-        elif agent_type == "conservative":
-            agent = ConservativeRAGAgent(vectorstore, config)
+async def evaluate_agent(job, agent_type: str, num_questions: int) -> Dict[str, Any]:
+    """Answer golden questions, score them and save the results under metrics/"""
+    global rag_evaluator
+    # Initialize the evaluator once and reuse the startup agent
+    from config import settings
+    if rag_evaluator is None:
+        rag_evaluator = await asyncio.to_thread(
+            RAGEvaluator, settings.ragas_cache_path, settings.ragas_max_concurrency
+        )
+    evaluator = rag_evaluator
+    golden_dataset = evaluator.generate_golden_dataset()
+    agent = agent_registry.get(agent_type)
+    
+    # Prepare evaluation data
+    questions = []
+    contexts = []
+    answers = []
+    ground_truths = []
+    response_times = []
+    
+    test_cases = golden_dataset[:num_questions]
+    job.total = len(test_cases)
+    # Retrieve context for every question with one embedding request and one FAISS search
+    retrieved = await asyncio.to_thread(
+        vector_manager.batch_similarity_search, vectorstore, [tc.question for tc in test_cases], 5
+    )
+    
+    for test_case, retrieved_docs in zip(test_cases, retrieved):
+        # Get response from agent; cancellation takes effect between questions
+        if async_agents:
+            response = await when_pool_has_capacity(agent_pool.arun, agent.arespond_to_rfp, test_case.question)
         else:
-            agent = SERAGAgent(vectorstore, config)
+            response = await when_pool_has_capacity(agent_pool.run, agent.respond_to_rfp, test_case.question)
         
-        # Prepare evaluation data
-        questions = []
-        contexts = []
-        answers = []
-        ground_truths = []
+        context = [doc.page_content for doc in retrieved_docs]
         
-        for test_case in golden_dataset[:3]:  # Limit to 3 questions for demo
-            # Get response from agent
-            response = agent.respond_to_rfp(test_case.question)
-            
-            # Retrieve context
-            retrieved_docs = vectorstore.similarity_search(test_case.question, k=5)
-            context = [doc.page_content for doc in retrieved_docs]
-            
-            # Store results
-            questions.append(test_case.question)
-            contexts.append(context)
-            answers.append(response)
-            ground_truths.append(test_case.expected_answer)
-        
-        # Run evaluation
-        metrics = evaluator.evaluate_with_ragas(questions, contexts, answers, ground_truths)
-        
-        return {
-            "agent_type": agent_type,
-            "evaluation_metrics": metrics,
-            "questions_evaluated": len(questions),
-            "timestamp": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        return {"error": f"Evaluation failed: {str(e)}"}
+        # Store results
+        questions.append(test_case.question)
+        contexts.append(context)
+        answers.append(response["answer"])
+        ground_truths.append(test_case.expected_answer)
+        response_times.append(response["response_time"])
+        job.results.append({
+            "question": test_case.question,
+            "answer": response["answer"],
+            "sources": response["sources"],
+            "response_time": response["response_time"]
+        })
+    
+    # Run evaluation
+    metrics = await asyncio.to_thread(evaluator.evaluate_with_ragas, questions, contexts, answers, ground_truths)
+    results_file, summary = save_evaluation_results(agent_type, metrics, questions, answers, ground_truths,
+                                                    response_times, settings.metrics_path)
+    logger.info(f"Evaluation job {job.job_id} saved {results_file}")
+    return {"agent_type": agent_type, "questions_evaluated": len(questions), **summary,
+            "results_file": str(results_file)}
+
+@app.post("/evaluation/run", status_code=202)
+async def run_evaluation(agent_type: str = "standard", num_questions: int = 3):
+    """Queue a RAGAS evaluation of the golden dataset; poll ``/evaluation/jobs/{job_id}`` for status"""
+    select_agent(agent_type)
+    if num_questions < 1:
+        raise HTTPException(status_code=400, detail="num_questions must be at least 1")
+    if evaluation_jobs is None:
+        raise HTTPException(status_code=500, detail="Evaluation jobs not initialized")
+    
+    async def run(job):
+        return await evaluate_agent(job, agent_type, num_questions)
+    
+    # Limit to 3 questions by default for demo
+    job = evaluation_jobs.submit("evaluation", {"agent_type": agent_type, "num_questions": num_questions}, run)
+    return {"job_id": job.job_id, "status": job.status, "status_url": f"/evaluation/jobs/{job.job_id}"}
+
+@app.get("/evaluation/jobs")
+async def list_evaluation_jobs():
+    """Recent evaluation jobs, newest first"""
+    return {"jobs": evaluation_jobs.list() if evaluation_jobs is not None else []}
+
+@app.get("/evaluation/jobs/{job_id}")
+async def get_evaluation_job(job_id: str, offset: int = 0):
+    """Report evaluation progress, answered questions since ``offset`` and, when completed, the saved metrics"""
+    job = evaluation_jobs.get(job_id) if evaluation_jobs is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict(offset)
+
+@app.delete("/evaluation/jobs/{job_id}")
+async def cancel_evaluation_job(job_id: str):
+    """Cancel a queued or running evaluation; nothing is written to metrics/"""
+    job = evaluation_jobs.cancel(job_id) if evaluation_jobs is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.task is not None:
+        await asyncio.wait({job.task}, timeout=5)
+    return {"job_id": job.job_id, "status": job.status}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    from config import settings
+    # Workers share the memory-mapped index snapshot; the first to start builds it if missing
+    uvicorn.run("app:app" if settings.server_workers > 1 else app, host=settings.host, port=settings.port,
+                workers=settings.server_workers)
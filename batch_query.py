@@ -0,0 +1,121 @@
+"""
+Batch Query Module
+Answers a whole RFP questionnaire concurrently, answering near-identical questions once
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_question(question: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a question"""
+    return _NON_WORD_RE.sub(" ", question.lower()).strip()
+
+
+async def dedupe_questions(questions: List[str], embeddings: Optional[Embeddings] = None,
+                           threshold: float = 0.97) -> Tuple[List[int], List[int]]:
+    """Group near-identical questions
+
+    Returns (indices of the questions to answer, index of the answered question for
+    every input). Questions equal after ``normalize_question`` always share an answer;
+    with ``embeddings`` so do questions whose cosine similarity is at least ``threshold``,
+    using one embedding request for the whole list.
+    """
+    representatives: List[int] = []
+    assignments: List[int] = []
+    by_text: Dict[str, int] = {}
+    for i, question in enumerate(questions):
+        key = normalize_question(question)
+        if key not in by_text:
+            by_text[key] = i
+            representatives.append(i)
+        assignments.append(by_text[key])
+
+    if embeddings is None or len(representatives) < 2:
+        return representatives, assignments
+
+    vectors = np.array(await embeddings.aembed_documents([questions[i] for i in representatives]), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms > 0, norms, 1.0)
+    kept: List[int] = []  # positions in ``representatives`` that are still answered
+    merged: Dict[int, int] = {}
+    for position, i in enumerate(representatives):
+        if kept:
+            similarities = vectors[kept] @ vectors[position]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                merged[i] = representatives[kept[best]]
+                continue
+        kept.append(position)
+    return [representatives[p] for p in kept], [merged.get(a, a) for a in assignments]
+
+
+async def run_batch(questions: List[str], answer: Callable[[str], Awaitable[Dict[str, Any]]],
+                    max_concurrency: int = 8, embeddings: Optional[Embeddings] = None,
+                    dedupe_threshold: float = 0.97) -> AsyncIterator[Dict[str, Any]]:
+    """Answer ``questions`` with at most ``max_concurrency`` in flight, yielding events as they complete
+
+    Yields one ``result`` event per input question (duplicates carry ``duplicate_of``)
+    in completion order, then a ``done`` event with aggregate timing and throughput.
+    Consumers that may stop early should iterate under ``contextlib.aclosing`` so unfinished
+    answers are cancelled right away rather than when the generator is garbage collected.
+    """
+    start_time = time.time()
+    unique, assignments = await dedupe_questions(questions, embeddings, dedupe_threshold)
+    followers: Dict[int, List[int]] = {}
+    for i, representative in enumerate(assignments):
+        followers.setdefault(representative, []).append(i)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def answer_one(i: int) -> Tuple[int, Dict[str, Any], float]:
+        async with semaphore:
+            question_start = time.time()
+            try:
+                response = await answer(questions[i])
+            except Exception as e:
+                response = {"answer": "", "sources": [], "response_time": time.time() - question_start,
+                            "error": str(e)}
+            return i, response, time.time() - question_start
+
+    errors = 0
+    tasks = [asyncio.create_task(answer_one(i)) for i in unique]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            representative, response, question_time = await next_done
+            errors += bool(response.get("error"))
+            completed_at = time.time() - start_time
+            for i in followers[representative]:
+                yield {
+                    **response,
+                    "event": "result",
+                    "index": i,
+                    "question": questions[i],
+                    "duplicate_of": representative if i != representative else None,
+                    "question_time": question_time,
+                    "completed_at": completed_at,
+                }
+    finally:
+        # Closed early (cancelled job, disconnected client): stop the answers still running so they
+        # release their agent pool slots before the generator finishes closing
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    elapsed = time.time() - start_time
+    yield {
+        "event": "done",
+        "total_questions": len(questions),
+        "unique_questions": len(unique),
+        "errors": errors,
+        "elapsed": elapsed,
+        "throughput": len(questions) / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,119 @@
+"""
+Batched Embeddings Module
+Embeddings wrapper that sends documents in fixed-size batches, retrying rate limits and transient errors
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+import openai
+from langchain_core.embeddings import Embeddings
+
+# Errors worth retrying: 429s, 5xx, dropped connections and timeouts
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError, ConnectionError, TimeoutError
+)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait (``Retry-After`` / ``retry-after-ms``), if it said"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        try:
+            return float(headers[name]) / scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+class BatchedEmbeddings(Embeddings):
+    """Embeds documents ``batch_size`` texts per call with exponential backoff on retryable errors
+
+    A failed batch is retried on its own, so a rate limit late in a large build costs one batch rather
+    than the whole corpus; wrapping a ``CachedEmbeddings`` also keeps every finished batch across runs.
+    Queries go straight to the wrapped client, so a throttled API never stalls a request on backoff.
+    """
+
+    def __init__(self, embeddings: Embeddings, batch_size: int = 500, max_retries: int = 6,
+                 backoff: float = 1.0, max_backoff: float = 60.0,
+                 retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+                 sleep: Callable[[float], Any] = time.sleep):
+        self.embeddings = embeddings
+        self.batch_size = max(batch_size, 1)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self.sleep = sleep
+        self.batches = 0
+        self.retries = 0
+
+    def __getattr__(self, name: str):
+        # stats(), flush() and friends of the wrapped client (e.g. the embedding cache)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    @property
+    def model(self) -> str:
+        """Model name of the wrapped embeddings client"""
+        return getattr(self.embeddings, "model", None) or type(self.embeddings).__name__
+
+    def _delay(self, attempt: int, error: BaseException) -> float:
+        """Server-requested wait if any, else jittered exponential backoff"""
+        requested = retry_after(error)
+        if requested is not None:
+            return min(requested, self.max_backoff)
+        return min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+
+    def _report(self, done: int, total: int):
+        if total > self.batch_size:
+            print(f"🧮 Embedded {done}/{total} texts")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts batch by batch, retrying each batch up to ``max_retries`` times"""
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            for attempt in range(self.max_retries + 1):
+                try:
+                    vectors.extend(self.embeddings.embed_documents(batch))
+                    break
+                except self.retry_on as e:
+                    if attempt == self.max_retries:
+                        raise
+                    self.retries += 1
+                    delay = self._delay(attempt, e)
+                    print(f"⏳ Embedding batch failed ({type(e).__name__}); retrying in {delay:.1f}s")
+                    self.sleep(delay)
+            self.batches += 1
+            self._report(len(vectors), len(texts))
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant that backs off on the event loop"""
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            for attempt in range(self.max_retries + 1):
+                try:
+                    vectors.extend(await self.embeddings.aembed_documents(batch))
+                    break
+                except self.retry_on as e:
+                    if attempt == self.max_retries:
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(self._delay(attempt, e))
+            self.batches += 1
+            self._report(len(vectors), len(texts))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query with the wrapped client directly"""
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async query embedding with the wrapped client directly"""
+        return await self.embeddings.aembed_query(text)
@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for SolvIQ
+Deterministic stand-ins for the remote services live in ``benchmarks.fakes``
+"""
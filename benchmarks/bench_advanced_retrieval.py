@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Latency and recall of the advanced agent's retrieval: plain similarity vs. the ensemble,
+run sequentially (stock LangChain retrievers) and with parallel fan-out
+
+Usage: python -m benchmarks.bench_advanced_retrieval [--llm-latency 0.2] [--embed-latency 0.05]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
+from langchain.retrievers.document_compressors import LLMChainExtractor
+from langchain.retrievers.multi_query import MultiQueryRetriever
+from langchain.schema import Document
+
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from rag_components import (
+    AdvancedRetrievalAgent,
+    DocumentProcessor,
+    RAGConfig,
+    RAGEvaluator,
+    VectorStoreManager,
+)
+
+K = 5
+
+
+def recall_at_k(docs: List[Document], expected_sources: List[str]) -> float:
+    """Fraction of expected source files present among the retrieved documents"""
+    retrieved = {Path(doc.metadata.get("source", "")).name for doc in docs}
+    return sum(source in retrieved for source in expected_sources) / len(expected_sources)
+
+
+def run(name: str, search: Callable[[str], List[Document]], cases):
+    latencies, recalls = [], []
+    for case in cases:
+        start = time.perf_counter()
+        docs = search(case.question)[:K]
+        latencies.append(time.perf_counter() - start)
+        recalls.append(recall_at_k(docs, case.expected_sources))
+    print(f"{name:<22} mean {statistics.mean(latencies) * 1000:8.1f} ms   "
+          f"max {max(latencies) * 1000:8.1f} ms   recall@{K} {statistics.mean(recalls):.2f}")
+
+
+def main():
+    """Compare retrieval paths over the golden dataset"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--data", default="data")
+    args = parser.parse_args()
+
+    config = RAGConfig(similarity_threshold=4.0)
+    processor = DocumentProcessor(args.data, config)
+    chunks = processor.chunk_documents(processor.load_documents())
+    embeddings = FakeEmbeddings(latency=args.embed_latency)
+    vectorstore = VectorStoreManager(config, embeddings=embeddings).create_vectorstore(chunks)
+    llm = FakeChatModel(latency=args.llm_latency)
+    agent = AdvancedRetrievalAgent(vectorstore, None, config, llm=llm)
+    cases = RAGEvaluator().generate_golden_dataset()
+
+    # The same ensemble built from the stock, sequential LangChain retrievers
+    sequential = EnsembleRetriever(
+        retrievers=[
+            MultiQueryRetriever.from_llm(
+                retriever=vectorstore.as_retriever(search_kwargs={"k": 5}), llm=llm, include_original=True
+            ),
+            ContextualCompressionRetriever(
+                base_compressor=LLMChainExtractor.from_llm(llm),
+                base_retriever=vectorstore.as_retriever(search_kwargs={"k": 10})
+            ),
+        ],
+        weights=[0.7, 0.3]
+    )
+
+    print("\n📊 ADVANCED RETRIEVAL BENCHMARK")
+    print("=" * 50)
+    print(f"Questions: {len(cases)}, chunks: {len(chunks)}, "
+          f"LLM latency: {args.llm_latency}s, embedding latency: {args.embed_latency}s")
+    run("plain similarity", lambda q: vectorstore.similarity_search(q, k=K), cases)
+    run("ensemble sequential", sequential.invoke, cases)
+    run("ensemble parallel", agent.ensemble_retriever.invoke, cases)
+    run("ensemble async", lambda q: asyncio.run(agent.ensemble_retriever.ainvoke(q)), cases)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Per-evaluation setup time: constructing the evaluator and agent on every call vs. the shared registry
+
+Usage: python -m benchmarks.bench_agent_setup [--repeats 20]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+from agent_registry import AGENT_TYPES, AgentRegistry
+from benchmarks.fakes import FakeEmbeddings, synthetic_chunks
+from rag_components import (
+    AdvancedRetrievalAgent,
+    ConservativeRAGAgent,
+    RAGConfig,
+    RAGEvaluator,
+    SERAGAgent,
+    VectorStoreManager,
+)
+
+
+def per_call_setup(vectorstore, config, agent_type):
+    """Do what /evaluation/run did before the registry: new evaluator, new agent, new LLM clients"""
+    RAGEvaluator()
+    if agent_type == "advanced":
+        return AdvancedRetrievalAgent(vectorstore, None, config)
+    if agent_type == "conservative":
+        return ConservativeRAGAgent(vectorstore, None)
+    return SERAGAgent(vectorstore, None, config)
+
+
+def main():
+    """Time both setup paths per agent type (no network calls are made)"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    config = RAGConfig()
+    vectorstore = VectorStoreManager(config, embeddings=FakeEmbeddings()).create_vectorstore(synthetic_chunks(200))
+    start = time.perf_counter()
+    per_call_setup(vectorstore, config, "advanced")
+    cold = time.perf_counter() - start
+
+    registry = AgentRegistry(vectorstore, None, config)
+    start = time.perf_counter()
+    registry.build_all()
+    evaluator = RAGEvaluator()
+    startup = time.perf_counter() - start
+
+    print("\n📊 AGENT SETUP BENCHMARK")
+    print("=" * 50)
+    print(f"First per-call setup in a fresh process (cold imports and clients): {cold * 1000:.1f} ms")
+    print(f"One-off registry build at startup: {startup * 1000:.1f} ms "
+          f"({registry.stats()['llm_clients']} shared LLM clients for {len(AGENT_TYPES)} agents)")
+    for agent_type in AGENT_TYPES:
+        per_call, shared = [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            per_call_setup(vectorstore, config, agent_type)
+            per_call.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            assert evaluator is not None and registry.get(agent_type) is not None
+            shared.append(time.perf_counter() - start)
+        old, new = statistics.median(per_call), statistics.median(shared)
+        print(f"{agent_type:<13} warm per call {old * 1000:8.2f} ms   registry {new * 1000:8.4f} ms   "
+              f"saved {(old - new) * 1000:8.2f} ms per evaluation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Offline latency, throughput and allocation benchmark for every agent and the /query endpoint
+
+Each agent type is driven through scripted questions on fake OpenAI, embedding and Tavily
+clients with configurable latency. Results are written as JSON; pass ``--baseline`` with an
+earlier results file to flag regressions.
+
+Usage: python -m benchmarks.bench_agents [--requests 40] [--concurrency 8] [--baseline results.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+import numpy as np
+
+import app as app_module
+from agent_registry import AGENT_TYPES
+from benchmarks.offline_app import install_offline_components
+
+QUESTIONS = [
+    "What encryption standards does the platform support?",
+    "What SLA and failover guarantees are offered?",
+    "How does licensing work for multiple business units?",
+    "Which compliance certifications are available?",
+    "How is customer data isolated between tenants?",
+    "What integrations are available for SAP and Salesforce?",
+]
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Metric -> True when larger is better
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False,
+                    "throughput_rps": True, "alloc_peak_kib": False}
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int, concurrency: int) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput for one scenario"""
+    values = np.array(latencies, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if len(values) else (0.0, 0.0, 0.0)
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "mean_ms": float(values.mean()) if len(values) else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def run_sync(call: Callable[[str], Dict[str, Any]], questions: List[str], concurrency: int) -> Dict[str, Any]:
+    """Run blocking calls on ``concurrency`` threads"""
+    def timed(question: str):
+        start = time.perf_counter()
+        response = call(question)
+        return time.perf_counter() - start, "error" in response
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, questions))
+    elapsed = time.perf_counter() - start
+    return summarize([latency for latency, _ in outcomes], elapsed, sum(failed for _, failed in outcomes),
+                     concurrency)
+
+
+async def run_async(call: Callable[[str], Awaitable[Dict[str, Any]]], questions: List[str],
+                    concurrency: int) -> Dict[str, Any]:
+    """Run coroutines with at most ``concurrency`` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(question: str):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await call(question)
+            return time.perf_counter() - start, "error" in response
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(timed(question) for question in questions))
+    elapsed = time.perf_counter() - start
+    return summarize([latency for latency, _ in outcomes], elapsed, sum(failed for _, failed in outcomes),
+                     concurrency)
+
+
+async def measure_allocations(call: Callable[[str], Awaitable[Dict[str, Any]]], questions: List[str]) -> Dict[str, float]:
+    """Mean traced peak per request and memory still held afterwards, in KiB (sequential, traced separately)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        peaks = []
+        for question in questions:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await call(question)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_kib": float(np.mean(peaks)) / 1024 if peaks else 0.0, "alloc_retained_kib": retained / 1024}
+
+
+async def run_scenarios(args) -> Dict[str, Dict[str, Any]]:
+    """Every agent sync and async, web search, and POST /query through the ASGI app"""
+    questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(args.requests)]
+    alloc_questions = questions[:args.alloc_requests]
+    scenarios: Dict[str, Dict[str, Any]] = {}
+
+    for tool in ("", "search_web"):
+        install_offline_components(app_module, llm_latency=args.llm_latency, embed_latency=args.embed_latency,
+                                   web_latency=args.web_latency, workers=args.concurrency, tool=tool)
+        agent_types = AGENT_TYPES if not tool else ("standard",)
+        for agent_type in agent_types:
+            agent = app_module.agent_registry.get(agent_type)
+            prefix = f"{agent_type}-web" if tool else agent_type
+            scenarios[f"{prefix}/sync"] = {
+                **run_sync(agent.respond_to_rfp, questions, args.concurrency),
+                **await measure_allocations(lambda q: asyncio.to_thread(agent.respond_to_rfp, q), alloc_questions),
+            }
+            scenarios[f"{prefix}/async"] = {
+                **await run_async(agent.arespond_to_rfp, questions, args.concurrency),
+                **await measure_allocations(agent.arespond_to_rfp, alloc_questions),
+            }
+
+    install_offline_components(app_module, llm_latency=args.llm_latency, embed_latency=args.embed_latency,
+                               web_latency=args.web_latency, workers=args.concurrency)
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def query(question: str) -> Dict[str, Any]:
+            response = await client.post("/query", json={"question": question, "agent_type": "standard"})
+            return response.json() if response.status_code == 200 else {"error": response.status_code}
+
+        scenarios["api/query"] = {
+            **await run_async(query, questions, args.concurrency),
+            **await measure_allocations(query, alloc_questions),
+        }
+    return scenarios
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Scenario metrics that got worse than ``baseline`` by more than ``tolerance``"""
+    regressions = []
+    for name, metrics in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name} {metric}: {old:.1f} -> {new:.1f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    """Run all scenarios, print a table, save the results and compare against a baseline"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--alloc-requests", type=int, default=5,
+                        help="Sequential requests traced with tracemalloc per scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Simulated seconds per LLM call")
+    parser.add_argument("--embed-latency", type=float, default=0.01, help="Simulated seconds per embedding request")
+    parser.add_argument("--web-latency", type=float, default=0.05, help="Simulated seconds per Tavily search")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/agents_<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+    for name in ("httpx", "langchain.retrievers.multi_query"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    scenarios = asyncio.run(run_scenarios(args))
+    results = {
+        "timestamp": time.strftime("%Y%m%d_%H%M%S"),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "scenarios": scenarios,
+    }
+
+    print("\n📊 AGENT BENCHMARK")
+    print("=" * 96)
+    print(f"LLM {args.llm_latency}s/call, embeddings {args.embed_latency}s/request, Tavily {args.web_latency}s/search, "
+          f"{args.requests} requests at concurrency {args.concurrency}")
+    print(f"{'scenario':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>8}{'errors':>8}"
+          f"{'peak KiB':>11}{'retained KiB':>14}")
+    for name, m in scenarios.items():
+        print(f"{name:<24}{m['p50_ms']:>9.1f}{m['p95_ms']:>9.1f}{m['p99_ms']:>9.1f}{m['throughput_rps']:>8.1f}"
+              f"{m['errors']:>8}{m['alloc_peak_kib']:>11.1f}{m['alloc_retained_kib']:>14.1f}")
+
+    output = args.output or RESULTS_DIR / f"agents_{results['timestamp']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\n💾 Results saved to {output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions beyond {args.tolerance:.0%} vs {args.baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            raise SystemExit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
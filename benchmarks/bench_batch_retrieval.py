@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Context retrieval for N questions: one similarity_search per question vs. one batched search
+
+Usage: python -m benchmarks.bench_batch_retrieval [--questions 10 100 1000] [--latency 0.05]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.fakes import FakeEmbeddings, synthetic_chunks
+from rag_components import RAGConfig, VectorStoreManager
+
+
+def main():
+    """Time per-question vs. batched retrieval over a synthetic corpus"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--questions", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Simulated seconds per embedding request")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    embeddings = FakeEmbeddings(latency=0.0)
+    manager = VectorStoreManager(RAGConfig(), embeddings=embeddings)
+    vectorstore = manager.create_vectorstore(synthetic_chunks(args.chunks))
+    embeddings.latency = args.latency
+
+    print("\n📊 BATCH RETRIEVAL BENCHMARK")
+    print("=" * 60)
+    print(f"Chunks: {args.chunks}, k: {args.k}, embedding latency: {args.latency}s/request")
+    for n in args.questions:
+        questions = [doc.page_content[:120] for doc in synthetic_chunks(n, seed=11)]
+
+        embeddings.calls = 0
+        start = time.perf_counter()
+        looped = [vectorstore.similarity_search_with_score(q, k=args.k) for q in questions]
+        loop_time = time.perf_counter() - start
+        loop_calls = embeddings.calls
+
+        embeddings.calls = 0
+        start = time.perf_counter()
+        batched = manager.batch_similarity_search_with_score(vectorstore, questions, k=args.k)
+        batch_time = time.perf_counter() - start
+
+        # Compare scores rather than documents: equidistant chunks may come back in either order
+        same = sum(
+            np.allclose([score for _, score in a], [score for _, score in b], atol=1e-5)
+            for a, b in zip(looped, batched)
+        )
+        print(f"{n:>5} questions: loop {loop_time:7.3f}s ({loop_calls} requests)  "
+              f"batch {batch_time:6.3f}s ({embeddings.calls} requests)  "
+              f"speedup {loop_time / max(batch_time, 1e-9):6.1f}x  matching {same}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Resident memory of one worker's loaded snapshot: Document docstore + float32 index vs. the compact
+chunk store with float16/int8 codes re-ranked in float32
+
+Each variant's snapshot is built once, then loaded and queried in a fresh process whose RSS is read
+from /proc before and after. RssAnon is private to the worker; RssFile is page cache from memory-mapped
+index and re-rank files, shared by every worker on the host.
+
+Usage: python -m benchmarks.bench_chunk_store [--chunks 200000] [--dim 384]
+"""
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.bench_index_types import clustered_vectors
+from benchmarks.fakes import FakeEmbeddings, synthetic_chunks
+from rag_components import RAGConfig, VectorStoreManager
+
+# name -> (vector_dtype, compact_docstore)
+VARIANTS = {
+    "documents": ("float32", False),
+    "compact-fp16": ("float16", True),
+    "compact-int8": ("int8", True),
+}
+
+
+def memory() -> Dict[str, float]:
+    """Read the current RSS and its anonymous/file-backed split in MB from /proc/self/status"""
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "RssAnon", "RssFile"):
+                fields[name] = int(value.split()[0]) / 1024
+    return fields
+
+
+def manager_for(variant: str, index_dir: str, dimension: int) -> VectorStoreManager:
+    vector_dtype, compact = VARIANTS[variant]
+    config = RAGConfig(index_dir=index_dir, vector_dtype=vector_dtype, compact_docstore=compact)
+    return VectorStoreManager(config, embeddings=FakeEmbeddings(dimension=dimension))
+
+
+def worker(args):
+    """Load one variant's snapshot, query it, and print memory and recall as JSON"""
+    gc.collect()
+    before = memory()
+    manager = manager_for(args.worker, args.index_dir, args.dim)
+    vectorstore = manager.load_snapshot(args.worker)
+    gc.collect()
+    loaded = memory()
+
+    queries = np.load(f"{args.index_dir}/queries.npy")
+    truth = np.load(f"{args.index_dir}/truth.npy")
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        hits = vectorstore.similarity_search_with_score_by_vector(query.tolist(), k=args.k)
+        latencies.append(time.perf_counter() - start)
+        found = {doc.metadata["chunk_id"] for doc, _ in hits}
+        recalls.append(len(found & set(expected.tolist())) / args.k)
+    gc.collect()
+    print(json.dumps({"before": before, "loaded": loaded, "queried": memory(),
+                      "recall": float(np.mean(recalls)), "p50_ms": float(np.percentile(latencies, 50) * 1000)}))
+
+
+def main():
+    """Build each variant's snapshot, then measure it in a fresh process"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--worker", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--index-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+        return
+
+    chunks = synthetic_chunks(args.chunks)
+    for i, doc in enumerate(chunks):
+        doc.metadata["chunk_id"] = i
+        doc.metadata["chunk_size"] = len(doc.page_content)
+    vectors = clustered_vectors(args.chunks + args.queries, args.dim, clusters=1000, spread=1.0, seed=0)
+    vectors, queries = vectors[:args.chunks], vectors[args.chunks:]
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        np.save(f"{index_dir}/queries.npy", queries)
+        np.save(f"{index_dir}/truth.npy", truth)
+        for variant in VARIANTS:
+            manager = manager_for(variant, index_dir, args.dim)
+            vectorstore = manager.build_vectorstore(chunks, vectors.copy(), cosine=True)
+            manager.save_snapshot(vectorstore, variant)
+            del vectorstore
+        del chunks, vectors
+        gc.collect()
+
+        results = {}
+        for variant in VARIANTS:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_chunk_store", "--worker", variant, "--index-dir", index_dir,
+                 "--dim", str(args.dim), "--k", str(args.k)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results[variant] = json.loads(output.strip().splitlines()[-1])
+
+    print("\n📊 CHUNK STORE MEMORY BENCHMARK")
+    print("=" * 92)
+    print(f"{args.chunks} synthetic chunks, dim {args.dim}, {args.queries} queries, recall@{args.k} vs. exact float32")
+    print(f"{'variant':<14}{'RSS before':>11}{'RSS loaded':>11}{'RSS queried':>12}{'+anon':>8}{'+file':>8}"
+          f"{'recall':>8}{'p50 ms':>9}   (MB)")
+    growth = {}
+    for variant, m in results.items():
+        anon = m["queried"]["RssAnon"] - m["before"]["RssAnon"]
+        file = m["queried"]["RssFile"] - m["before"]["RssFile"]
+        growth[variant] = (anon, file)
+        print(f"{variant:<14}{m['before']['VmRSS']:>11.0f}{m['loaded']['VmRSS']:>11.0f}{m['queried']['VmRSS']:>12.0f}"
+              f"{anon:>8.0f}{file:>8.0f}{m['recall']:>8.3f}{m['p50_ms']:>9.2f}")
+
+    baseline = sum(growth["documents"])
+    for variant in list(VARIANTS)[1:]:
+        anon, file = growth[variant]
+        print(f"🗜️ {variant}: snapshot adds {anon + file:.0f} MB to a worker vs {baseline:.0f} MB "
+              f"({1 - (anon + file) / baseline:.0%} less); {anon:.0f} MB of it private vs {growth['documents'][0]:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Latency and LLM calls per question on the golden dataset: ReAct (standard) vs. the single-pass
+fast agent vs. the auto router, on the offline stand-ins
+
+Usage: python -m benchmarks.bench_fast_agent [--llm-latency 0.2] [--threshold 0.5]
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+import app as app_module
+from benchmarks.offline_app import install_offline_components
+from rag_components import RAGEvaluator
+
+AGENTS = ("standard", "fast", "auto")
+
+
+def recall(sources: List[str], expected_sources: List[str]) -> float:
+    """Fraction of expected source files among the response's sources"""
+    names = {Path(source).name for source in sources}
+    return sum(source in names for source in expected_sources) / len(expected_sources)
+
+
+def run(agent, questions: List[str], expected: List[List[str]]) -> Dict[str, Any]:
+    """Answer every question sequentially, counting LLM and Tavily calls per question"""
+    llm, tavily = agent.llm, agent.tavily_client
+    latencies, llm_calls, web_calls, recalls, routes = [], [], [], [], {}
+    for question, expected_sources in zip(questions, expected):
+        calls_before, web_before = llm.calls, tavily.calls
+        start = time.perf_counter()
+        response = agent.respond_to_rfp(question)
+        latencies.append(time.perf_counter() - start)
+        llm_calls.append(llm.calls - calls_before)
+        web_calls.append(tavily.calls - web_before)
+        recalls.append(recall(response["sources"], expected_sources))
+        route = response.get("route", "react")
+        routes[route] = routes.get(route, 0) + 1
+    values = np.array(latencies) * 1000
+    return {
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "llm_calls": float(np.mean(llm_calls)),
+        "web_calls": float(np.mean(web_calls)),
+        "recall": float(np.mean(recalls)),
+        "routes": routes,
+    }
+
+
+def main():
+    """Run the golden dataset through each agent and report the reduction against ReAct"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Simulated seconds per LLM call")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="Simulated seconds per embedding request")
+    parser.add_argument("--web-latency", type=float, default=0.1, help="Simulated seconds per Tavily search")
+    parser.add_argument("--threshold", type=float, help="Fast-path confidence threshold (default: RAGConfig's)")
+    args = parser.parse_args()
+    for name in ("httpx", "solviq.timing"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    install_offline_components(app_module, llm_latency=args.llm_latency, embed_latency=args.embed_latency,
+                               web_latency=args.web_latency)
+    cases = RAGEvaluator().generate_golden_dataset()
+    questions = [case.question for case in cases]
+    expected = [case.expected_sources for case in cases]
+
+    results = {}
+    for agent_type in AGENTS:
+        agent = app_module.agent_registry.get(agent_type)
+        if args.threshold is not None:
+            agent.config.fast_confidence_threshold = args.threshold
+        results[agent_type] = run(agent, questions, expected)
+
+    threshold = app_module.agent_registry.get("fast").config.fast_confidence_threshold
+    print("\n📊 FAST AGENT BENCHMARK")
+    print("=" * 96)
+    print(f"{len(questions)} golden questions, LLM {args.llm_latency}s/call, embeddings {args.embed_latency}s/request, "
+          f"Tavily {args.web_latency}s/search, confidence threshold {threshold}")
+    print(f"{'agent':<10}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'LLM calls':>11}{'web calls':>11}"
+          f"{'recall':>8}   routes")
+    for agent_type, m in results.items():
+        routes = ", ".join(f"{route} {n}" for route, n in sorted(m["routes"].items()))
+        print(f"{agent_type:<10}{m['mean_ms']:>9.1f}{m['p50_ms']:>9.1f}{m['p95_ms']:>9.1f}{m['llm_calls']:>11.2f}"
+              f"{m['web_calls']:>11.2f}{m['recall']:>8.2f}   {routes}")
+
+    baseline = results["standard"]
+    for agent_type in AGENTS[1:]:
+        m = results[agent_type]
+        print(f"⚡ {agent_type} vs standard: mean latency {1 - m['mean_ms'] / baseline['mean_ms']:.0%} lower, "
+              f"LLM calls per question {1 - m['llm_calls'] / baseline['llm_calls']:.0%} fewer")
+
+
+if __name__ == "__main__":
+    main()
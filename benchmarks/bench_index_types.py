@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Recall@k vs. query latency vs. memory for each FAISS index type on synthetic clustered corpora
+
+Ground truth is exact (flat) search. IVF is swept over nprobe and HNSW over efSearch.
+
+Usage: python -m benchmarks.bench_index_types [--sizes 100000 1000000] [--dim 128] [--pq-m 16]
+"""
+
+import argparse
+import time
+from dataclasses import replace
+from typing import Dict
+
+import faiss
+import numpy as np
+
+from vector_index import IndexSpec, configure_search, index_size_bytes, new_index
+
+
+def clustered_vectors(n: int, dimension: int, clusters: int, spread: float, seed: int) -> np.ndarray:
+    """Scatter unit vectors around ``clusters`` random centres, like embeddings of related documents"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    vectors = np.empty((n, dimension), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(start + 100_000, n)
+        block = centres[rng.integers(0, clusters, stop - start)]
+        vectors[start:stop] = block + spread * rng.normal(size=block.shape).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def measure(index: faiss.Index, queries: np.ndarray, truth: np.ndarray, k: int) -> Dict[str, float]:
+    """Recall@k against ``truth`` and single-query latency"""
+    latencies, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found.append(ids[0])
+    recall = np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)])
+    values = np.array(latencies) * 1000
+    return {"recall": float(recall), "p50_ms": float(np.percentile(values, 50)), "mean_ms": float(values.mean())}
+
+
+def main():
+    """Build every index type for each corpus size and sweep its search parameter"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--spread", type=float, default=1.0, help="Noise around each centre; higher overlaps more")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--pq-m", type=int, default=16, help="IVF-PQ code size in bytes")
+    args = parser.parse_args()
+
+    print("\n📊 FAISS INDEX TYPE BENCHMARK")
+    print("=" * 84)
+    print(f"dim {args.dim}, {args.clusters} clusters (spread {args.spread}), {args.queries} single-vector queries, recall@{args.k} vs. flat, "
+          f"{faiss.omp_get_max_threads()} threads")
+    print(f"{'vectors':>9}  {'index':<7}{'search':<14}{'build s':>9}{'MB':>9}{'recall':>8}{'p50 ms':>9}{'mean ms':>9}")
+
+    for n in args.sizes:
+        # Queries come from the same distribution but are held out of the corpus
+        vectors = clustered_vectors(n + args.queries, args.dim, args.clusters, args.spread, seed=0)
+        vectors, queries = vectors[:n], vectors[n:]
+
+        base = IndexSpec(hnsw_m=args.hnsw_m, ef_construction=args.ef_construction, pq_m=args.pq_m)
+        truth = None
+        for index_type, sweep in (("flat", [None]), ("ivf", args.nprobe), ("hnsw", args.ef_search),
+                                  ("ivfpq", args.nprobe)):
+            spec = replace(base, index_type=index_type)
+            start = time.perf_counter()
+            index = new_index(vectors, spec)
+            index.add(vectors)
+            build = time.perf_counter() - start
+            size_mb = index_size_bytes(index) / 2 ** 20
+            if truth is None:
+                _, truth = index.search(queries, args.k)
+            for value in sweep:
+                if index_type == "hnsw":
+                    search_spec, label = replace(spec, ef_search=value), f"efSearch={value}"
+                elif value is not None:
+                    search_spec, label = replace(spec, nprobe=value), f"nprobe={value}"
+                else:
+                    search_spec, label = spec, "exact"
+                configure_search(index, search_spec)
+                m = measure(index, queries, truth, args.k)
+                print(f"{n:>9}  {index_type:<7}{label:<14}{build:>9.1f}{size_mb:>9.1f}{m['recall']:>8.3f}"
+                      f"{m['p50_ms']:>9.3f}{m['mean_ms']:>9.3f}", flush=True)
+            del index
+
+
+if __name__ == "__main__":
+    main()
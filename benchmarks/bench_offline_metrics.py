@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation metrics: per-sample Python sets vs. vectorized term matrices
+
+Usage: python -m benchmarks.bench_offline_metrics [--samples 100 1000 10000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.fakes import synthetic_chunks
+from overlap_metrics import overlap_scores
+
+
+def set_based_metrics(questions, contexts, answers, ground_truths):
+    """Do what RAGEvaluator.custom_evaluation did before: fresh word sets per sample and metric"""
+    def overlap(part, whole):
+        return len(part & whole) / len(part) if part else 0.0
+
+    faithfulness, relevancy, recall = [], [], []
+    for question, ctx, answer, truth in zip(questions, contexts, answers, ground_truths):
+        context_words = set(" ".join(ctx).lower().split())
+        faithfulness.append(overlap(set(answer.lower().split()), context_words))
+        relevancy.append(overlap(set(question.lower().split()), set(answer.lower().split())))
+        recall.append(overlap(set(truth.lower().split()), set(" ".join(ctx).lower().split())))
+    return {"faithfulness": np.mean(faithfulness), "answer_relevancy": np.mean(relevancy),
+            "context_precision": 0.8, "context_recall": np.mean(recall)}
+
+
+def main():
+    """Time both implementations on synthetic RFP samples with 5 retrieved chunks each"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = [doc.page_content for doc in synthetic_chunks(args.chunks, words_per_chunk=150)]
+    rng = np.random.default_rng(5)
+
+    print("\n📊 OFFLINE METRICS BENCHMARK")
+    print("=" * 60)
+    print(f"Corpus: {args.chunks} chunks of 150 words, k: {args.k}")
+    for n in args.samples:
+        texts = [doc.page_content for doc in synthetic_chunks(3 * n, words_per_chunk=25, seed=n)]
+        questions, answers, truths = texts[:n], texts[n:2 * n], texts[2 * n:]
+        contexts = [[corpus[j] for j in rng.choice(args.chunks, args.k, replace=False)] for _ in range(n)]
+
+        start = time.perf_counter()
+        set_based_metrics(questions, contexts, answers, truths)
+        looped = time.perf_counter() - start
+
+        start = time.perf_counter()
+        overlap_scores(questions, contexts, answers, truths)
+        vectorized = time.perf_counter() - start
+        print(f"{n:>6} samples: sets {looped * 1000:9.1f} ms   vectorized {vectorized * 1000:8.1f} ms   "
+              f"speedup {looped / vectorized:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Load test for POST /query against stubbed LLM and embedding clients
+
+Usage: python -m benchmarks.bench_query_concurrency [--clients 1 8 32] [--llm-latency 0.1] [--mode both]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+import app as app_module
+from benchmarks.offline_app import install_offline_components
+
+QUESTIONS = [
+    "What encryption standards does the platform support?",
+    "What SLA and failover guarantees are offered?",
+    "How does licensing work for multiple business units?",
+    "Which compliance certifications are available?",
+]
+
+
+async def run_clients(client: httpx.AsyncClient, clients: int, requests_per_client: int) -> float:
+    """Fire ``clients`` concurrent request loops and return requests/sec"""
+    async def worker(offset: int):
+        for i in range(requests_per_client):
+            question = QUESTIONS[(offset + i) % len(QUESTIONS)]
+            response = await client.post("/query", json={"question": question, "agent_type": "standard"})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(c) for c in range(clients)))
+    return clients * requests_per_client / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    modes = ["thread", "async"] if args.mode == "both" else [args.mode]
+    # Two LLM round-trips per ReAct query bound a single worker's throughput
+    serial_rate = 1 / (2 * args.llm_latency)
+    print("\n📊 /query CONCURRENCY BENCHMARK")
+    print("=" * 50)
+    print(f"Workers: {args.workers}, LLM latency: {args.llm_latency}s/call")
+    print(f"Fully serialized ceiling: {serial_rate:.1f} req/s")
+    for mode in modes:
+        install_offline_components(app_module, llm_latency=args.llm_latency, workers=args.workers,
+                                   async_agents=(mode == "async"))
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"\n[{mode}]")
+            for clients in args.clients:
+                rate = await run_clients(client, clients, args.requests_per_client)
+                print(f"{clients:>3} clients: {rate:6.1f} req/s ({rate / serial_rate:.1f}x serialized)")
+            print(f"Pool: {app_module.agent_pool.stats()}")
+
+
+def main():
+    """Run the load test"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests-per-client", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--mode", choices=["thread", "async", "both"], default="both")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Memory and startup time of N worker processes serving one index snapshot: private copies
+(``load_snapshot(mmap=False)``) vs. read-only memory maps shared through the page cache
+
+Every worker loads the dense and BM25 indexes, answers a few queries, then idles while the parent
+sums PSS (proportional set size: shared pages split between the processes mapping them) from
+/proc/<pid>/smaps_rollup. The same number of idle workers, which import everything but load no index,
+is subtracted, so the figure is the memory the snapshot itself costs all workers together.
+
+Usage: python -m benchmarks.bench_shared_index [--chunks 100000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from benchmarks.bench_chunk_store import VARIANTS, manager_for
+from benchmarks.bench_index_types import clustered_vectors
+from benchmarks.fakes import synthetic_chunks
+
+
+def pss_mb(pid: int) -> float:
+    """Proportional set size of ``pid`` in MB"""
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def worker(args):
+    """Load (or, when idle, skip) the snapshot, touch it with queries, report, and wait to be released"""
+    manager = manager_for(args.variant, args.index_dir, args.dim)
+    start = time.perf_counter()
+    if args.mode != "idle":
+        mmap = args.mode == "shared"
+        vectorstore = manager.load_snapshot("snapshot", mmap=mmap)
+        sparse_index = manager.load_sparse_index("snapshot", mmap=mmap)
+        startup = time.perf_counter() - start
+        for query in np.load(f"{args.index_dir}/queries.npy"):
+            vectorstore.similarity_search_with_score_by_vector(query.tolist(), k=10)
+            sparse_index.search("encryption failover sla replication", k=10)
+    else:
+        startup = 0.0
+    print(json.dumps({"startup": startup}), flush=True)
+    sys.stdin.readline()
+
+
+def run_workers(mode: str, count: int, args) -> dict:
+    """Start ``count`` workers together and measure them once all are ready"""
+    command = [sys.executable, "-m", "benchmarks.bench_shared_index", "--worker", "--mode", mode,
+               "--index-dir", args.index_dir, "--variant", args.variant, "--dim", str(args.dim)]
+    processes = [subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(count)]
+    try:
+        startups: List[float] = []
+        for process in processes:
+            # Skip the loader's progress prints up to the JSON report
+            line = ""
+            while not line.startswith("{"):
+                line = process.stdout.readline()
+                if not line:
+                    raise RuntimeError(f"worker {process.pid} exited before loading")
+            startups.append(json.loads(line)["startup"])
+        total = sum(pss_mb(process.pid) for process in processes)
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+    return {"pss": total, "startup": float(np.mean(startups))}
+
+
+def main():
+    """Build one snapshot, then compare private and shared loading across worker counts"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--variant", choices=VARIANTS, default="compact-int8")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=("idle", "private", "shared"), help=argparse.SUPPRESS)
+    parser.add_argument("--index-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+        return
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        args.index_dir = index_dir
+        chunks = synthetic_chunks(args.chunks)
+        for i, doc in enumerate(chunks):
+            doc.metadata["chunk_id"] = i
+        vectors = clustered_vectors(args.chunks + args.queries, args.dim, clusters=1000, spread=1.0, seed=0)
+        np.save(f"{index_dir}/queries.npy", vectors[args.chunks:])
+        manager = manager_for(args.variant, index_dir, args.dim)
+        start = time.perf_counter()
+        vectorstore = manager.build_vectorstore(chunks, vectors[:args.chunks], cosine=True)
+        manager.save_snapshot(vectorstore, "snapshot")
+        build = time.perf_counter() - start
+        del chunks, vectors, vectorstore
+
+        rows = []
+        for count in args.workers:
+            idle = run_workers("idle", count, args)["pss"]
+            for mode in ("private", "shared"):
+                result = run_workers(mode, count, args)
+                rows.append((count, mode, result["pss"] - idle, result["startup"]))
+
+    print("\n📊 SHARED INDEX BENCHMARK")
+    print("=" * 72)
+    print(f"{args.chunks} chunks, dim {args.dim}, {args.variant}; snapshot built once in {build:.1f}s "
+          "(embedding excluded)")
+    print(f"{'workers':>8}  {'loading':<9}{'index MB (PSS)':>16}{'per worker':>12}{'startup s':>11}")
+    for count, mode, memory, startup in rows:
+        print(f"{count:>8}  {mode:<9}{memory:>16.0f}{memory / count:>12.0f}{startup:>11.2f}")
+    largest = max(args.workers)
+    private, shared = [memory for count, _, memory, _ in rows if count == largest]
+    print(f"🧮 {largest} workers: {shared:.0f} MB shared vs {private:.0f} MB of private copies "
+          f"({1 - shared / private:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: full re-embed vs. loading the persisted FAISS snapshot
+
+Usage: python -m benchmarks.bench_snapshot_startup [--chunks 10000] [--latency 0.2]
+"""
+
+import argparse
+import tempfile
+import time
+
+from benchmarks.fakes import FakeEmbeddings, synthetic_chunks
+from rag_components import RAGConfig, VectorStoreManager
+
+
+def main():
+    """Time rebuild vs. snapshot load on a synthetic corpus"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.2,
+                        help="Simulated seconds per 1000-text embedding request")
+    args = parser.parse_args()
+
+    chunks = synthetic_chunks(args.chunks)
+    with tempfile.TemporaryDirectory() as index_dir:
+        config = RAGConfig(index_dir=index_dir)
+        embeddings = FakeEmbeddings(latency=args.latency)
+        manager = VectorStoreManager(config, embeddings=embeddings)
+
+        start = time.perf_counter()
+        vectorstore = manager.create_advanced_vectorstore(chunks)
+        rebuild_time = time.perf_counter() - start
+        embed_calls = embeddings.calls
+
+        key = manager.snapshot_key(chunks)
+        manager.save_snapshot(vectorstore, key)
+
+        start = time.perf_counter()
+        loaded = manager.load_snapshot(key)
+        load_time = time.perf_counter() - start
+
+    print("\n📊 STARTUP BENCHMARK")
+    print("=" * 40)
+    print(f"Chunks: {args.chunks} (index holds {loaded.index.ntotal})")
+    print(f"Rebuild: {rebuild_time:.3f}s ({embed_calls} embedding requests)")
+    print(f"Snapshot load: {load_time:.3f}s (0 embedding requests)")
+    print(f"Speedup: {rebuild_time / max(load_time, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Deterministic local stand-ins for remote services
+Used by the benchmarks and tests so they run without API keys
+"""
+
+import asyncio
+import json
+import re
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class FakeEmbeddings(Embeddings):
+    """Hashed bag-of-words embedder with optional artificial per-call latency
+
+    Texts sharing words get similar vectors, so retrieval quality is meaningful
+    while staying fully deterministic across processes.
+    """
+
+    def __init__(self, dimension: int = 256, latency: float = 0.0, batch_size: int = 1000,
+                 model: str = "fake-embedding"):
+        self.dimension = dimension
+        self.latency = latency
+        self.batch_size = batch_size
+        self.model = model
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.dimension] += 1.0 if (h >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with one simulated round-trip per ``batch_size`` texts"""
+        for _ in range(0, len(texts), self.batch_size):
+            self.calls += 1
+            if self.latency:
+                time.sleep(self.latency)
+        self.texts_embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query in one simulated round-trip"""
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant that waits on the event loop instead of a thread"""
+        for _ in range(0, len(texts), self.batch_size):
+            self.calls += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        self.texts_embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async single query embedding"""
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted ReAct chat model: calls the first listed tool once, then answers from its observation
+
+    Also answers the multi-query (three question variants) and contextual-compression
+    (returns the context unchanged) prompts used by the advanced retrievers, and the fast
+    agent's single-pass prompt (the start of its context). ``tool``
+    names the tool to call instead of the first one listed.
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    calls: int = 0
+    model_name: str = "fake-chat"
+    tool: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        if "Original question:" in prompt:
+            question = prompt.rsplit("Original question:", 1)[1].strip()
+            return "\n".join(f"{prefix} {question}" for prefix in ("What is", "Describe", "Explain"))
+        if "Extracted relevant parts:" in prompt:
+            return prompt.split(">>>\n", 1)[1].rsplit("\n>>>", 1)[0]
+        if "Answer using only the context below" in prompt:
+            return str(messages[0].content).split("Context:\n", 1)[1][:300]
+        # The last message holds the question followed by the agent scratchpad
+        question, _, scratchpad = str(messages[-1].content).partition("\n")
+        if "Observation:" in scratchpad:
+            observation = scratchpad.rsplit("Observation:", 1)[1].strip()
+            observation = observation.removesuffix("Thought:").strip()
+            return f"Thought: I now know the final answer\nFinal Answer: {observation[:300]}"
+        if '"action" field are:' in prompt:
+            tools = [name.strip() for name in prompt.split('"action" field are:', 1)[1].split("\n", 1)[0].split(",")]
+            tool = self.tool if self.tool in tools else tools[0]
+            action = json.dumps({"action": tool, "action_input": question.strip()})
+            return f"Thought: I should search for this\nAction:\n```\n{action}\n```"
+        return f"Final Answer: {question[:300]}"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        reply = self._reply(messages)
+        # Whitespace-separated words stand in for tokens, reported like OpenAI's token_usage
+        prompt_tokens = sum(len(str(message.content).split()) for message in messages)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(reply.split())}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))],
+                          llm_output={"token_usage": usage, "model_name": self.model_name})
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._result(messages)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        """Stream the reply word by word: ``latency`` before the first token, ``token_latency`` between"""
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for token in re.findall(r"\S+\s*", self._reply(messages)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._result(messages)
+
+
+class FakeTavilyClient:
+    """Tavily stand-in returning results that echo the query, with optional artificial latency"""
+
+    def __init__(self, latency: float = 0.0, api_key: str = "offline"):
+        self.latency = latency
+        self.api_key = api_key
+        self.calls = 0
+
+    def _results(self, query: str, max_results: int) -> Dict[str, Any]:
+        self.calls += 1
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"Result {i + 1} for {query}",
+                    "url": f"https://example.com/{zlib.crc32(query.encode('utf-8')):08x}/{i + 1}",
+                    "content": f"Public information about {query} (result {i + 1}).",
+                    "score": 1.0 / (i + 1),
+                }
+                for i in range(max_results)
+            ],
+        }
+
+    def search(self, query: str, max_results: int = 5, **kwargs: Any) -> Dict[str, Any]:
+        """Blocking search in one simulated round-trip"""
+        if self.latency:
+            time.sleep(self.latency)
+        return self._results(query, max_results)
+
+
+class FakeAsyncTavilyClient(FakeTavilyClient):
+    """Async Tavily stand-in that waits on the event loop"""
+
+    async def search(self, query: str, max_results: int = 5, **kwargs: Any) -> Dict[str, Any]:
+        """Async search in one simulated round-trip"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._results(query, max_results)
+
+
+def synthetic_chunks(n: int, words_per_chunk: int = 60, num_sources: int = 40, seed: int = 7) -> List[Document]:
+    """Generate ``n`` RFP-flavoured chunks drawn from a fixed vocabulary"""
+    vocabulary = (
+        "platform encryption aes 256 tls soc2 iso27001 gdpr hipaa sla uptime failover "
+        "region replication backup recovery rto rpo rbac sso saml oauth api rest latency "
+        "throughput scaling cluster node kubernetes docker migration integration legacy "
+        "sap oracle salesforce connector pipeline warehouse analytics dashboard audit "
+        "compliance residency tenant isolation support training onboarding pricing license"
+    ).split()
+    rng = np.random.default_rng(seed)
+    word_ids = rng.integers(0, len(vocabulary), size=(n, words_per_chunk))
+    return [
+        Document(
+            page_content=" ".join(vocabulary[j] for j in row),
+            metadata={"source": f"data/synthetic_{i % num_sources:03d}.md"},
+        )
+        for i, row in enumerate(word_ids)
+    ]
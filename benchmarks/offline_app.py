@@ -0,0 +1,52 @@
+"""
+Wire app.py's globals with offline stand-ins so its endpoints can be driven without API keys
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("TAVILY_API_KEY", "offline")
+
+from agent_pool import AgentWorkerPool
+from agent_registry import AgentRegistry
+from benchmarks.fakes import (
+    FakeAsyncTavilyClient,
+    FakeChatModel,
+    FakeEmbeddings,
+    FakeTavilyClient,
+)
+from config import get_data_path
+from jobs import JobManager
+from rag_components import DocumentProcessor, RAGConfig, VectorStoreManager
+
+
+def install_offline_components(app_module, llm_latency: float = 0.1, embed_latency: float = 0.02,
+                               workers: int = 8, max_queue: int = 0, async_agents: bool = True,
+                               web_latency: float = 0.0, tool: str = ""):
+    """Populate ``app_module``'s globals with agents backed by fake LLM/embedder/Tavily clients
+
+    ``tool`` makes the fake LLM call that tool (e.g. ``search_web``) instead of the first one.
+    """
+    config = RAGConfig(similarity_threshold=-1.0)  # Any cosine similarity; the corpus is tiny
+    processor = DocumentProcessor(str(get_data_path()), config)
+    manager = VectorStoreManager(config, embeddings=FakeEmbeddings(latency=embed_latency))
+    vectorstore = manager.create_advanced_vectorstore(processor.chunk_documents(processor.load_documents()))
+    sparse_index = manager.build_sparse_index(vectorstore)
+
+    def llm(model_name, temperature, max_tokens):
+        return FakeChatModel(latency=llm_latency, model_name=model_name, tool=tool)
+
+    app_module.config = config
+    app_module.vector_manager = manager
+    app_module.vectorstore = vectorstore
+    app_module.sparse_index = sparse_index
+    app_module.agent_registry = AgentRegistry(vectorstore, FakeTavilyClient(web_latency), config, sparse_index,
+                                              llm_factory=llm)
+    for agent in app_module.agent_registry.build_all().values():
+        agent.async_tavily_client = FakeAsyncTavilyClient(web_latency)
+    app_module.agent_registry.get("conservative").config.similarity_threshold = config.similarity_threshold
+    app_module.agent_pool = AgentWorkerPool(workers, max_queue)
+    app_module.async_agents = async_agents
+    app_module.answer_cache = None
+    app_module.evaluation_jobs = JobManager(max_running=1)
+    return app_module
@@ -0,0 +1,307 @@
+"""
+Chunk Store Module
+Memory-compact docstore: chunk texts in one contiguous buffer, metadata interned into columns
+"""
+
+import json
+import pickle
+import threading
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from langchain.schema import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+
+# Row marker for an integer column the chunk has no value for
+MISSING = np.iinfo(np.int64).min
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, (int, np.integer)) and not isinstance(value, bool)
+
+
+def _encode_ids(ids: List[str]) -> np.ndarray:
+    return np.array([doc_id.encode("utf-8") for doc_id in ids], dtype=bytes) if ids else np.zeros(0, dtype="S1")
+
+
+def _load_array(path: Path, memory_map: bool) -> np.ndarray:
+    return np.load(path, mmap_mode="r" if memory_map else None)
+
+
+class _Columns(NamedTuple):
+    """One immutable version of a ``CompactDocstore``'s per-chunk arrays"""
+    ids: np.ndarray
+    order: np.ndarray  # argsort of ids
+    buffer: np.ndarray
+    offsets: np.ndarray
+    keys: Tuple[str, ...]  # metadata keys in first-seen order
+    ints: Dict[str, np.ndarray]
+    codes: Dict[str, np.ndarray]  # -1 where the chunk has no value
+
+
+def _columns(ids: np.ndarray, buffer: np.ndarray, offsets: np.ndarray, keys: Tuple[str, ...],
+             ints: Dict[str, np.ndarray], codes: Dict[str, np.ndarray]) -> _Columns:
+    return _Columns(ids, np.argsort(ids, kind="stable").astype(np.int64), buffer, offsets, keys, ints, codes)
+
+
+class CompactDocstore(Docstore, AddableMixin):
+    """Drop-in replacement for ``InMemoryDocstore`` that stores chunks column-wise
+
+    Row ``r``'s text is ``buffer[offsets[r]:offsets[r + 1]]`` (UTF-8). Integer metadata such as
+    ``chunk_id`` and ``chunk_size`` lives in int64 arrays; every other value is interned once and
+    referenced by an int32 code, so a ``source`` path shared by thousands of chunks is stored a
+    single time. Documents are materialized on lookup, so only retrieved chunks exist as objects.
+
+    Ids are a fixed-width bytes array searched through its argsort, so every per-chunk field is a
+    plain array that ``save``/``load`` can memory-map. All arrays live in one ``_Columns`` tuple:
+    updates build new arrays and swap the tuple, so mapped snapshots stay read-only and a concurrent
+    ``search`` always reads one consistent version. The interned value table only ever grows.
+    """
+
+    DIRNAME = "chunk_store"
+
+    def __init__(self, documents: Optional[Dict[str, Document]] = None):
+        self._state = _Columns(np.zeros(0, dtype="S1"), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8),
+                               np.zeros(1, dtype=np.int64), (), {}, {})
+        self._values: List[Any] = []
+        self._value_codes: Dict[Any, int] = {}
+        self._lock = threading.Lock()  # serializes writers; readers never wait
+        if documents:
+            self.add(documents)
+
+    def __len__(self) -> int:
+        return len(self._state.ids)
+
+    def __copy__(self) -> "CompactDocstore":
+        # Shares the current arrays and value table; updates to either store only swap their own state
+        store = CompactDocstore()
+        store._state, store._values, store._value_codes = self._state, self._values, self._value_codes
+        return store
+
+    @staticmethod
+    def _row(state: _Columns, doc_id: str) -> Optional[int]:
+        """Row holding ``doc_id`` in ``state``, by binary search over the sorted ids"""
+        key = doc_id.encode("utf-8")
+        position = int(np.searchsorted(state.ids, key, sorter=state.order))
+        if position < len(state.order) and state.ids[state.order[position]] == key:
+            return int(state.order[position])
+        return None
+
+    def _intern(self, value: Any) -> int:
+        """Code of ``value`` in the shared value table, adding it on first sight"""
+        try:
+            key = (type(value), value)
+            hash(key)
+        except TypeError:
+            key = (type(value), json.dumps(value, sort_keys=True, default=str))
+        code = self._value_codes.get(key)
+        if code is None:
+            # Append before publishing the code, so a reader never sees a code past the table
+            self._values.append(value)
+            code = self._value_codes[key] = len(self._values) - 1
+        return code
+
+    def _encode(self, key: str, values: List[Any], rows: int, ints: Dict[str, np.ndarray],
+                codes: Dict[str, np.ndarray]):
+        """Append one metadata column's values for a batch of new rows to ``ints``/``codes``
+
+        ``rows`` is the number of existing rows; the column dicts are the new version's copies.
+        """
+        present = [value for value in values if value is not None]
+        if key not in ints and key not in codes:
+            if present and all(_is_int(value) for value in present):
+                ints[key] = np.full(rows, MISSING, dtype=np.int64)
+            else:
+                codes[key] = np.full(rows, -1, dtype=np.int32)
+        if key in ints and not all(_is_int(value) for value in present):
+            # A non-integer value arrived for an integer column; intern the column from here on
+            column = ints.pop(key)
+            codes[key] = np.array([-1 if v == MISSING else self._intern(int(v)) for v in column], dtype=np.int32)
+        if key in ints:
+            batch = np.array([MISSING if value is None else int(value) for value in values], dtype=np.int64)
+            ints[key] = np.concatenate([ints[key], batch])
+        else:
+            batch = np.array([-1 if value is None else self._intern(value) for value in values], dtype=np.int32)
+            codes[key] = np.concatenate([codes[key], batch])
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        """Append documents under their ids"""
+        with self._lock:
+            state = self._state
+            overlapping = {doc_id for doc_id in texts if self._row(state, doc_id) is not None}
+            if overlapping:
+                raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+            if not texts:
+                return
+            docs = list(texts.values())
+            encoded = [doc.page_content.encode("utf-8") for doc in docs]
+            lengths = np.fromiter((len(text) for text in encoded), dtype=np.int64, count=len(encoded))
+            offsets = np.concatenate([state.offsets, state.offsets[-1] + np.cumsum(lengths)])
+            buffer = np.concatenate([state.buffer, np.frombuffer(b"".join(encoded), dtype=np.uint8)])
+            new_keys = [key for key in dict.fromkeys(key for doc in docs for key in doc.metadata)
+                        if key not in state.keys]
+            keys = state.keys + tuple(new_keys)
+            ints, codes = dict(state.ints), dict(state.codes)
+            for key in keys:
+                self._encode(key, [doc.metadata.get(key) for doc in docs], len(state.ids), ints, codes)
+            ids = np.concatenate([state.ids, _encode_ids(list(texts))])
+            self._state = _columns(ids, buffer, offsets, keys, ints, codes)
+
+    def delete(self, ids: List) -> None:
+        """Drop documents by id, compacting the buffer and columns"""
+        with self._lock:
+            state = self._state
+            rows = [row for row in (self._row(state, doc_id) for doc_id in ids) if row is not None]
+            if not rows:
+                raise ValueError(f"Tried to delete ids that does not  exist: {ids}")
+            keep = np.ones(len(state.ids), dtype=bool)
+            keep[rows] = False
+            kept = np.flatnonzero(keep)
+            # Copy runs of consecutive kept rows as single slices
+            runs = np.split(kept, np.flatnonzero(np.diff(kept) != 1) + 1)
+            pieces = [state.buffer[state.offsets[run[0]]:state.offsets[run[-1] + 1]] for run in runs if len(run)]
+            buffer = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.uint8)
+            lengths = np.diff(state.offsets)[kept]
+            offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            self._state = _columns(
+                state.ids[kept], buffer, offsets, state.keys,
+                {key: column[kept] for key, column in state.ints.items()},
+                {key: column[kept] for key, column in state.codes.items()}
+            )
+
+    @staticmethod
+    def _text(state: _Columns, row: int) -> str:
+        return state.buffer[state.offsets[row]:state.offsets[row + 1]].tobytes().decode("utf-8")
+
+    def _metadata(self, state: _Columns, row: int) -> Dict[str, Any]:
+        metadata = {}
+        for key in state.keys:
+            if key in state.ints:
+                value = state.ints[key][row]
+                if value != MISSING:
+                    metadata[key] = int(value)
+            else:
+                code = state.codes[key][row]
+                if code >= 0:
+                    metadata[key] = self._values[code]
+        return metadata
+
+    def text(self, row: int) -> str:
+        """Chunk text of ``row``"""
+        return self._text(self._state, row)
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """Metadata dict of ``row``, rebuilt from the columns"""
+        return self._metadata(self._state, row)
+
+    def search(self, search: str) -> Union[str, Document]:
+        """Document stored under ``search``, or an error message like ``InMemoryDocstore``"""
+        state = self._state
+        row = self._row(state, search)
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=self._text(state, row), metadata=self._metadata(state, row))
+
+    def nbytes(self) -> int:
+        """Bytes held by the per-chunk arrays (text, offsets, ids and metadata columns)"""
+        state = self._state
+        arrays = [state.buffer, state.offsets, state.ids, state.order, *state.ints.values(), *state.codes.values()]
+        return sum(array.nbytes for array in arrays)
+
+    def save(self, directory: Path) -> Path:
+        """Write the store to ``directory/chunk_store`` as one ``.npy`` file per array"""
+        path = Path(directory) / self.DIRNAME
+        path.mkdir(parents=True, exist_ok=True)
+        state = self._state
+        for name in ("ids", "order", "buffer", "offsets"):
+            np.save(path / f"{name}.npy", getattr(state, name))
+        columns = []
+        for i, key in enumerate(state.keys):
+            kind = "int" if key in state.ints else "code"
+            np.save(path / f"column_{i}.npy", state.ints[key] if kind == "int" else state.codes[key])
+            columns.append((key, kind))
+        with open(path / "columns.pkl", "wb") as f:
+            pickle.dump({"columns": columns, "values": list(self._values)}, f)
+        return path
+
+    @classmethod
+    def load(cls, directory: Path, memory_map: bool = True) -> Optional["CompactDocstore"]:
+        """Load a store written by ``save`` (read-only memory maps by default), or None if there is none"""
+        path = Path(directory) / cls.DIRNAME
+        if not (path / "columns.pkl").exists():
+            return None
+        store = cls()
+        arrays = {name: _load_array(path / f"{name}.npy", memory_map) for name in ("ids", "order", "buffer", "offsets")}
+        # Written by save into our own index_dir, like the snapshot's index.pkl
+        with open(path / "columns.pkl", "rb") as f:
+            meta = pickle.load(f)
+        ints, codes = {}, {}
+        for i, (key, kind) in enumerate(meta["columns"]):
+            (ints if kind == "int" else codes)[key] = _load_array(path / f"column_{i}.npy", memory_map)
+        for value in meta["values"]:
+            store._intern(value)
+        store._state = _Columns(keys=tuple(key for key, _ in meta["columns"]), ints=ints, codes=codes, **arrays)
+        return store
+
+
+class ChunkIdMap(Mapping):
+    """FAISS id -> docstore id map over a sorted id array, saved and memory-mapped with the chunk store
+
+    Stands in for the ``index_to_docstore_id`` dict of a loaded snapshot; the incremental indexer
+    replaces it with a plain dict on its first update.
+    """
+
+    def __init__(self, faiss_ids: np.ndarray, doc_ids: np.ndarray):
+        self._faiss_ids = faiss_ids
+        self._doc_ids = doc_ids
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping) -> "ChunkIdMap":
+        """Copy of a FAISS id -> docstore id mapping"""
+        items = sorted(mapping.items())
+        return cls(np.array([i for i, _ in items], dtype=np.int64), _encode_ids([doc_id for _, doc_id in items]))
+
+    def __getitem__(self, faiss_id: int) -> str:
+        position = int(np.searchsorted(self._faiss_ids, faiss_id))
+        if position < len(self._faiss_ids) and self._faiss_ids[position] == faiss_id:
+            return self._doc_ids[position].decode("utf-8")
+        raise KeyError(faiss_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._faiss_ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._faiss_ids)
+
+    def items(self):
+        """(FAISS id, docstore id) pairs in FAISS id order, without a search per key"""
+        return zip(self._faiss_ids.tolist(), (doc_id.decode("utf-8") for doc_id in self._doc_ids))
+
+    def values(self):
+        """Docstore ids in FAISS id order"""
+        return (doc_id.decode("utf-8") for doc_id in self._doc_ids)
+
+    def save(self, directory: Path) -> Path:
+        """Write the map next to the chunk store in ``directory``"""
+        path = Path(directory) / CompactDocstore.DIRNAME
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "faiss_ids.npy", self._faiss_ids)
+        np.save(path / "faiss_doc_ids.npy", self._doc_ids)
+        return path
+
+    @classmethod
+    def load(cls, directory: Path, memory_map: bool = True) -> "ChunkIdMap":
+        """Load a map written by ``save``"""
+        path = Path(directory) / CompactDocstore.DIRNAME
+        return cls(_load_array(path / "faiss_ids.npy", memory_map), _load_array(path / "faiss_doc_ids.npy", memory_map))
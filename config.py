@@ -25,9 +25,11 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0", env="HOST")
     port: int = Field(default=8000, env="PORT")
     frontend_port: int = Field(default=8501, env="FRONTEND_PORT")
+    server_workers: int = Field(default=1, env="SERVER_WORKERS")  # uvicorn worker processes
     
     # Data settings
     data_path: str = Field(default="data", env="DATA_PATH")
+    index_path: str = Field(default="index_cache", env="INDEX_PATH")
     
     # RAG settings
     chunk_size: int = Field(default=800, env="CHUNK_SIZE")
@@ -35,6 +37,48 @@ class Settings(BaseSettings):
     model_name: str = Field(default="gpt-4o-mini", env="MODEL_NAME")
     temperature: float = Field(default=0.1, env="TEMPERATURE")
     max_tokens: int = Field(default=1000, env="MAX_TOKENS")
+    retrieval_strategy: str = Field(default="hybrid", env="RETRIEVAL_STRATEGY")  # dense, hybrid or lexical
+    fast_confidence_threshold: float = Field(default=0.5, env="FAST_CONFIDENCE_THRESHOLD")
+    
+    # Vector index settings
+    index_type: str = Field(default="flat", env="INDEX_TYPE")  # flat, ivf, hnsw or ivfpq
+    ivf_nlist: int = Field(default=0, env="IVF_NLIST")
+    ivf_nprobe: int = Field(default=8, env="IVF_NPROBE")
+    hnsw_m: int = Field(default=32, env="HNSW_M")
+    hnsw_ef_search: int = Field(default=64, env="HNSW_EF_SEARCH")
+    pq_m: int = Field(default=64, env="PQ_M")
+    vector_dtype: str = Field(default="float32", env="VECTOR_DTYPE")  # float32, float16 or int8
+    rerank_factor: int = Field(default=4, env="RERANK_FACTOR")
+    compact_docstore: bool = Field(default=False, env="COMPACT_DOCSTORE")
+    
+    # Index build settings
+    embedding_batch_size: int = Field(default=500, env="EMBEDDING_BATCH_SIZE")
+    embedding_max_retries: int = Field(default=6, env="EMBEDDING_MAX_RETRIES")
+    index_build_on_startup: bool = Field(default=True, env="INDEX_BUILD_ON_STARTUP")  # false: serve the published index only
+    index_sync_interval: float = Field(default=5.0, env="INDEX_SYNC_INTERVAL")  # 0: never reload published snapshots
+    
+    # Serving settings
+    agent_workers: int = Field(default=8, env="AGENT_WORKERS")
+    agent_max_queue: int = Field(default=64, env="AGENT_MAX_QUEUE")
+    async_agents: bool = Field(default=True, env="ASYNC_AGENTS")
+    agent_max_async: int = Field(default=256, env="AGENT_MAX_ASYNC")
+    
+    # Semantic answer cache settings
+    answer_cache_enabled: bool = Field(default=True, env="ANSWER_CACHE_ENABLED")
+    answer_cache_threshold: float = Field(default=0.95, env="ANSWER_CACHE_THRESHOLD")
+    answer_cache_ttl: float = Field(default=3600, env="ANSWER_CACHE_TTL")
+    answer_cache_size: int = Field(default=1000, env="ANSWER_CACHE_SIZE")
+    
+    # Batch query settings
+    batch_max_concurrency: int = Field(default=8, env="BATCH_MAX_CONCURRENCY")
+    batch_max_questions: int = Field(default=1000, env="BATCH_MAX_QUESTIONS")
+    batch_dedupe_threshold: float = Field(default=0.97, env="BATCH_DEDUPE_THRESHOLD")
+    
+    # Evaluation settings
+    evaluation_workers: int = Field(default=1, env="EVALUATION_WORKERS")
+    metrics_path: str = Field(default="metrics", env="METRICS_PATH")
+    ragas_cache_path: str = Field(default="metrics/.ragas_cache", env="RAGAS_CACHE_PATH")
+    ragas_max_concurrency: int = Field(default=4, env="RAGAS_MAX_CONCURRENCY")
     
     # Logging settings
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -60,6 +104,37 @@ def get_data_path() -> Path:
     return data_path.resolve()
 
 
+def get_index_path() -> Path:
+    """Get the directory holding persisted FAISS index snapshots"""
+    index_path = Path(settings.index_path)
+    if not index_path.is_absolute():
+        index_path = Path(__file__).parent / index_path
+    return index_path.resolve()
+
+
+def get_rag_config():
+    """RAG pipeline configuration from the settings, shared by the API, the index CLI and evaluation"""
+    from rag_components import RAGConfig
+    index_path = get_index_path()
+    return RAGConfig(
+        index_dir=str(index_path),
+        embedding_cache_dir=str(index_path / "embedding_cache"),
+        retrieval_strategy=settings.retrieval_strategy,
+        fast_confidence_threshold=settings.fast_confidence_threshold,
+        index_type=settings.index_type,
+        ivf_nlist=settings.ivf_nlist,
+        ivf_nprobe=settings.ivf_nprobe,
+        hnsw_m=settings.hnsw_m,
+        hnsw_ef_search=settings.hnsw_ef_search,
+        pq_m=settings.pq_m,
+        vector_dtype=settings.vector_dtype,
+        rerank_factor=settings.rerank_factor,
+        compact_docstore=settings.compact_docstore,
+        embedding_batch_size=settings.embedding_batch_size,
+        embedding_max_retries=settings.embedding_max_retries
+    )
+
+
 def get_project_root() -> Path:
     """Get the project root directory"""
     return Path(__file__).parent.resolve()
@@ -0,0 +1,210 @@
+"""
+Embedding Cache Module
+Caching wrapper around an embeddings client backed by a memory-mapped vector file
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows: run one process per cache directory
+    fcntl = None
+
+
+class CachedEmbeddings(Embeddings):
+    """Text-hash -> vector cache with LRU eviction, shared by indexing and query paths
+
+    Vectors live in ``vectors.f32`` (a float32 memmap of ``max_entries`` rows) and
+    ``index.json`` maps text hashes to rows in least- to most-recently-used order.
+    The row map is private to the process, so each process holds a file lock on the
+    directory it uses: the first takes ``cache_dir``, others (uvicorn workers, the index
+    CLI) take the first free ``cache_dir/worker-N``, which a restarted worker reuses warm.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_dir: str, max_entries: int = 50_000,
+                 flush_interval: float = 5.0):
+        self.embeddings = embeddings
+        self._claim = None
+        self.cache_dir = self._claim_directory(Path(cache_dir))
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._slots: OrderedDict[str, int] = OrderedDict()
+        self._vectors: Optional[np.memmap] = None
+        self._dimension: Optional[int] = None
+        self._dirty = False
+        self._last_flush = time.time()
+        self._load()
+        atexit.register(self.flush)
+
+    @property
+    def model(self) -> str:
+        """Model name of the wrapped embeddings client"""
+        return getattr(self.embeddings, "model", None) or type(self.embeddings).__name__
+
+    def _claim_directory(self, base: Path) -> Path:
+        """Pick ``base`` or the first ``base/worker-N`` no other live process (or instance) has locked"""
+        base.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            return base
+        worker = 0
+        while True:
+            path = base if worker == 0 else base / f"worker-{worker}"
+            path.mkdir(exist_ok=True)
+            claim = open(path / ".lock", "w")
+            try:
+                # Held until close() or process exit; flock is per open file, so it also
+                # keeps two instances in one process apart
+                fcntl.flock(claim, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                claim.close()
+                worker += 1
+                continue
+            self._claim = claim
+            return path
+
+    def _key(self, text: str) -> str:
+        return hashlib.blake2b(f"{self.model}\0{text}".encode(), digest_size=16).hexdigest()
+
+    def _open_vectors(self, dimension: int, mode: str):
+        self._dimension = dimension
+        self._vectors = np.memmap(
+            self.cache_dir / "vectors.f32", dtype=np.float32, mode=mode,
+            shape=(self.max_entries, dimension)
+        )
+
+    def _load(self):
+        """Reopen an existing cache; a cache written for another model or size starts empty"""
+        index_path = self.cache_dir / "index.json"
+        if not index_path.exists() or not (self.cache_dir / "vectors.f32").exists():
+            return
+        try:
+            meta = json.loads(index_path.read_text())
+        except (OSError, ValueError):
+            return
+        if meta.get("model") != self.model or meta.get("max_entries") != self.max_entries:
+            return
+        self._open_vectors(meta["dimension"], "r+")
+        self._slots = OrderedDict((key, slot) for key, slot in meta["entries"])
+
+    def flush(self):
+        """Write pending vectors and the LRU index to disk"""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Flush and release the cache directory for another process or instance"""
+        with self._lock:
+            self._flush_locked()
+            if self._claim is not None:
+                self._claim.close()
+                self._claim = None
+        atexit.unregister(self.flush)
+
+    def _flush_locked(self):
+        if not self._dirty or self._vectors is None:
+            return
+        self._vectors.flush()
+        meta = {
+            "model": self.model,
+            "dimension": self._dimension,
+            "max_entries": self.max_entries,
+            "entries": list(self._slots.items()),
+        }
+        tmp_path = self.cache_dir / "index.json.tmp"
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.cache_dir / "index.json")
+        self._dirty = False
+        self._last_flush = time.time()
+
+    def _store(self, key: str, vector: List[float]):
+        if self._vectors is None:
+            self._open_vectors(len(vector), "w+")
+        if key in self._slots:
+            slot = self._slots[key]
+            self._slots.move_to_end(key)
+        elif len(self._slots) < self.max_entries:
+            slot = len(self._slots)
+            self._slots[key] = slot
+        else:
+            # Evict the least recently used entry and reuse its row
+            _, slot = self._slots.popitem(last=False)
+            self._slots[key] = slot
+        self._vectors[slot] = vector
+        self._dirty = True
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[Optional[List[float]]], Dict[str, List[int]]]:
+        """Fill cached vectors and group the misses by key"""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                slot = self._slots.get(key)
+                if slot is not None:
+                    self._slots.move_to_end(key)
+                    results[i] = self._vectors[slot].tolist()
+                    self.hits += 1
+                else:
+                    pending.setdefault(key, []).append(i)
+                    self.misses += 1
+        return results, pending
+
+    def _insert(self, results: List[Optional[List[float]]], pending: Dict[str, List[int]],
+                vectors: List[List[float]]):
+        with self._lock:
+            for (key, positions), vector in zip(pending.items(), vectors):
+                self._store(key, vector)
+                for i in positions:
+                    results[i] = list(vector)
+            if time.time() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sending only uncached (and de-duplicated) texts to the wrapped client"""
+        results, pending = self._lookup(texts)
+        if pending:
+            missing_texts = [texts[positions[0]] for positions in pending.values()]
+            self._insert(results, pending, self.embeddings.embed_documents(missing_texts))
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query through the same cache as documents"""
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async variant using the wrapped client's native async embedding call"""
+        results, pending = self._lookup(texts)
+        if pending:
+            missing_texts = [texts[positions[0]] for positions in pending.values()]
+            self._insert(results, pending, await self.embeddings.aembed_documents(missing_texts))
+        return results
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Async query embedding through the same cache"""
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._slots),
+            "max_entries": self.max_entries,
+            "directory": str(self.cache_dir),
+        }
@@ -0,0 +1,68 @@
+"""
+Evaluation Cache Module
+On-disk cache of per-sample metric scores so unchanged samples are never re-scored
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class ScoreCache:
+    """(metric, question, answer, contexts, reference, judge model) -> score, kept in ``scores.json``"""
+
+    def __init__(self, cache_dir: str, judge_model: str = ""):
+        self.cache_dir = Path(cache_dir)
+        self.judge_model = judge_model
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._scores: Dict[str, float] = {}
+        path = self.cache_dir / "scores.json"
+        if path.exists():
+            try:
+                self._scores = json.loads(path.read_text())
+            except (OSError, ValueError):
+                self._scores = {}
+
+    def key(self, metric: str, question: str, answer: str, contexts: List[str], reference: str) -> str:
+        """Content hash identifying one metric on one sample"""
+        payload = json.dumps([self.judge_model, metric, question, answer, list(contexts), reference])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[float]:
+        """Return the cached score, or None"""
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return score
+
+    def put(self, key: str, score: Any):
+        """Cache a score; missing or NaN scores (failed judgements) are not cached"""
+        if score is None or score != score:
+            return
+        with self._lock:
+            self._scores[key] = float(score)
+            self._dirty = True
+
+    def flush(self):
+        """Write new scores to disk"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_dir / "scores.json.tmp"
+            tmp_path.write_text(json.dumps(self._scores))
+            os.replace(tmp_path, self.cache_dir / "scores.json")
+            self._dirty = False
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and size"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._scores)}
@@ -5,9 +5,11 @@ Interactive web interface for the RAG system
 
 import streamlit as st
 import requests
+import csv
+import io
 import time
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # Page configuration
 st.set_page_config(
@@ -391,6 +393,149 @@ def query_rag(question: str, agent_type: str) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Connection Error: {str(e)}"}
 
+def stream_events(path: str, payload: Dict[str, Any]):
+    """Yield the server-sent events of a streaming POST endpoint, or one error event"""
+    try:
+        with requests.post(f"{API_BASE_URL}{path}", json=payload, stream=True) as response:
+            if response.status_code != 200:
+                yield {"event": "error", "error": f"API Error: {response.status_code} - {response.text}"}
+                return
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data: "):
+                    yield json.loads(line[len("data: "):])
+    except Exception as e:
+        yield {"event": "error", "error": f"Connection Error: {str(e)}"}
+
+def stream_query(question: str, agent_type: str):
+    """Yield server-sent events from the streaming query endpoint"""
+    return stream_events("/query/stream", {"question": question, "agent_type": agent_type})
+
+def stream_batch(questions: List[str], agent_type: str):
+    """Yield server-sent events from the batch query endpoint"""
+    return stream_events("/query/batch", {"questions": questions, "agent_type": agent_type})
+
+def parse_questions(text: str, is_csv: bool = False) -> List[str]:
+    """Questions from pasted or uploaded text: one per line, or one per CSV row
+    
+    CSV rows use their ``question`` column when the header has one, else their first non-empty cell.
+    """
+    if not is_csv:
+        return [line.strip() for line in text.splitlines() if line.strip()]
+    rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+    header = [cell.strip().lower() for cell in rows[0]] if rows else []
+    if "question" in header:
+        column = header.index("question")
+        return [row[column].strip() for row in rows[1:] if column < len(row) and row[column].strip()]
+    return [next(cell.strip() for cell in row if cell.strip()) for row in rows]
+
+def answers_csv(rows: List[Dict[str, Any]]) -> str:
+    """Render the batch results table as CSV text"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows({column: "" if value is None else value for column, value in row.items()} for row in rows)
+    return output.getvalue()
+
+def render_batch(questions: List[str], agent_type: str):
+    """Answer a questionnaire through /query/batch, filling the results table as answers arrive"""
+    progress = st.progress(0.0, text=f"Answering {len(questions)} questions...")
+    table = st.empty()
+    rows = [{"Question": q, "Answer": "", "Sources": "", "Time (s)": None} for q in questions]
+    
+    for event in stream_batch(questions, agent_type):
+        if event["event"] == "result":
+            rows[event["index"]].update({
+                "Answer": event.get("error") or event["answer"],
+                "Sources": ", ".join(source.split('/')[-1] for source in event["sources"]),
+                "Time (s)": round(event["question_time"], 2)
+            })
+            completed = sum(1 for row in rows if row["Time (s)"] is not None)
+            progress.progress(completed / len(questions), text=f"Answered {completed}/{len(questions)}")
+            table.dataframe(rows, use_container_width=True)
+        elif event["event"] == "done":
+            progress.progress(1.0, text="✅ Done")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Time", f"{event['elapsed']:.1f}s")
+            with col2:
+                st.metric("Throughput", f"{event['throughput']:.2f} q/s")
+            with col3:
+                st.metric("Unique Questions", f"{event['unique_questions']}/{event['total_questions']}")
+            st.download_button("⬇️ Download answers (CSV)", answers_csv(rows),
+                               file_name="rfp_answers.csv", mime="text/csv")
+        elif event["event"] == "error":
+            st.error(f"❌ {event['error']}")
+
+def render_result(result: Dict[str, Any], api_time: float, show_answer: bool = True):
+    """Render the answer, metrics, sources and timings of a completed query"""
+    # Display results
+    st.success("✅ Answer Generated!")
+    
+    # Answer
+    if show_answer:
+        st.subheader("💬 Answer")
+        st.markdown(result["answer"])
+    
+    # Metrics in main area
+    st.subheader("📊 Response Metrics")
+    
+    col_metrics1, col_metrics2, col_metrics3, col_metrics4 = st.columns(4)
+    with col_metrics1:
+        st.metric("Response Time", f"{result['response_time']:.2f}s")
+    with col_metrics2:
+        st.metric("Agent Type", result["agent_type"].title())
+    with col_metrics3:
+        st.metric("Sources Used", len(result["sources"]))
+    with col_metrics4:
+        st.metric("Model", result["model"])
+    
+    # Sources
+    st.subheader("📚 Sources")
+    for i, source in enumerate(result["sources"], 1):
+        st.markdown(f"{i}. `{source.split('/')[-1]}`")
+    
+    # Performance details
+    st.subheader("⚡ Performance Details")
+    if result.get("time_to_first_token") is not None:
+        col_perf1, col_perf2, col_perf3, col_perf4 = st.columns(4)
+        with col_perf4:
+            st.metric("Time to First Token", f"{result['time_to_first_token']:.2f}s")
+    else:
+        col_perf1, col_perf2, col_perf3 = st.columns(3)
+    with col_perf1:
+        st.metric("Total Time", f"{api_time:.2f}s")
+    with col_perf2:
+        st.metric("API Time", f"{result['response_time']:.2f}s")
+    with col_perf3:
+        st.metric("Overhead", f"{api_time - result['response_time']:.2f}s")
+
+def render_streamed_query(question: str, agent_type: str):
+    """Render agent steps and answer tokens as they arrive from /query/stream"""
+    status = st.status("🤖 Thinking...", expanded=False)
+    st.subheader("💬 Answer")
+    answer_placeholder = st.empty()
+    answer = ""
+    start_time = time.time()
+    
+    for event in stream_query(question, agent_type):
+        if event["event"] == "tool":
+            status.update(label=f"🔧 Using {event['tool']}...")
+            status.write(f"🔧 `{event['tool']}` at {event['elapsed']:.2f}s")
+        elif event["event"] == "retrieval":
+            status.write(f"📄 Retrieved {event['documents']} documents from {len(event['sources'])} sources")
+        elif event["event"] == "token":
+            if not answer:
+                status.update(label="✍️ Writing answer...")
+            answer += event["text"]
+            answer_placeholder.markdown(answer + "▌")
+        elif event["event"] == "done":
+            status.update(label="✅ Done", state="complete")
+            answer_placeholder.markdown(event["answer"])
+            render_result(event, time.time() - start_time, show_answer=False)
+        elif event["event"] == "error":
+            status.update(label="❌ Failed", state="error")
+            st.error(f"❌ {event.get('error') or event.get('answer')}")
+
 # Main UI
 def main():
     # SolvIQ Header with new branding
@@ -459,10 +604,12 @@ def main():
         else:
             selected_agent = st.selectbox(
                 "Choose RAG Agent:",
-                options=["standard", "advanced", "conservative"],
+                options=["standard", "advanced", "conservative", "fast", "auto"],
                 index=1
             )
         
+        stream_responses = st.toggle("⚡ Stream responses", value=True)
+        
         st.divider()
         
         # Features section moved to sidebar
@@ -557,52 +704,31 @@ def main():
         # Submit button
         if st.button("✨ Work your magic", type="primary", disabled=not question.strip()):
             if question.strip():
-                with st.spinner("🤖 Thinking..."):
-                    start_time = time.time()
-                    result = query_rag(question, selected_agent)
-                    end_time = time.time()
-                
-                if "error" in result:
-                    st.error(f"❌ {result['error']}")
+                if stream_responses:
+                    render_streamed_query(question, selected_agent)
                 else:
-                    # Display results
-                    st.success("✅ Answer Generated!")
-                    
-                    # Answer
-                    st.subheader("💬 Answer")
-                    st.markdown(result["answer"])
+                    with st.spinner("🤖 Thinking..."):
+                        start_time = time.time()
+                        result = query_rag(question, selected_agent)
+                        end_time = time.time()
                     
-                    # Metrics in main area
-                    st.subheader("📊 Response Metrics")
-                    
-                    col_metrics1, col_metrics2, col_metrics3, col_metrics4 = st.columns(4)
-                    with col_metrics1:
-                        st.metric("Response Time", f"{result['response_time']:.2f}s")
-                    with col_metrics2:
-                        st.metric("Agent Type", result["agent_type"].title())
-                    with col_metrics3:
-                        st.metric("Sources Used", len(result["sources"]))
-                    with col_metrics4:
-                        st.metric("Model", result["model"])
-                    
-                    # Sources
-                    st.subheader("📚 Sources")
-                    for i, source in enumerate(result["sources"], 1):
-                        st.markdown(f"{i}. `{source.split('/')[-1]}`")
-                    
-                    # Performance details
-                    st.subheader("⚡ Performance Details")
-                    api_time = end_time - start_time
-                    col_perf1, col_perf2, col_perf3 = st.columns(3)
-                    with col_perf1:
-                        st.metric("Total Time", f"{api_time:.2f}s")
-                    with col_perf2:
-                        st.metric("API Time", f"{result['response_time']:.2f}s")
-                    with col_perf3:
-                        st.metric("Overhead", f"{api_time - result['response_time']:.2f}s")
+                    if "error" in result:
+                        st.error(f"❌ {result['error']}")
+                    else:
+                        render_result(result, end_time - start_time)
                     
             else:
                 st.warning("Please enter a question.")
+        
+        # Whole questionnaires are answered concurrently by the batch endpoint
+        with st.expander("📋 Answer a full RFP questionnaire"):
+            uploaded = st.file_uploader("Questions file (one per line, or a CSV with a question column)",
+                                        type=["txt", "csv"])
+            pasted = st.text_area("...or paste questions, one per line", height=150)
+            text = uploaded.getvalue().decode("utf-8-sig") if uploaded else pasted
+            batch_questions = parse_questions(text, is_csv=bool(uploaded) and uploaded.name.lower().endswith(".csv"))
+            if st.button(f"📋 Answer {len(batch_questions)} questions", disabled=not batch_questions):
+                render_batch(batch_questions, selected_agent)
     
 
 # Footer
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Offline index builds for SolvIQ: ingest, chunk and embed the data directory into a versioned snapshot
+that the API (INDEX_BUILD_ON_STARTUP=false) and the evaluation runner load without embedding anything
+
+Commands:
+  build   Build the snapshot for the data directory (if it is not already there) and publish it
+  update  Re-embed only the chunks of changed files into the published snapshot and publish the result
+  stats   Show the published (or --key) snapshot's manifest, files and the other snapshots on disk
+  verify  Check a snapshot's files, counts and ids, and that sampled chunks retrieve themselves
+
+Usage: python -m index_cli build [--data data] [--index-dir index_cache] [--force]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from langchain.schema import Document
+
+from rag_components import DocumentProcessor, IncrementalIndexer, VectorStoreManager
+
+
+def build(args, manager: VectorStoreManager, processor: DocumentProcessor) -> int:
+    """Build and publish the snapshot matching the data directory"""
+    start = time.time()
+    documents = processor.load_documents()
+    if not documents:
+        print(f"❌ No documents found in {processor.data_path}")
+        return 1
+    key = manager.snapshot_key(documents)
+    if args.force:
+        shutil.rmtree(manager.index_dir / key, ignore_errors=True)
+    built = manager.read_manifest(key) is None
+    # Shares the API's build lock, so a server starting on the same index_dir waits instead of embedding too
+    vectorstore, _ = manager.load_or_create_indexes(documents, processor)
+    if built:
+        print(f"✅ Built snapshot {key} ({vectorstore.index.ntotal} chunks) in {time.time() - start:.1f}s")
+    else:
+        manager.publish(key)
+        print(f"✅ Snapshot {key} is up to date ({vectorstore.index.ntotal} chunks)")
+    return 0
+
+
+def update(args, manager: VectorStoreManager, processor: DocumentProcessor) -> int:
+    """Apply data directory changes to the published snapshot, embedding only new chunks"""
+    indexes = manager.load_published_indexes(mmap=False)
+    if indexes is None:
+        print(f"❌ No published index in {manager.index_dir}; run `build` first")
+        return 1
+    vectorstore, sparse_index = indexes
+    stats = IncrementalIndexer(vectorstore, processor, manager, sparse_index, manager.published_key()).refresh()
+    if stats["chunks_embedded"] or stats["chunks_deleted"]:
+        print(f"✅ Published snapshot {manager.published_key()}: +{stats['chunks_embedded']} / "
+              f"-{stats['chunks_deleted']} chunks ({stats['total_vectors']} total) in {stats['elapsed']:.1f}s")
+    else:
+        print(f"✅ Snapshot {manager.published_key()} is up to date ({stats['total_vectors']} chunks)")
+    return 0
+
+
+def _snapshot_key(args, manager: VectorStoreManager) -> Optional[str]:
+    key = args.key or manager.published_key()
+    if key is None or manager.read_manifest(key) is None:
+        print(f"❌ No snapshot {key or '(nothing published)'} in {manager.index_dir}")
+        return None
+    return key
+
+
+def _file_sizes(path: Path) -> Dict[str, int]:
+    return {str(f.relative_to(path)): f.stat().st_size for f in sorted(path.rglob("*")) if f.is_file()}
+
+
+def stats(args, manager: VectorStoreManager, processor: DocumentProcessor) -> int:
+    """Print the manifest and on-disk size of a snapshot, and list every snapshot in index_dir"""
+    key = _snapshot_key(args, manager)
+    if key is None:
+        return 1
+    files = _file_sizes(manager.index_dir / key)
+    published = manager.published_key()
+    snapshots = {
+        path.name: manager.read_manifest(path.name)
+        for path in sorted(manager.index_dir.iterdir())
+        if path.is_dir() and (path / "manifest.json").exists()
+    }
+    if args.json:
+        print(json.dumps({"key": key, "published": key == published, "manifest": manager.read_manifest(key),
+                          "files": files, "snapshots": sorted(snapshots)}, indent=2))
+        return 0
+
+    print(f"\n📊 SNAPSHOT {key}{' (published)' if key == published else ''}")
+    print("=" * 60)
+    for name, value in manager.read_manifest(key).items():
+        print(f"{name:<18}{value}")
+    print(f"\n{'file':<40}{'MB':>10}")
+    for name, size in files.items():
+        print(f"{name:<40}{size / 2 ** 20:>10.2f}")
+    print(f"{'total':<40}{sum(files.values()) / 2 ** 20:>10.2f}")
+    print(f"\n🗂️ {len(snapshots)} snapshot(s) in {manager.index_dir}")
+    for name, manifest in snapshots.items():
+        marker = "📌" if name == published else "  "
+        print(f"{marker} {name}  {manifest.get('created', '?'):<20}{manifest.get('num_vectors', '?'):>9} vectors  "
+              f"{manifest.get('index_type', '?')}/{manifest.get('vector_dtype', 'float32')}")
+    return 0
+
+
+def _self_retrieval(manager: VectorStoreManager, vectorstore, sparse_index, docs: List[Tuple[str, Document]],
+                    k: int) -> Tuple[int, int]:
+    """How many sampled chunks find themselves in their own top ``k`` (dense, BM25)"""
+    texts = [doc.page_content for _, doc in docs]
+    dense_hits = manager.batch_similarity_search_with_score(vectorstore, texts, k=k)
+    dense = sparse = 0
+    for (doc_id, doc), hits in zip(docs, dense_hits):
+        # Repeated boilerplate chunks count as found when an identical chunk ranks instead
+        dense += any(hit.id == doc_id or hit.page_content == doc.page_content for hit, _ in hits)
+        sparse += doc_id in {hit_id for hit_id, _ in sparse_index.search(doc.page_content, k=k)}
+    return dense, sparse
+
+
+def verify(args, manager: VectorStoreManager, processor: DocumentProcessor) -> int:
+    """Check that a snapshot loads, is internally consistent and retrieves its own chunks"""
+    key = _snapshot_key(args, manager)
+    if key is None:
+        return 1
+    manifest = manager.read_manifest(key)
+    checks: List[Tuple[str, bool, str]] = []
+
+    def check(name: str, ok: bool, detail: str = ""):
+        checks.append((name, ok, detail))
+        print(f"{'✅' if ok else '❌'} {name}{': ' + detail if detail else ''}")
+
+    version = manifest.get("format_version", 1)
+    check("format version", version <= manager.SNAPSHOT_FORMAT, f"{version} (reader supports {manager.SNAPSHOT_FORMAT})")
+    model = manifest.get("embedding_model")
+    check("embedding model", model == manager.embedding_model, f"{model} (configured {manager.embedding_model})")
+    try:
+        vectorstore = manager.load_snapshot(key)
+        sparse_index = manager.load_sparse_index(key)
+    except Exception as e:
+        check("load", False, str(e))
+        return 1
+    check("load", vectorstore is not None and sparse_index is not None)
+    if vectorstore is None or sparse_index is None:
+        return 1
+
+    ntotal = vectorstore.index.ntotal
+    check("vector count", ntotal == manifest.get("num_vectors"), f"{ntotal} (manifest {manifest.get('num_vectors')})")
+    check("dimension", vectorstore.index.d == manifest.get("dimension"), str(vectorstore.index.d))
+    doc_ids = list(vectorstore.index_to_docstore_id.values())
+    missing = sum(not isinstance(vectorstore.docstore.search(doc_id), Document) for doc_id in doc_ids)
+    check("docstore ids", len(doc_ids) == ntotal and missing == 0, f"{len(doc_ids)} mapped, {missing} missing")
+    check("sparse index", len(sparse_index) == ntotal, f"{len(sparse_index)} documents")
+
+    sample = min(args.sample, len(doc_ids))
+    if sample:
+        step = len(doc_ids) / sample
+        docs = [(doc_ids[int(i * step)], vectorstore.docstore.search(doc_ids[int(i * step)])) for i in range(sample)]
+        dense, sparse = _self_retrieval(manager, vectorstore, sparse_index, docs, args.k)
+        check(f"dense self-retrieval@{args.k}", dense == sample, f"{dense}/{sample}")
+        check(f"sparse self-retrieval@{args.k}", sparse == sample, f"{sparse}/{sample}")
+
+    failed = [name for name, ok, _ in checks if not ok]
+    print(f"\n{'❌' if failed else '✅'} Snapshot {key}: {len(checks) - len(failed)}/{len(checks)} checks passed")
+    return 1 if failed else 0
+
+
+COMMANDS = {"build": build, "update": update, "stats": stats, "verify": verify}
+
+
+def parser() -> argparse.ArgumentParser:
+    """Command line for every ``COMMANDS`` entry"""
+    parser = argparse.ArgumentParser(prog="solviq-index", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="Data directory (default: DATA_PATH)")
+    parser.add_argument("--index-dir", help="Snapshot directory (default: INDEX_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="Build and publish the snapshot for the data directory").add_argument(
+        "--force", action="store_true", help="Rebuild even if the snapshot already exists")
+    commands.add_parser("update", help="Re-embed changed files into the published snapshot")
+    for name, help_text in (("stats", "Show a snapshot's manifest and files"),
+                            ("verify", "Check a snapshot's consistency and retrieval")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--key", help="Snapshot key (default: the published one)")
+        if name == "stats":
+            command.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+        else:
+            command.add_argument("--sample", type=int, default=20, help="Chunks to query for themselves; 0 skips")
+            command.add_argument("--k", type=int, default=5)
+    return parser
+
+
+def run(args, manager: VectorStoreManager, processor: DocumentProcessor) -> int:
+    """Run the parsed command against ``manager``'s index_dir and ``processor``'s data directory"""
+    return COMMANDS[args.command](args, manager, processor)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of ``solviq-index``, configured like the API from the environment"""
+    args = parser().parse_args(argv)
+    from config import get_data_path, get_rag_config
+    config = get_rag_config()
+    if args.index_dir:
+        index_dir = Path(args.index_dir).resolve()
+        config = replace(config, index_dir=str(index_dir), embedding_cache_dir=str(index_dir / "embedding_cache"))
+    manager = VectorStoreManager(config)
+    processor = DocumentProcessor(args.data or str(get_data_path()), config)
+    try:
+        return run(args, manager, processor)
+    finally:
+        if hasattr(manager.embeddings, "flush"):
+            manager.embeddings.flush()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
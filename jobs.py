@@ -0,0 +1,125 @@
+"""
+Background Jobs Module
+Runs long API operations as asyncio tasks that clients poll for progress and results
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """State of one background job; ``results`` grows while it runs"""
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str = QUEUED
+    total: Optional[int] = None
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    summary: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def to_dict(self, offset: int = 0) -> Dict[str, Any]:
+        """Serializable view with results from ``offset`` on, for incremental polling"""
+        end = self.finished or time.time()
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "completed": len(self.results),
+            "total": self.total,
+            "results": self.results[offset:],
+            "next_offset": len(self.results),
+            "summary": self.summary,
+            "error": self.error,
+            "created": self.created,
+            "elapsed": end - self.started if self.started else 0.0,
+        }
+
+
+class JobManager:
+    """Runs jobs on the event loop, ``max_running`` at a time, keeping the last ``max_jobs``"""
+
+    def __init__(self, max_running: int = 2, max_jobs: int = 100):
+        self.max_running = max_running
+        self.max_jobs = max_jobs
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def submit(self, kind: str, params: Dict[str, Any], run: Callable[[Job], Awaitable[Any]]) -> Job:
+        """Schedule ``run(job)``; its return value becomes ``job.summary``"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_running)
+        job = Job(job_id=uuid.uuid4().hex, kind=kind, params=params)
+        self._jobs[job.job_id] = job
+        self._evict()
+        job.task = asyncio.create_task(self._run(job, run))
+        return job
+
+    async def _run(self, job: Job, run: Callable[[Job], Awaitable[Any]]):
+        try:
+            async with self._slots:
+                job.status = RUNNING
+                job.started = time.time()
+                job.summary = await run(job)
+                job.status = COMPLETED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        while len(self._jobs) > self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id"""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation of a queued or running job"""
+        job = self._jobs.get(job_id)
+        if job is not None and job.status not in FINISHED and job.task is not None:
+            job.task.cancel()
+        return job
+
+    def list(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Status of known jobs, newest first, without their results"""
+        return [
+            {k: v for k, v in job.to_dict().items() if k != "results"}
+            for job in reversed(self._jobs.values())
+            if kind is None or job.kind == kind
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        """Job counts by status"""
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def shutdown(self):
+        """Cancel every unfinished job"""
+        for job in self._jobs.values():
+            if job.status not in FINISHED and job.task is not None:
+                job.task.cancel()
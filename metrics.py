@@ -0,0 +1,150 @@
+"""
+Metrics Module
+In-process request counters and Prometheus text exposition for the /metrics endpoint
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tracing import Histogram
+
+Labels = Dict[str, Any]
+
+
+class RequestMetrics:
+    """HTTP and per-agent answer counters, updated with a lock-protected increment per event
+
+    Everything else exported by /metrics (caches, pools, index size, stage timings) is read
+    from the owning components at scrape time, so it costs nothing on the request path.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.answers: Dict[Tuple[str, str], int] = {}
+        self.answer_latency: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def request_started(self):
+        """Count a request as in flight"""
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, seconds: float):
+        """Record a completed HTTP request under its route template"""
+        with self._lock:
+            self.in_flight -= 1
+            key = (method, route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.request_latency.get((method, route))
+            if histogram is None:
+                histogram = self.request_latency[(method, route)] = Histogram()
+        histogram.observe(seconds)
+
+    def answer_finished(self, agent_type: str, seconds: float, error: bool = False, cached: bool = False):
+        """Record one answered question; ``outcome`` is error, cached or computed"""
+        outcome = "error" if error else "cached" if cached else "computed"
+        with self._lock:
+            key = (agent_type, outcome)
+            self.answers[key] = self.answers.get(key, 0) + 1
+            histogram = self.answer_latency.get(agent_type)
+            if histogram is None:
+                histogram = self.answer_latency[agent_type] = Histogram()
+        histogram.observe(seconds)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request, including streamed bodies"""
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.request_started()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Route templates keep label cardinality bounded (/query/batch/jobs/{job_id})
+            route = scope.get("route")
+            self.metrics.request_finished(scope["method"], getattr(route, "path", "unmatched"), status,
+                                          time.perf_counter() - start)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Exposition:
+    """Builds a Prometheus text-format (0.0.4) document"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, prefix: str = "solviq_"):
+        self.prefix = prefix
+        self._lines: List[str] = []
+
+    def _header(self, name: str, kind: str, help_text: str) -> str:
+        name = self.prefix + name
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def counter(self, name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]):
+        """Add a counter family; ``name`` should end in ``_total``"""
+        name = self._header(name, "counter", help_text)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[Tuple[Labels, float]]):
+        """Add a gauge family"""
+        name = self._header(name, "gauge", help_text)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[Tuple[Labels, Histogram]]):
+        """Add a histogram family with cumulative ``_bucket``, ``_sum`` and ``_count`` series"""
+        name = self._header(name, "histogram", help_text)
+        for labels, histogram in samples:
+            snapshot = histogram.snapshot()
+            for bound, count in snapshot["buckets"].items():
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                self._lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+            self._lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'])}")
+            self._lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+
+    def text(self) -> str:
+        """Render the document, newline-terminated"""
+        return "\n".join(self._lines) + "\n"
+
+
+def single(value: Optional[float]) -> List[Tuple[Labels, float]]:
+    """One unlabelled sample, or none when the source is unavailable"""
+    return [] if value is None else [({}, value)]
@@ -0,0 +1,130 @@
+"""
+Overlap Metrics Module
+Vectorized, LLM-free evaluation metrics computed from sparse binary term matrices
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+# Alphanumeric words: every other byte (punctuation, whitespace, non-ASCII) separates terms;
+# NUL is kept as the end-of-text marker
+_SEPARATORS = bytes(c if 48 <= c <= 57 or 97 <= c <= 122 or c == 0 else 32 for c in range(256))
+
+
+def _distinct(keys: np.ndarray) -> np.ndarray:
+    """Sorted unique keys (sort-based; faster than ``np.unique``'s hashing on large int arrays)"""
+    keys = np.sort(keys)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+class TermSets:
+    """Distinct terms of a set of texts as a sorted COO matrix of ``row * vocab_size + term`` keys
+
+    Each distinct text is tokenized once, so contexts retrieved for many questions cost
+    nothing extra. ``offsets[r]:offsets[r + 1]`` slices ``keys`` for text ``r``.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.index: Dict[str, int] = dict.fromkeys(texts)
+        for row, text in enumerate(self.index):
+            self.index[text] = row
+
+        # One byte-level pass over all distinct texts (translate + split is ~2x a regex findall);
+        # each text is closed by a "\0" marker word
+        joined = " \0 ".join(text.replace("\0", " ") for text in self.index) + " \0"
+        words = joined.lower().encode().translate(_SEPARATORS).split()
+        vocab = {word: i for i, word in enumerate(dict.fromkeys(words))}
+        self.vocab_size = max(len(vocab), 1)
+        term_ids = np.fromiter(map(vocab.__getitem__, words), dtype=np.int64, count=len(words))
+        markers = term_ids == vocab.get(b"\0", -1)
+        rows = np.cumsum(markers) - markers
+        self.keys = _distinct(rows[~markers] * self.vocab_size + term_ids[~markers])
+        self.offsets = np.searchsorted(self.keys, np.arange(len(self.index) + 1, dtype=np.int64) * self.vocab_size)
+
+    def rows(self, texts: List[str]) -> np.ndarray:
+        """Row of each text"""
+        return np.fromiter((self.index[text] for text in texts), dtype=np.int64, count=len(texts))
+
+    def gather(self, rows: np.ndarray, owners: np.ndarray) -> np.ndarray:
+        """Sorted, distinct ``owner * vocab_size + term`` keys: the union of ``rows``' terms per owner"""
+        starts = self.offsets[rows]
+        lengths = self.offsets[rows + 1] - starts
+        total = int(lengths.sum())
+        # Ragged gather: position i of segment s reads keys[starts[s] + i]
+        segment_starts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        terms = self.keys[segment_starts + np.arange(total, dtype=np.int64)] % self.vocab_size
+        keys = np.repeat(owners, lengths) * self.vocab_size + terms
+        # One row per owner, in owner order, is already sorted and distinct
+        return keys if np.all(owners[1:] > owners[:-1]) else _distinct(keys)
+
+
+def _counts(keys: np.ndarray, vocab_size: int, num_owners: int) -> np.ndarray:
+    return np.bincount(keys // vocab_size, minlength=num_owners).astype(np.float64)
+
+
+def _overlap(left: np.ndarray, right: np.ndarray, vocab_size: int, num_owners: int) -> np.ndarray:
+    """Per-owner size of the intersection of two key sets"""
+    shared = left[np.isin(left, right, assume_unique=True)]
+    return _counts(shared, vocab_size, num_owners)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def overlap_scores(questions: List[str], contexts: List[List[str]], answers: List[str],
+                   ground_truths: List[str], relevance_threshold: float = 0.3) -> Dict[str, np.ndarray]:
+    """Per-sample faithfulness, answer relevancy, context precision and context recall
+
+    - faithfulness: share of answer terms found in the retrieved contexts
+    - answer_relevancy: share of question terms echoed by the answer
+    - context_recall: share of ground-truth terms found in the retrieved contexts
+    - context_precision: rank-aware, as in RAGAS: mean of precision@k over the ranks k of
+      relevant contexts, where a context is relevant if it covers at least
+      ``relevance_threshold`` of the ground truth's terms
+    """
+    n = len(questions)
+    flat_contexts = [context for sample_contexts in contexts for context in sample_contexts]
+    per_sample = np.array([len(sample_contexts) for sample_contexts in contexts], dtype=np.int64)
+    context_owner = np.repeat(np.arange(n, dtype=np.int64), per_sample)
+
+    terms = TermSets(questions + answers + ground_truths + flat_contexts)
+    v = terms.vocab_size
+    samples = np.arange(n, dtype=np.int64)
+    question_keys = terms.gather(terms.rows(questions), samples)
+    answer_keys = terms.gather(terms.rows(answers), samples)
+    truth_rows = terms.rows(ground_truths)
+    truth_keys = terms.gather(truth_rows, samples)
+    context_rows = terms.rows(flat_contexts)
+    context_keys = terms.gather(context_rows, context_owner)
+
+    answer_size = _counts(answer_keys, v, n)
+    question_size = _counts(question_keys, v, n)
+    truth_size = _counts(truth_keys, v, n)
+
+    # Rank-aware precision: each retrieved context is scored against its sample's ground truth
+    m = len(flat_contexts)
+    each_context = np.arange(m, dtype=np.int64)
+    single_context_keys = terms.gather(context_rows, each_context)
+    context_truth_keys = terms.gather(truth_rows[context_owner], each_context)
+    coverage = _ratio(_overlap(context_truth_keys, single_context_keys, v, m), truth_size[context_owner])
+    relevant = (coverage >= relevance_threshold).astype(np.float64)
+    first = np.cumsum(per_sample) - per_sample
+    cumulative = np.concatenate(([0.0], np.cumsum(relevant)))
+    relevant_so_far = cumulative[1:] - np.repeat(cumulative[first], per_sample)
+    rank = each_context - np.repeat(first, per_sample) + 1
+    precision_sum = np.bincount(context_owner, weights=relevant_so_far / rank * relevant, minlength=n)
+    relevant_count = np.bincount(context_owner, weights=relevant, minlength=n)
+
+    return {
+        "faithfulness": _ratio(_overlap(answer_keys, context_keys, v, n), answer_size),
+        "answer_relevancy": _ratio(_overlap(question_keys, answer_keys, v, n), question_size),
+        "context_precision": _ratio(precision_sum, relevant_count),
+        "context_recall": _ratio(_overlap(truth_keys, context_keys, v, n), truth_size),
+    }
+
+
+def mean_scores(scores: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Average each metric over samples (0.0 for an empty evaluation)"""
+    return {name: float(values.mean()) if len(values) else 0.0 for name, values in scores.items()}
@@ -4,15 +4,41 @@ Extracted from the notebook for use in the FastAPI application
 """
 
 import os
+import copy
+import json
+import asyncio
 import time
+import pickle
+import shutil
+import hashlib
+import operator
+import tempfile
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Awaitable, Sequence, Callable
 from dataclasses import dataclass
 
+import faiss
+import numpy as np
+
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.callbacks import Callbacks, CallbackManagerForRetrieverRun
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import patch_config
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain.chains import RetrievalQA
 from langchain.agents import Tool, initialize_agent, AgentType
@@ -21,7 +47,24 @@ from langchain.retrievers.document_compressors import LLMChainExtractor
 from langchain.retrievers.multi_query import MultiQueryRetriever
 from langchain.retrievers.ensemble import EnsembleRetriever
 
-from tavily import TavilyClient
+from tavily import TavilyClient, AsyncTavilyClient
+
+from batched_embeddings import BatchedEmbeddings
+from chunk_store import ChunkIdMap, CompactDocstore
+from embedding_cache import CachedEmbeddings
+from sparse_index import BM25Index, reciprocal_rank_fusion
+from evaluation_cache import ScoreCache
+from overlap_metrics import mean_scores, overlap_scores
+from tracing import request_trace, span, timing_handler
+from vector_index import (
+    IndexSpec, RerankedIndex, configure_search, index_type_of, load_vectors, new_index, read_index, unwrap,
+    update_index
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent workers may each build a missing snapshot
+    fcntl = None
 
 # RAGAS Components (for evaluation)
 try:
@@ -29,6 +72,7 @@ try:
     nest_asyncio.apply()
     from ragas import evaluate, EvaluationDataset
     from ragas.metrics import faithfulness, answer_relevancy, context_precision, context_recall
+    from ragas.run_config import RunConfig
     RAGAS_AVAILABLE = True
     print("✅ RAGAS imported successfully!")
 except ImportError:
@@ -48,7 +92,27 @@ class RAGConfig:
     model_name: str = "gpt-4o-mini"
     temperature: float = 0.1
     max_tokens: int = 1000
-    similarity_threshold: float = 0.7
+    similarity_threshold: float = 0.7  # Minimum cosine similarity (maximum L2 distance for plain stores)
+    embedding_model: str = "text-embedding-ada-002"
+    index_dir: str = "index_cache"
+    embedding_cache_dir: Optional[str] = None  # None disables the on-disk embedding cache
+    embedding_cache_size: int = 50_000
+    embedding_batch_size: int = 500  # Texts per embedding call when indexing; 0 sends everything at once
+    embedding_max_retries: int = 6  # Retries per batch on rate limits and transient API errors
+    retrieval_strategy: str = "hybrid"  # dense, hybrid (BM25 + dense via RRF) or lexical (BM25 only)
+    rrf_k: int = 60
+    fast_confidence_threshold: float = 0.5  # Cosine similarity below which the fast agent falls back
+    index_type: str = "flat"  # flat (exact), ivf, hnsw or ivfpq
+    ivf_nlist: int = 0  # IVF cells; 0 picks 4 * sqrt(number of chunks)
+    ivf_nprobe: int = 8  # IVF cells scanned per query
+    hnsw_m: int = 32  # HNSW links per node
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64  # HNSW search beam width
+    pq_m: int = 64  # IVF-PQ code size in bytes (sub-quantizers at 8 bits each)
+    pq_nbits: int = 8
+    vector_dtype: str = "float32"  # float32, float16 or int8 codes in the index
+    rerank_factor: int = 4  # Quantized indexes re-rank k * factor candidates in float32; 0 disables
+    compact_docstore: bool = False  # Columnar chunk store instead of one Document object per chunk
 
 
 class DocumentProcessor:
@@ -72,6 +136,14 @@ class DocumentProcessor:
         print(f"📄 Loaded {len(documents)} documents")
         return documents
     
+    def list_files(self) -> List[Path]:
+        """List the files ``load_documents`` would pick up"""
+        return sorted(path for path in self.data_path.glob("**/*.md") if path.is_file())
+    
+    def load_file(self, path: Path) -> Document:
+        """Load a single file with the same metadata ``load_documents`` produces"""
+        return TextLoader(str(path), encoding='utf-8').load()[0]
+    
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """Split documents into optimized chunks"""
         splitter = RecursiveCharacterTextSplitter(
@@ -84,60 +156,765 @@ class DocumentProcessor:
         return chunks
 
 
+def _content_hash(text: str) -> str:
+    """Stable hash used to recognise unchanged files and chunks"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SwappableFAISS(FAISS):
+    """FAISS store whose index, docstore and id map are published together as one immutable state
+    
+    ``swap`` replaces all three in a single assignment, and every search first pins the current
+    state, so a search racing an incremental refresh never maps old row ids through a new map.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        self._state = (None, None, None)
+        super().__init__(*args, **kwargs)
+    
+    @property
+    def index(self):
+        """The FAISS index of the current version"""
+        return self._state[0]
+    
+    @index.setter
+    def index(self, index):
+        self._state = (index, *self._state[1:])
+    
+    @property
+    def docstore(self) -> Docstore:
+        """The docstore of the current version"""
+        return self._state[1]
+    
+    @docstore.setter
+    def docstore(self, docstore: Docstore):
+        self._state = (self._state[0], docstore, self._state[2])
+    
+    @property
+    def index_to_docstore_id(self) -> Dict[int, str]:
+        """FAISS row -> docstore id map of the current version"""
+        return self._state[2]
+    
+    @index_to_docstore_id.setter
+    def index_to_docstore_id(self, index_to_docstore_id: Dict[int, str]):
+        self._state = (*self._state[:2], index_to_docstore_id)
+    
+    def swap(self, index, docstore: Docstore, index_to_docstore_id: Dict[int, str]):
+        """Publish a new (index, docstore, id map) version in one assignment"""
+        self._state = (index, docstore, index_to_docstore_id)
+    
+    def pinned(self) -> FAISS:
+        """Plain FAISS view of the current version, unaffected by later swaps"""
+        view = FAISS.__new__(FAISS)
+        view.__dict__.update(self.__dict__)
+        view.index, view.docstore, view.index_to_docstore_id = self._state
+        return view
+    
+    def similarity_search_with_score_by_vector(self, *args, **kwargs) -> List[Tuple[Document, float]]:
+        """Search one pinned version (the async variant runs this in an executor)"""
+        return self.pinned().similarity_search_with_score_by_vector(*args, **kwargs)
+    
+    def max_marginal_relevance_search_with_score_by_vector(self, *args, **kwargs) -> List[Tuple[Document, float]]:
+        """MMR over one pinned version"""
+        return self.pinned().max_marginal_relevance_search_with_score_by_vector(*args, **kwargs)
+
+
 class VectorStoreManager:
     """Manages FAISS vector store creation and operations"""
     
-    def __init__(self, config: RAGConfig = None):
+    # Snapshot layout version written to each manifest; loaders refuse newer ones
+    SNAPSHOT_FORMAT = 1
+    # Pointer in ``index_dir`` to the snapshot an artifact-only server loads
+    PUBLISHED = "current.json"
+    
+    def __init__(self, config: RAGConfig = None, embeddings: Embeddings = None):
         self.config = config or RAGConfig()
-        self.embeddings = OpenAIEmbeddings()
+        self.embeddings = embeddings or OpenAIEmbeddings(model=self.config.embedding_model)
+        if self.config.embedding_cache_dir:
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                self.config.embedding_cache_dir,
+                max_entries=self.config.embedding_cache_size
+            )
+        if self.config.embedding_batch_size > 0:
+            # Outside the cache, so every finished batch is cached even if a later one gives up
+            self.embeddings = BatchedEmbeddings(
+                self.embeddings,
+                batch_size=self.config.embedding_batch_size,
+                max_retries=self.config.embedding_max_retries
+            )
+        self.index_dir = Path(self.config.index_dir)
+        self.index_spec = IndexSpec(
+            index_type=self.config.index_type,
+            nlist=self.config.ivf_nlist,
+            nprobe=self.config.ivf_nprobe,
+            hnsw_m=self.config.hnsw_m,
+            ef_construction=self.config.hnsw_ef_construction,
+            ef_search=self.config.hnsw_ef_search,
+            pq_m=self.config.pq_m,
+            pq_nbits=self.config.pq_nbits,
+            vector_dtype=self.config.vector_dtype
+        )
+    
+    def _wrap(self, index: faiss.Index, docstore: Docstore, index_to_docstore_id: Dict[int, str]) -> FAISS:
+        """LangChain store over ``index``; inner-product indexes hold unit vectors and rank by cosine"""
+        cosine = index.metric_type == faiss.METRIC_INNER_PRODUCT
+        vectorstore = SwappableFAISS(
+            self.embeddings, index, docstore, index_to_docstore_id,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT if cosine else DistanceStrategy.EUCLIDEAN_DISTANCE
+        )
+        # Also normalizes every query; set directly since LangChain warns on normalized inner product
+        vectorstore._normalize_L2 = cosine
+        return vectorstore
+    
+    def _from_documents(self, chunks: List[Document], cosine: bool = False) -> FAISS:
+        """Embed ``chunks`` into a FAISS store backed by the configured index type"""
+        texts = [doc.page_content for doc in chunks]
+        vectors = np.array(self.embeddings.embed_documents(texts), dtype=np.float32)
+        return self.build_vectorstore(chunks, vectors, cosine)
+    
+    def build_vectorstore(self, chunks: List[Document], vectors: np.ndarray, cosine: bool = False) -> FAISS:
+        """FAISS store over already-embedded ``chunks`` (float32 ``vectors``, one row per chunk)
         
+        In cosine mode the whole batch is L2-normalized once, in place, and indexed by inner product.
+        Quantized indexes keep ``vectors`` for float32 re-ranking until the snapshot is reloaded memory-mapped.
+        """
+        if cosine:
+            faiss.normalize_L2(vectors)
+        index = new_index(vectors, self.index_spec, faiss.METRIC_INNER_PRODUCT if cosine else faiss.METRIC_L2)
+        index.add(vectors)
+        if self.index_spec.quantized and self.config.rerank_factor > 0:
+            index = RerankedIndex(index, vectors, self.config.rerank_factor)
+        ids = [str(uuid.uuid4()) for _ in chunks]
+        if self.config.compact_docstore:
+            # Copies text and metadata into its columns, so the chunks themselves are not retained
+            docstore = CompactDocstore(dict(zip(ids, chunks)))
+        else:
+            docstore = InMemoryDocstore({
+                doc_id: Document(id=doc_id, page_content=doc.page_content, metadata=dict(doc.metadata))
+                for doc_id, doc in zip(ids, chunks)
+            })
+        return self._wrap(index, docstore, dict(enumerate(ids)))
+    
     def create_vectorstore(self, chunks: List[Document]) -> FAISS:
         """Create FAISS vector store from document chunks"""
-        vectorstore = FAISS.from_documents(chunks, self.embeddings)
-        print(f"🗃️ Created FAISS vectorstore with {len(chunks)} chunks")
+        vectorstore = self._from_documents(chunks)
+        print(f"🗃️ Created FAISS vectorstore with {len(chunks)} chunks ({index_type_of(vectorstore.index)} index)")
         return vectorstore
     
     def create_advanced_vectorstore(self, chunks: List[Document]) -> FAISS:
         """Create optimized vector store with better indexing"""
-        vectorstore = FAISS.from_documents(
-            chunks, 
-            self.embeddings,
-            distance_strategy="COSINE"  # Better for semantic similarity
-        )
-        # Add metadata for better retrieval
+        # Add metadata for better retrieval; the docstore copies it at indexing time
         for i, doc in enumerate(chunks):
-            if hasattr(doc, 'metadata'):
-                doc.metadata['chunk_id'] = i
-                doc.metadata['chunk_size'] = len(doc.page_content)
-        print(f"🚀 Created advanced FAISS vectorstore with {len(chunks)} chunks")
+            doc.metadata['chunk_id'] = i
+            doc.metadata['chunk_size'] = len(doc.page_content)
+        vectorstore = self._from_documents(chunks, cosine=True)  # Better for semantic similarity
+        print(f"🚀 Created advanced FAISS vectorstore with {len(chunks)} chunks "
+              f"({index_type_of(vectorstore.index)} index)")
         return vectorstore
+    
+    def batch_similarity_search_with_score(self, vectorstore: FAISS, queries: List[str], k: int = 5,
+                                           score_threshold: Optional[float] = None
+                                           ) -> List[List[Tuple[Document, float]]]:
+        """Embed all queries in one request and search them as a single FAISS query matrix"""
+        if not queries:
+            return []
+        vectors = np.array(self.embeddings.embed_documents(list(queries)), dtype=np.float32)
+        if isinstance(vectorstore, SwappableFAISS):
+            # Rows and ids from one version, even if a refresh swaps the store mid-batch
+            vectorstore = vectorstore.pinned()
+        if getattr(vectorstore, "_normalize_L2", False):
+            faiss.normalize_L2(vectors)
+        scores, indices = vectorstore.index.search(vectors, k)
+        higher_is_better = vectorstore.distance_strategy in (
+            DistanceStrategy.MAX_INNER_PRODUCT, DistanceStrategy.JACCARD
+        )
+        results = []
+        for row_scores, row_indices in zip(scores, indices):
+            hits = []
+            for score, i in zip(row_scores, row_indices):
+                if i == -1:
+                    continue
+                if score_threshold is not None and (
+                    score < score_threshold if higher_is_better else score > score_threshold
+                ):
+                    continue
+                doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(i)])
+                if isinstance(doc, Document):
+                    hits.append((doc, float(score)))
+            results.append(hits)
+        return results
+    
+    def batch_similarity_search(self, vectorstore: FAISS, queries: List[str], k: int = 5,
+                                score_threshold: Optional[float] = None) -> List[List[Document]]:
+        """Per-question documents from ``batch_similarity_search_with_score``"""
+        return [
+            [doc for doc, _ in hits]
+            for hits in self.batch_similarity_search_with_score(vectorstore, queries, k, score_threshold)
+        ]
+    
+    @property
+    def embedding_model(self) -> str:
+        """Name of the embedding model backing this manager"""
+        return getattr(self.embeddings, "model", None) or type(self.embeddings).__name__
+    
+    def snapshot_key(self, documents: List[Document]) -> str:
+        """Content-addressed key over file contents, chunking parameters and embedding model"""
+        return self.snapshot_key_from_hashes({
+            str(doc.metadata.get('source', '')): _content_hash(doc.page_content) for doc in documents
+        })
+    
+    def snapshot_key_from_hashes(self, file_hashes: Dict[str, str]) -> str:
+        """Compute the same key as ``snapshot_key`` from per-file content hashes"""
+        digest = hashlib.sha256()
+        for source in sorted(file_hashes):
+            digest.update(f"{source}\0{file_hashes[source]}\0".encode())
+        digest.update(
+            f"{self.config.chunk_size}:{self.config.chunk_overlap}:{self.embedding_model}:cosine".encode()
+        )
+        if self.index_spec.key():
+            digest.update(f":{self.index_spec.key()}".encode())
+        if self.index_spec.quantized and self.config.rerank_factor > 0:
+            digest.update(b":rerank")
+        if self.config.compact_docstore:
+            digest.update(b":compact")
+        return digest.hexdigest()[:16]
+    
+    def build_sparse_index(self, vectorstore: FAISS) -> BM25Index:
+        """Build the BM25 index over the chunks held in ``vectorstore``, keyed by docstore id"""
+        doc_ids, texts = [], []
+        for _, doc_id in sorted(vectorstore.index_to_docstore_id.items()):
+            doc = vectorstore.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                doc_ids.append(doc_id)
+                texts.append(doc.page_content)
+        return BM25Index.from_texts(doc_ids, texts)
+    
+    def save_snapshot(self, vectorstore: FAISS, key: str, sparse_index: BM25Index = None) -> Path:
+        """Persist the FAISS index, docstore and BM25 index under ``index_dir/<key>``"""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        target = self.index_dir / key
+        # Write into a scratch directory and rename so readers never see a partial snapshot
+        scratch = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=self.index_dir))
+        # Same layout as FAISS.save_local, plus the float32 re-rank rows of a quantized index
+        if isinstance(vectorstore.index, RerankedIndex):
+            np.save(scratch / "vectors.npy", vectorstore.index.vectors)
+        faiss.write_index(unwrap(vectorstore.index), str(scratch / "index.faiss"))
+        if isinstance(vectorstore.docstore, CompactDocstore):
+            # Plain arrays instead of a pickle, so every worker can memory-map one copy
+            vectorstore.docstore.save(scratch)
+            ChunkIdMap.from_mapping(vectorstore.index_to_docstore_id).save(scratch)
+        else:
+            with open(scratch / "index.pkl", "wb") as f:
+                pickle.dump((vectorstore.docstore, vectorstore.index_to_docstore_id), f)
+        (sparse_index or self.build_sparse_index(vectorstore)).save(scratch)
+        manifest = {
+            "format_version": self.SNAPSHOT_FORMAT,
+            "key": key,
+            "embedding_model": self.embedding_model,
+            "chunk_size": self.config.chunk_size,
+            "chunk_overlap": self.config.chunk_overlap,
+            "index_type": index_type_of(vectorstore.index),
+            "metric": "cosine" if vectorstore.index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2",
+            "vector_dtype": self.index_spec.vector_dtype,
+            "reranked": isinstance(vectorstore.index, RerankedIndex),
+            "docstore": type(vectorstore.docstore).__name__,
+            "num_vectors": vectorstore.index.ntotal,
+            "dimension": vectorstore.index.d,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        (scratch / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        try:
+            os.replace(scratch, target)
+        except OSError:
+            # Another process already published this key; its content is identical
+            shutil.rmtree(scratch, ignore_errors=True)
+        print(f"💾 Saved FAISS snapshot {key} ({vectorstore.index.ntotal} vectors)")
+        return target
+    
+    def load_snapshot(self, key: str, mmap: bool = True) -> Optional[FAISS]:
+        """Load a snapshot saved by ``save_snapshot``, or return None if it does not exist
+        
+        With ``mmap`` the index, re-rank vectors and compact chunk store are read-only memory maps,
+        so worker processes loading the same snapshot share one physical copy through the page cache.
+        """
+        path = self.index_dir / key
+        if not (path / "index.faiss").exists():
+            return None
+        manifest = self.read_manifest(key) or {}
+        if manifest.get("format_version", 1) > self.SNAPSHOT_FORMAT:
+            raise ValueError(f"Snapshot {key} has format {manifest['format_version']}; "
+                             f"this version reads up to {self.SNAPSHOT_FORMAT}")
+        docstore = CompactDocstore.load(path, mmap)
+        if docstore is not None:
+            index_to_docstore_id = ChunkIdMap.load(path, mmap)
+        elif (path / "index.pkl").exists():
+            # The pickle is only ever written by save_snapshot into our own index_dir
+            with open(path / "index.pkl", "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+        else:
+            return None
+        # The saved type, not the configured one, decides whether the file can be mapped
+        index_type = manifest.get("index_type", self.index_spec.index_type)
+        index = read_index(str(path / "index.faiss"), index_type, mmap)
+        configure_search(index, self.index_spec)
+        if (path / "vectors.npy").exists():
+            # Page-cache backed: each query reads only its candidates' rows
+            vectors = load_vectors(str(path / "vectors.npy"), mmap)
+            index = RerankedIndex(index, vectors, max(self.config.rerank_factor, 1))
+        print(f"📦 Loaded FAISS snapshot {key} ({index.ntotal} vectors)")
+        return self._wrap(index, docstore, index_to_docstore_id)
+    
+    def load_sparse_index(self, key: str, mmap: bool = True) -> Optional[BM25Index]:
+        """Load the BM25 index saved with snapshot ``key``, or return None if there is none"""
+        return BM25Index.load(self.index_dir / key, memory_map=mmap)
+    
+    def read_manifest(self, key: str) -> Optional[Dict[str, Any]]:
+        """Manifest written with snapshot ``key``, or None if there is none"""
+        path = self.index_dir / key / "manifest.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+    
+    def publish(self, key: str) -> Path:
+        """Point ``index_dir``'s published artifact at snapshot ``key``"""
+        manifest = self.read_manifest(key)
+        if manifest is None:
+            raise FileNotFoundError(f"No snapshot {key} in {self.index_dir}")
+        pointer = {
+            "key": key,
+            "format_version": manifest.get("format_version", 1),
+            "published": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        target = self.index_dir / self.PUBLISHED
+        scratch = self.index_dir / f".{self.PUBLISHED}.{os.getpid()}"
+        scratch.write_text(json.dumps(pointer, indent=2))
+        os.replace(scratch, target)
+        print(f"📌 Published FAISS snapshot {key}")
+        return target
+    
+    def published_key(self) -> Optional[str]:
+        """Key of the published snapshot, or None if nothing has been published"""
+        path = self.index_dir / self.PUBLISHED
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())["key"]
+    
+    def load_published_indexes(self, mmap: bool = True) -> Optional[Tuple[FAISS, BM25Index]]:
+        """Load the published dense and sparse indexes without reading or embedding the data directory
+        
+        Returns None if nothing is published; raises if the artifact was embedded with another model,
+        since queries embedded here would not be comparable with its vectors.
+        """
+        key = self.published_key()
+        if key is None:
+            return None
+        manifest = self.read_manifest(key) or {}
+        if manifest.get("embedding_model", self.embedding_model) != self.embedding_model:
+            raise ValueError(f"Published snapshot {key} was embedded with {manifest['embedding_model']}, "
+                             f"not {self.embedding_model}")
+        vectorstore = self.load_snapshot(key, mmap)
+        sparse_index = self.load_sparse_index(key, mmap) if vectorstore is not None else None
+        if sparse_index is None:
+            raise FileNotFoundError(f"Published snapshot {key} is incomplete in {self.index_dir}")
+        return vectorstore, sparse_index
+    
+    @contextmanager
+    def build_lock(self):
+        """Exclusive lock on ``index_dir`` so concurrent workers build a missing snapshot only once"""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.index_dir / ".build.lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def load_or_create_vectorstore(self, documents: List[Document], processor: DocumentProcessor) -> FAISS:
+        """Load the snapshot matching these documents, building and saving it on a miss"""
+        return self.load_or_create_indexes(documents, processor)[0]
+    
+    def load_or_create_indexes(self, documents: List[Document],
+                               processor: DocumentProcessor) -> Tuple[FAISS, BM25Index]:
+        """Load the dense and sparse indexes matching these documents, building and saving them on a miss
+        
+        Under several uvicorn workers the first to take ``build_lock`` builds the snapshot; the others
+        wait, then memory-map the published files like any later worker.
+        """
+        key = self.snapshot_key(documents)
+        vectorstore = self.load_snapshot(key)
+        sparse_index = self.load_sparse_index(key) if vectorstore is not None else None
+        if sparse_index is not None:
+            return vectorstore, sparse_index
+        with self.build_lock():
+            # Another worker may have built the snapshot while this one waited
+            vectorstore = self.load_snapshot(key)
+            if vectorstore is None:
+                chunks = processor.chunk_documents(documents)
+                vectorstore = self.create_advanced_vectorstore(chunks)
+                self.save_snapshot(vectorstore, key, self.build_sparse_index(vectorstore))
+                self.publish(key)
+                # Serve the published files memory-mapped, like every other worker
+                vectorstore = self.load_snapshot(key) or vectorstore
+            sparse_index = self.load_sparse_index(key)
+            if sparse_index is None:
+                # Snapshot written before the sparse index existed; no embedding needed to add it
+                self.build_sparse_index(vectorstore).save(self.index_dir / key)
+                sparse_index = self.load_sparse_index(key)
+        return vectorstore, sparse_index
+
+
+class IncrementalIndexer:
+    """Keeps a live FAISS store in sync with the data directory, embedding only changed chunks
+    
+    ``key`` is the snapshot the live store was loaded from. ``sync_published`` swaps in a snapshot
+    another process (a second uvicorn worker, ``solviq-index update``) published since then;
+    without a ``key`` the store is not known to be a snapshot and is never replaced.
+    """
+    
+    def __init__(self, vectorstore: FAISS, processor: DocumentProcessor, manager: VectorStoreManager,
+                 sparse_index: BM25Index = None, key: Optional[str] = None):
+        self.vectorstore = vectorstore
+        self.processor = processor
+        self.manager = manager
+        self.sparse_index = sparse_index
+        self.key = key
+        self.version = 0
+        self._lock = threading.Lock()
+        # source -> (mtime_ns, size, content hash) as of the last refresh
+        self._files: Dict[str, Tuple[int, int, str]] = {}
+        # source -> chunk hash -> docstore ids currently indexed for that chunk text; built on the
+        # first refresh so workers that never refresh start without reading every chunk
+        self._chunks: Optional[Dict[str, Dict[str, List[str]]]] = None
+    
+    def _indexed_chunks(self) -> Dict[str, Dict[str, List[str]]]:
+        """Group the chunks currently in the store by source and content hash"""
+        chunks: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for doc_id in self.vectorstore.index_to_docstore_id.values():
+            doc = self.vectorstore.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                source = str(doc.metadata.get('source', ''))
+                chunks[source][_content_hash(doc.page_content)].append(doc_id)
+        return chunks
+    
+    def _changed_files(self) -> Tuple[List[Document], List[str]]:
+        """Return (documents for new/modified files, sources of removed files)"""
+        changed = []
+        seen = set()
+        for path in self.processor.list_files():
+            source = str(path)
+            seen.add(source)
+            stat = path.stat()
+            previous = self._files.get(source)
+            if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            doc = self.processor.load_file(path)
+            digest = _content_hash(doc.page_content)
+            if not previous or previous[2] != digest:
+                changed.append(doc)
+            self._files[source] = (stat.st_mtime_ns, stat.st_size, digest)
+        removed = [source for source in set(self._files) | set(self._chunks) if source not in seen]
+        for source in removed:
+            self._files.pop(source, None)
+        return changed, removed
+    
+    def sync_published(self) -> bool:
+        """Swap in the published snapshot if another process published a different one"""
+        if self.key is None or self.manager.published_key() in (None, self.key):
+            return False
+        with self._lock:
+            key = self.manager.published_key()
+            if key in (None, self.key):
+                return False
+            vectorstore = self.manager.load_snapshot(key)
+            sparse_index = self.manager.load_sparse_index(key) if vectorstore is not None else None
+            if sparse_index is None:
+                return False
+            self.vectorstore.swap(vectorstore.index, vectorstore.docstore, vectorstore.index_to_docstore_id)
+            if self.sparse_index is not None:
+                self.sparse_index.replace(sparse_index)
+            # The next refresh re-reads the data directory against the swapped-in chunks
+            self.key = key
+            self._files = {}
+            self._chunks = None
+            self.version += 1
+            print(f"🔄 Switched to published snapshot {key} ({vectorstore.index.ntotal} vectors)")
+            return True
+    
+    def refresh(self) -> Dict[str, Any]:
+        """Re-index the data directory, embedding new chunks and deleting vectors for removed ones"""
+        if not self.processor.data_path.exists():
+            # Every file would look removed and the whole index would be deleted
+            raise FileNotFoundError(f"Data directory not found: {self.processor.data_path}")
+        self.sync_published()
+        with self._lock:
+            start_time = time.time()
+            if self._chunks is None:
+                self._chunks = self._indexed_chunks()
+            changed, removed = self._changed_files()
+            to_add: List[Document] = []
+            to_delete: List[str] = []
+            
+            chunks_by_source: Dict[str, List[Document]] = defaultdict(list)
+            if changed:
+                for chunk in self.processor.chunk_documents(changed):
+                    chunks_by_source[str(chunk.metadata.get('source', ''))].append(chunk)
+            for doc in changed:
+                source = str(doc.metadata.get('source', ''))
+                # Chunks whose text is unchanged keep their existing vectors
+                available = {h: list(ids) for h, ids in self._chunks.get(source, {}).items()}
+                for chunk in chunks_by_source.get(source, []):
+                    ids = available.get(_content_hash(chunk.page_content))
+                    if ids:
+                        ids.pop()
+                    else:
+                        to_add.append(chunk)
+                to_delete.extend(doc_id for ids in available.values() for doc_id in ids)
+            for source in removed:
+                to_delete.extend(doc_id for ids in self._chunks.get(source, {}).values() for doc_id in ids)
+            
+            if to_add or to_delete:
+                new_ids = self._apply(to_add, to_delete)
+                if self.sparse_index is not None:
+                    # Only the added chunks are tokenized; older snapshots without term counts rebuild
+                    updated = self.sparse_index.updated(
+                        [(doc_id, doc.page_content) for doc_id, doc in zip(new_ids, to_add)], set(to_delete)
+                    )
+                    self.sparse_index.replace(updated or self.manager.build_sparse_index(self.vectorstore))
+                self.version += 1
+                self.save_snapshot()
+            
+            return {
+                "files_changed": len(changed),
+                "files_removed": len(removed),
+                "chunks_embedded": len(to_add),
+                "chunks_deleted": len(to_delete),
+                "total_vectors": self.vectorstore.index.ntotal,
+                "version": self.version,
+                "elapsed": time.time() - start_time
+            }
+    
+    def _apply(self, to_add: List[Document], to_delete: List[str]) -> List[str]:
+        """Embed and apply changes copy-on-write, swap them into the live store and return the new ids"""
+        for doc in to_add:
+            doc.metadata['chunk_size'] = len(doc.page_content)
+        vectors = None
+        if to_add:
+            vectors = np.array(
+                self.manager.embeddings.embed_documents([doc.page_content for doc in to_add]),
+                dtype=np.float32
+            )
+            if getattr(self.vectorstore, "_normalize_L2", False):
+                faiss.normalize_L2(vectors)
+        
+        vs = self.vectorstore
+        deleted = set(to_delete)
+        new_ids = [str(uuid.uuid4()) for _ in to_add]
+        # Concurrent searches keep using the old version until the swap below
+        index, index_to_docstore_id = update_index(vs.index, vs.index_to_docstore_id, deleted, vectors, new_ids,
+                                                   self.manager.index_spec)
+        if isinstance(vs.docstore, CompactDocstore):
+            docstore = copy.copy(vs.docstore)  # shares arrays; updates swap the copy's own columns
+        else:
+            docstore = InMemoryDocstore(dict(vs.docstore._dict))
+        if to_add:
+            docstore.add(dict(zip(new_ids, to_add)))
+        if deleted:
+            docstore.delete(list(deleted))
+        vs.swap(index, docstore, index_to_docstore_id)
+        
+        for doc_id, doc in zip(new_ids, to_add):
+            self._chunks[str(doc.metadata.get('source', ''))][_content_hash(doc.page_content)].append(doc_id)
+        for source in list(self._chunks):
+            for digest in list(self._chunks[source]):
+                ids = [doc_id for doc_id in self._chunks[source][digest] if doc_id not in deleted]
+                if ids:
+                    self._chunks[source][digest] = ids
+                else:
+                    del self._chunks[source][digest]
+            if not self._chunks[source]:
+                del self._chunks[source]
+        print(f"♻️ Re-indexed: +{len(to_add)} / -{len(deleted)} chunks ({index.ntotal} vectors)")
+        return new_ids
+    
+    def save_snapshot(self) -> Path:
+        """Persist and publish the current store under the key a fresh startup would compute"""
+        key = self.manager.snapshot_key_from_hashes(
+            {source: digest for source, (_, _, digest) in self._files.items()}
+        )
+        path = self.manager.save_snapshot(self.vectorstore, key, self.sparse_index)
+        self.manager.publish(key)
+        self.key = key
+        return path
+
+
+# Documents retrieved by tool calls during the current respond_to_rfp call
+_retrieved_documents: ContextVar[Optional[List[Document]]] = ContextVar("retrieved_documents", default=None)
+
+
+def _record_retrieval(documents: List[Document]):
+    """Record documents a tool retrieved into the active request context, if any"""
+    retrieved = _retrieved_documents.get()
+    if retrieved is not None:
+        retrieved.extend(documents)
+
+
+def _document_key(doc: Document) -> Tuple[str, str]:
+    """Identity of a chunk across dense and sparse result lists"""
+    return str(doc.metadata.get('source', '')), doc.page_content
 
 
 class SERAGAgent:
     """Solution Engineer RAG Agent with hybrid retrieval"""
     
-    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None, config: RAGConfig = None):
+    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None, config: RAGConfig = None,
+                 llm: BaseChatModel = None, sparse_index: BM25Index = None):
         self.vectorstore = vectorstore
         self.tavily_client = tavily_client
         self.config = config or RAGConfig()
-        self.llm = ChatOpenAI(
+        if self.config.retrieval_strategy not in ("dense", "hybrid", "lexical"):
+            raise ValueError(f"Unknown retrieval_strategy: {self.config.retrieval_strategy}")
+        self.sparse_index = sparse_index
+        self.llm = llm or ChatOpenAI(
             model_name=self.config.model_name,
             temperature=self.config.temperature,
             max_tokens=self.config.max_tokens
         )
+        self.async_tavily_client = None
+        # Time every LLM call, including those made inside retrievers
+        if self.llm.callbacks is None:
+            self.llm.callbacks = [timing_handler]
+        elif isinstance(self.llm.callbacks, list) and timing_handler not in self.llm.callbacks:
+            self.llm.callbacks.append(timing_handler)
         self.tools = self._create_tools()
         self.agent = self._create_agent()
+    
+    @property
+    def retrieval_strategy(self) -> str:
+        """Configured strategy, or dense when no sparse index is available"""
+        return self.config.retrieval_strategy if self.sparse_index is not None else "dense"
+    
+    def _lexical_search(self, query: str, k: int) -> List[Document]:
+        """BM25 search over the chunks; needs no embedding call"""
+        docs = []
+        with span("bm25_search", k=k) as attributes:
+            for doc_id, _ in self.sparse_index.search(query, k):
+                doc = self.vectorstore.docstore.search(doc_id)
+                if isinstance(doc, Document):
+                    docs.append(doc)
+            attributes["results"] = len(docs)
+        return docs
+    
+    def _fuse(self, dense: Optional[List[Document]], query: str, k: int) -> List[Document]:
+        """Reciprocal-rank fusion of dense results with BM25 results; lexical only if dense failed"""
+        lexical = self._lexical_search(query, k)
+        if dense is None:
+            return lexical
+        return reciprocal_rank_fusion([dense, lexical], key=_document_key, k=self.config.rrf_k)[:k]
+    
+    def _dense_score_threshold(self) -> Optional[float]:
+        """Score threshold applied inside the FAISS search"""
+        return self.config.similarity_threshold
+    
+    def _dense_search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """FAISS search within ``_dense_score_threshold()``, with raw scores"""
+        with span("embed"):
+            embedding = self.vectorstore.embeddings.embed_query(query)
+        with span("faiss_search", k=k) as attributes:
+            scored = self.vectorstore.similarity_search_with_score_by_vector(
+                embedding,
+                k=k,
+                score_threshold=self._dense_score_threshold()
+            )
+            attributes["results"] = len(scored)
+        return scored
+    
+    async def _adense_search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Async FAISS search: native async embedding, search off the event loop"""
+        with span("embed"):
+            embedding = await self.vectorstore.embeddings.aembed_query(query)
+        with span("faiss_search", k=k) as attributes:
+            scored = await self.vectorstore.asimilarity_search_with_score_by_vector(
+                embedding,
+                k=k,
+                score_threshold=self._dense_score_threshold()
+            )
+            attributes["results"] = len(scored)
+        return scored
+    
+    def _combine(self, scored: Optional[List[Tuple[Document, float]]], query: str, k: int) -> List[Document]:
+        """Pick the strategy's final results from the dense hits (None if dense search failed)"""
+        dense = [doc for doc, _ in scored] if scored is not None else None
+        return dense if self.retrieval_strategy == "dense" else self._fuse(dense, query, k)
+    
+    def _dense_failed(self, error: Exception):
+        """Re-raise in dense mode; hybrid mode carries on with BM25 alone"""
+        if self.retrieval_strategy == "dense":
+            raise error
+        print(f"⚠️ Dense search failed, using lexical results: {error}")
+    
+    def _retrieve(self, query: str, k: int) -> Tuple[List[Document], Optional[List[Tuple[Document, float]]]]:
+        """Dense, hybrid or lexical search; also returns the scored dense hits (None if none ran)"""
+        if self.retrieval_strategy == "lexical":
+            return self._lexical_search(query, k), None
+        try:
+            scored = self._dense_search(query, k)
+        except Exception as e:
+            self._dense_failed(e)
+            scored = None
+        return self._combine(scored, query, k), scored
+    
+    async def _aretrieve(self, query: str, k: int) -> Tuple[List[Document], Optional[List[Tuple[Document, float]]]]:
+        """Async ``_retrieve``; BM25 runs inline"""
+        if self.retrieval_strategy == "lexical":
+            return self._lexical_search(query, k), None
+        try:
+            scored = await self._adense_search(query, k)
+        except Exception as e:
+            self._dense_failed(e)
+            scored = None
+        return self._combine(scored, query, k), scored
+    
+    def _search_documents(self, query: str, k: int) -> List[Document]:
+        """Dense, hybrid or lexical search that records its results as the request's sources"""
+        docs, _ = self._retrieve(query, k)
+        _record_retrieval(docs)
+        return docs
+    
+    async def _asearch_documents(self, query: str, k: int) -> List[Document]:
+        """Async search that records its results as the request's sources"""
+        docs, _ = await self._aretrieve(query, k)
+        _record_retrieval(docs)
+        return docs
+    
+    def _web_search(self, **kwargs) -> Dict[str, Any]:
+        """Tavily search on the blocking client"""
+        with span("tavily"):
+            return self.tavily_client.search(**kwargs)
+    
+    async def _aweb_search(self, **kwargs) -> Dict[str, Any]:
+        """Tavily search on the async HTTP client, falling back to a worker thread"""
+        if self.async_tavily_client is None and isinstance(self.tavily_client, TavilyClient):
+            self.async_tavily_client = AsyncTavilyClient(api_key=self.tavily_client.api_key)
+        with span("tavily"):
+            if self.async_tavily_client is not None:
+                return await self.async_tavily_client.search(**kwargs)
+            return await asyncio.to_thread(self.tavily_client.search, **kwargs)
+    
+    def _record_web_results(self, results: List[Dict[str, Any]]):
+        """Record Tavily results as retrieved documents sourced by URL"""
+        _record_retrieval([
+            Document(page_content=result.get('content', ''), metadata={'source': result.get('url', 'Unknown')})
+            for result in results
+        ])
         
     def _create_tools(self) -> List[Tool]:
         """Create tools for documentation search and web search"""
         
-        def search_documentation(query: str) -> str:
-            """Search internal documentation using semantic similarity"""
-            docs = self.vectorstore.similarity_search(
-                query, 
-                k=5,
-                score_threshold=self.config.similarity_threshold
-            )
+        def format_documentation(docs: List[Document]) -> str:
             if not docs:
                 return "No relevant documentation found."
             
@@ -145,29 +922,46 @@ class SERAGAgent:
             sources = [doc.metadata.get('source', 'Unknown') for doc in docs]
             return f"Documentation Context:\n{context}\n\nSources: {', '.join(sources)}"
         
+        def search_documentation(query: str) -> str:
+            """Search internal documentation using semantic similarity"""
+            return format_documentation(self._search_documents(query, k=5))
+        
+        async def asearch_documentation(query: str) -> str:
+            """Search internal documentation using semantic similarity"""
+            return format_documentation(await self._asearch_documents(query, k=5))
+        
+        web_kwargs = {"search_depth": "advanced", "max_results": 3}
+        
+        def format_web(results: Dict[str, Any]) -> str:
+            if not results or not results.get('results'):
+                return "No web results found."
+            self._record_web_results(results['results'][:3])
+            
+            web_context = "\n\n".join([
+                f"Title: {result.get('title', 'No title')}\n"
+                f"Content: {result.get('content', 'No content')}\n"
+                f"URL: {result.get('url', 'No URL')}"
+                for result in results['results'][:3]
+            ])
+            return f"Web Search Results:\n{web_context}"
+        
         def search_web(query: str) -> str:
             """Search web for current information using Tavily"""
             if not self.tavily_client:
                 return "Web search not available - Tavily client not configured."
             
             try:
-                results = self.tavily_client.search(
-                    query=query,
-                    search_depth="advanced",
-                    max_results=3
-                )
-                
-                if not results or not results.get('results'):
-                    return "No web results found."
-                
-                web_context = "\n\n".join([
-                    f"Title: {result.get('title', 'No title')}\n"
-                    f"Content: {result.get('content', 'No content')}\n"
-                    f"URL: {result.get('url', 'No URL')}"
-                    for result in results['results'][:3]
-                ])
-                return f"Web Search Results:\n{web_context}"
-                
+                return format_web(self._web_search(query=query, **web_kwargs))
+            except Exception as e:
+                return f"Web search error: {str(e)}"
+        
+        async def asearch_web(query: str) -> str:
+            """Search web for current information using Tavily"""
+            if not self.tavily_client:
+                return "Web search not available - Tavily client not configured."
+            
+            try:
+                return format_web(await self._aweb_search(query=query, **web_kwargs))
             except Exception as e:
                 return f"Web search error: {str(e)}"
         
@@ -175,12 +969,14 @@ class SERAGAgent:
             Tool(
                 name="search_documentation",
                 description="Search internal technical documentation for specific information",
-                func=search_documentation
+                func=search_documentation,
+                coroutine=asearch_documentation
             ),
             Tool(
                 name="search_web",
                 description="Search the web for current information and external resources",
-                func=search_web
+                func=search_web,
+                coroutine=asearch_web
             )
         ]
     
@@ -194,85 +990,252 @@ class SERAGAgent:
             verbose=False
         )
     
+    def _build_response(self, answer: str, retrieved: List[Document], start_time: float,
+                        trace=None) -> Dict[str, Any]:
+        """Assemble the response payload; sources are what the tools actually retrieved"""
+        return {
+            "answer": answer,
+            "sources": self._extract_sources(retrieved),
+            "response_time": time.time() - start_time,
+            "model": self.config.model_name,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "timings": trace.to_list() if trace is not None else []
+        }
+    
+    def _error_response(self, error: Exception, start_time: float) -> Dict[str, Any]:
+        """Assemble the payload returned when the agent run fails"""
+        return {
+            "answer": f"Error generating response: {str(error)}",
+            "sources": [],
+            "response_time": time.time() - start_time,
+            "model": self.config.model_name,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "error": str(error)
+        }
+    
     def respond_to_rfp(self, question: str) -> Dict[str, Any]:
         """Generate comprehensive RFP response"""
         start_time = time.time()
+        retrieved: List[Document] = []
+        token = _retrieved_documents.set(retrieved)
         
+        with request_trace(agent=type(self).__name__) as trace:
+            try:
+                response = self.agent.run(question, callbacks=[timing_handler])
+                return self._build_response(response, retrieved, start_time, trace)
+            except Exception as e:
+                return self._error_response(e, start_time)
+            finally:
+                _retrieved_documents.reset(token)
+    
+    async def arespond_to_rfp(self, question: str) -> Dict[str, Any]:
+        """Generate an RFP response on the async LLM, search and Tavily clients"""
+        start_time = time.time()
+        retrieved: List[Document] = []
+        token = _retrieved_documents.set(retrieved)
+        
+        with request_trace(agent=type(self).__name__) as trace:
+            try:
+                response = await self.agent.arun(question, callbacks=[timing_handler])
+                return self._build_response(response, retrieved, start_time, trace)
+            except Exception as e:
+                return self._error_response(e, start_time)
+            finally:
+                _retrieved_documents.reset(token)
+    
+    async def astream_rfp(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream an RFP response as events: ``tool``, ``retrieval``, ``token`` and a final ``done``
+        
+        Only text after the ReAct ``Final Answer:`` marker is streamed as tokens. ``done`` reports
+        ``time_to_first_token`` separately from the total ``response_time``.
+        """
+        start_time = time.time()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce():
+            # Runs in its own task, so the retrieval context var is private to this stream
+            retrieved: List[Document] = []
+            _retrieved_documents.set(retrieved)
+            marker = "Final Answer:"
+            buffer, emitted = "", 0
+            retrieved_before = 0
+            first_token_time = None
+            answer = None
+            with request_trace(agent=type(self).__name__) as trace:
+                try:
+                    events = self.agent.astream_events({"input": question}, version="v2",
+                                                       config={"callbacks": [timing_handler]})
+                    async for event in events:
+                        kind = event["event"]
+                        if kind == "on_chat_model_start":
+                            buffer, emitted = "", 0
+                        elif kind == "on_chat_model_stream":
+                            buffer += str(event["data"]["chunk"].content)
+                            position = buffer.find(marker)
+                            if position < 0:
+                                continue
+                            text = buffer[position + len(marker):].lstrip() if emitted == 0 else buffer[emitted:]
+                            if text:
+                                if first_token_time is None:
+                                    first_token_time = time.time() - start_time
+                                await queue.put({"event": "token", "text": text})
+                                emitted = len(buffer)
+                        elif kind == "on_tool_start":
+                            await queue.put({"event": "tool", "tool": event["name"],
+                                             "elapsed": time.time() - start_time})
+                            retrieved_before = len(retrieved)
+                        elif kind == "on_tool_end":
+                            new_docs = retrieved[retrieved_before:]
+                            await queue.put({
+                                "event": "retrieval",
+                                "tool": event["name"],
+                                "documents": len(new_docs),
+                                "sources": self._extract_sources(new_docs),
+                                "elapsed": time.time() - start_time
+                            })
+                        elif kind == "on_chain_end" and not event.get("parent_ids"):
+                            answer = event["data"]["output"]["output"]
+                    
+                    if first_token_time is None and answer:
+                        # Nothing streamed past the marker (e.g. a parsing-error answer); send it whole
+                        first_token_time = time.time() - start_time
+                        await queue.put({"event": "token", "text": answer})
+                    done = self._build_response(answer or "", retrieved, start_time, trace)
+                    done.update({"event": "done", "time_to_first_token": first_token_time})
+                    await queue.put(done)
+                except Exception as e:
+                    error = self._error_response(e, start_time)
+                    error["event"] = "error"
+                    await queue.put(error)
+                finally:
+                    await queue.put(None)
+        
+        task = asyncio.create_task(produce())
         try:
-            # Get agent response
-            response = self.agent.run(question)
-            
-            # Extract sources from tools used
-            sources = self._extract_sources(question)
-            
-            response_time = time.time() - start_time
-            
-            return {
-                "answer": response,
-                "sources": sources,
-                "response_time": response_time,
-                "model": self.config.model_name,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-        except Exception as e:
-            return {
-                "answer": f"Error generating response: {str(e)}",
-                "sources": [],
-                "response_time": time.time() - start_time,
-                "model": self.config.model_name,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "error": str(e)
-            }
+            while (item := await queue.get()) is not None:
+                yield item
+        finally:
+            if not task.done():
+                task.cancel()
     
-    def _extract_sources(self, query: str) -> List[str]:
-        """Extract relevant sources from vectorstore"""
-        docs = self.vectorstore.similarity_search(query, k=3)
-        return list(set([doc.metadata.get('source', 'Unknown') for doc in docs]))
+    def _extract_sources(self, documents: List[Document]) -> List[str]:
+        """List the unique sources of the retrieved documents, in retrieval order"""
+        return list(dict.fromkeys(doc.metadata.get('source', 'Unknown') for doc in documents))
+
+
+class ParallelLLMChainExtractor(LLMChainExtractor):
+    """LLMChainExtractor that compresses all documents with concurrent LLM calls"""
+    
+    def compress_documents(self, documents: Sequence[Document], query: str,
+                           callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        """Compress page content of raw documents, one batched LLM round"""
+        outputs = self.llm_chain.batch(
+            [self.get_input(query, doc) for doc in documents],
+            config={"callbacks": callbacks, "max_concurrency": max(len(documents), 1)}
+        )
+        return [
+            Document(page_content=output, metadata=doc.metadata)
+            for doc, output in zip(documents, outputs)
+            if len(output) > 0
+        ]
+
+
+class ParallelMultiQueryRetriever(MultiQueryRetriever):
+    """MultiQueryRetriever that searches all generated sub-queries concurrently"""
+    
+    def retrieve_documents(self, queries: List[str], run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        """Run all LLM generated queries in one batch"""
+        results = self.retriever.batch(
+            queries, config={"callbacks": run_manager.get_child(), "max_concurrency": max(len(queries), 1)}
+        )
+        return [doc for docs in results for doc in docs]
+
+
+class ParallelEnsembleRetriever(EnsembleRetriever):
+    """EnsembleRetriever that runs its member retrievers concurrently"""
+    
+    def rank_fusion(self, query: str, run_manager: CallbackManagerForRetrieverRun, *,
+                    config: Optional[RunnableConfig] = None) -> List[Document]:
+        """Retrieve from every member at once, then apply weighted reciprocal rank fusion"""
+        with ThreadPoolExecutor(max_workers=len(self.retrievers)) as executor:
+            # Each member runs in a copy of this context, so its LLM spans join the request's trace
+            futures = [
+                executor.submit(
+                    copy_context().run,
+                    retriever.invoke,
+                    query,
+                    patch_config(config, callbacks=run_manager.get_child(tag=f"retriever_{i + 1}"))
+                )
+                for i, retriever in enumerate(self.retrievers)
+            ]
+            retriever_docs = [future.result() for future in futures]
+        return self.weighted_reciprocal_rank(retriever_docs)
 
 
 class AdvancedRetrievalAgent(SERAGAgent):
-    """Enhanced RAG agent with advanced retrieval methods"""
+    """Enhanced RAG agent with advanced retrieval methods
+    
+    ``retrieval_mode="ensemble"`` (default) answers documentation searches with the
+    ensemble of multi-query and contextual-compression retrievers; ``"similarity"``
+    keeps the base agent's search (dense, hybrid or lexical per ``config.retrieval_strategy``).
+    """
     
-    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None, config: RAGConfig = None):
-        super().__init__(vectorstore, tavily_client, config)
+    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None, config: RAGConfig = None,
+                 llm: BaseChatModel = None, retrieval_mode: str = "ensemble", sparse_index: BM25Index = None):
+        if retrieval_mode not in ("ensemble", "similarity"):
+            raise ValueError(f"Unknown retrieval_mode: {retrieval_mode}")
+        self.retrieval_mode = retrieval_mode
+        super().__init__(vectorstore, tavily_client, config, llm, sparse_index)
         self.setup_advanced_retrievers()
     
     def setup_advanced_retrievers(self):
         """Setup advanced retrieval strategies"""
         
-        # 1. Contextual Compression Retriever
-        compressor = LLMChainExtractor.from_llm(self.llm)
+        # 1. Contextual Compression Retriever (compresses its 10 candidates concurrently)
+        compressor = ParallelLLMChainExtractor.from_llm(self.llm)
         self.compression_retriever = ContextualCompressionRetriever(
             base_compressor=compressor,
             base_retriever=self.vectorstore.as_retriever(search_kwargs={"k": 10})
         )
         
-        # 2. Multi-Query Retriever
-        self.multi_query_retriever = MultiQueryRetriever.from_llm(
+        # 2. Multi-Query Retriever (searches its sub-queries and the original concurrently)
+        self.multi_query_retriever = ParallelMultiQueryRetriever.from_llm(
             retriever=self.vectorstore.as_retriever(search_kwargs={"k": 5}),
-            llm=self.llm
+            llm=self.llm,
+            include_original=True
         )
         
-        # 3. Ensemble Retriever (combining multiple strategies)
-        self.ensemble_retriever = EnsembleRetriever(
+        # 3. Ensemble Retriever (combining multiple strategies, members run concurrently)
+        self.ensemble_retriever = ParallelEnsembleRetriever(
             retrievers=[
-                self.vectorstore.as_retriever(search_kwargs={"k": 3}),
+                self.multi_query_retriever,
                 self.compression_retriever
             ],
             weights=[0.7, 0.3]
         )
     
+    def _search_documents(self, query: str, k: int) -> List[Document]:
+        """Ensemble retrieval (or plain similarity) that records its results as sources"""
+        if self.retrieval_mode == "similarity":
+            return super()._search_documents(query, k)
+        with span("ensemble_retrieval", k=k):
+            docs = self.ensemble_retriever.invoke(query)[:k]
+        _record_retrieval(docs)
+        return docs
+    
+    async def _asearch_documents(self, query: str, k: int) -> List[Document]:
+        """Async ensemble retrieval; members, sub-queries and compressions are gathered concurrently"""
+        if self.retrieval_mode == "similarity":
+            return await super()._asearch_documents(query, k)
+        with span("ensemble_retrieval", k=k):
+            docs = (await self.ensemble_retriever.ainvoke(query))[:k]
+        _record_retrieval(docs)
+        return docs
+    
     def _create_tools(self) -> List[Tool]:
         """Create enhanced tools with advanced retrieval methods"""
         
-        def search_documentation(query: str) -> str:
-            """Search internal documentation using semantic similarity"""
-            docs = self.vectorstore.similarity_search(
-                query, 
-                k=5,
-                score_threshold=self.config.similarity_threshold
-            )
+        def format_documentation(docs: List[Document]) -> str:
             if not docs:
                 return "No relevant documentation found."
             
@@ -280,30 +1243,50 @@ class AdvancedRetrievalAgent(SERAGAgent):
             sources = [doc.metadata.get('source', 'Unknown') for doc in docs]
             return f"Documentation Context:\n{context}\n\nSources: {', '.join(sources)}"
         
+        def search_documentation(query: str) -> str:
+            """Search internal documentation using semantic similarity"""
+            return format_documentation(self._search_documents(query, k=5))
+        
+        async def asearch_documentation(query: str) -> str:
+            """Search internal documentation using semantic similarity"""
+            return format_documentation(await self._asearch_documents(query, k=5))
+        
+        web_kwargs = {
+            "search_depth": "advanced",
+            "max_results": 5,
+            "include_domains": ["stackoverflow.com", "github.com", "docs.microsoft.com", "developer.mozilla.org"]
+        }
+        
+        def format_web(results: Dict[str, Any]) -> str:
+            if not results or not results.get('results'):
+                return "No relevant web results found."
+            self._record_web_results(results['results'][:3])
+            
+            web_context = "\n\n".join([
+                f"Title: {result.get('title', 'No title')}\n"
+                f"Content: {result.get('content', 'No content')[:500]}...\n"
+                f"URL: {result.get('url', 'No URL')}"
+                for result in results['results'][:3]
+            ])
+            return f"Advanced Web Search Results:\n{web_context}"
+        
         def search_web(query: str) -> str:
             """Search web for current information using Tavily"""
             if not self.tavily_client:
                 return "Web search not available - Tavily client not configured."
             
             try:
-                results = self.tavily_client.search(
-                    query=query,
-                    search_depth="advanced",
-                    max_results=5,
-                    include_domains=["stackoverflow.com", "github.com", "docs.microsoft.com", "developer.mozilla.org"]
-                )
-                
-                if not results or not results.get('results'):
-                    return "No relevant web results found."
-                
-                web_context = "\n\n".join([
-                    f"Title: {result.get('title', 'No title')}\n"
-                    f"Content: {result.get('content', 'No content')[:500]}...\n"
-                    f"URL: {result.get('url', 'No URL')}"
-                    for result in results['results'][:3]
-                ])
-                return f"Advanced Web Search Results:\n{web_context}"
-                
+                return format_web(self._web_search(query=query, **web_kwargs))
+            except Exception as e:
+                return f"Web search error: {str(e)}"
+        
+        async def asearch_web(query: str) -> str:
+            """Search web for current information using Tavily"""
+            if not self.tavily_client:
+                return "Web search not available - Tavily client not configured."
+            
+            try:
+                return format_web(await self._aweb_search(query=query, **web_kwargs))
             except Exception as e:
                 return f"Web search error: {str(e)}"
         
@@ -311,12 +1294,14 @@ class AdvancedRetrievalAgent(SERAGAgent):
             Tool(
                 name="search_documentation",
                 description="Search internal technical documentation for specific information",
-                func=search_documentation
+                func=search_documentation,
+                coroutine=asearch_documentation
             ),
             Tool(
                 name="search_web",
                 description="Advanced web search with domain filtering for technical content",
-                func=search_web
+                func=search_web,
+                coroutine=asearch_web
             )
         ]
 
@@ -324,27 +1309,26 @@ class AdvancedRetrievalAgent(SERAGAgent):
 class ConservativeRAGAgent(SERAGAgent):
     """Conservative RAG agent with strict retrieval parameters"""
     
-    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None):
-        # Conservative configuration
-        conservative_config = RAGConfig(
-            chunk_size=600,  # Smaller chunks
-            chunk_overlap=50,  # Less overlap
-            temperature=0.0,  # More deterministic
-            max_tokens=800,  # Shorter responses
-            similarity_threshold=0.8  # Higher threshold
-        )
-        super().__init__(vectorstore, tavily_client, conservative_config)
+    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None, llm: BaseChatModel = None,
+                 sparse_index: BM25Index = None, config: RAGConfig = None):
+        super().__init__(vectorstore, tavily_client, config or self.default_config(), llm, sparse_index)
+    
+    @staticmethod
+    def default_config(**overrides) -> RAGConfig:
+        """Conservative configuration"""
+        return RAGConfig(**{
+            "chunk_size": 600,  # Smaller chunks
+            "chunk_overlap": 50,  # Less overlap
+            "temperature": 0.0,  # More deterministic
+            "max_tokens": 800,  # Shorter responses
+            "similarity_threshold": 0.8,  # Higher threshold
+            **overrides
+        })
     
     def _create_tools(self) -> List[Tool]:
         """Create conservative tools with stricter parameters"""
         
-        def search_documentation_conservative(query: str) -> str:
-            """Conservative documentation search with high relevance threshold"""
-            docs = self.vectorstore.similarity_search(
-                query, 
-                k=3,  # Fewer documents
-                score_threshold=self.config.similarity_threshold
-            )
+        def format_documentation(docs: List[Document]) -> str:
             if not docs:
                 return "No highly relevant documentation found."
             
@@ -352,15 +1336,243 @@ class ConservativeRAGAgent(SERAGAgent):
             sources = [doc.metadata.get('source', 'Unknown') for doc in docs]
             return f"Conservative Documentation Context:\n{context}\n\nSources: {', '.join(sources)}"
         
+        def search_documentation_conservative(query: str) -> str:
+            """Conservative documentation search with high relevance threshold"""
+            return format_documentation(self._search_documents(query, k=3))  # Fewer documents
+        
+        async def asearch_documentation_conservative(query: str) -> str:
+            """Conservative documentation search with high relevance threshold"""
+            return format_documentation(await self._asearch_documents(query, k=3))
+        
         return [
             Tool(
                 name="search_documentation_conservative",
                 description="Conservative search of internal documentation with high relevance threshold",
-                func=search_documentation_conservative
+                func=search_documentation_conservative,
+                coroutine=asearch_documentation_conservative
             )
         ]
 
 
+FAST_ANSWER_PROMPT = ChatPromptTemplate.from_messages([
+    ("system",
+     "You are SolvIQ, an assistant helping Solution Engineers answer RFP questions. "
+     "Answer using only the context below. If it does not contain the answer, say so plainly. "
+     "Cite the sources you use in square brackets.\n\nContext:\n{context}"),
+    ("human", "{question}"),
+])
+
+
+class FastRAGAgent(SERAGAgent):
+    """Single-pass agent: retrieve once, then answer in one LLM call
+    
+    Retrieval confidence is the top dense hit's cosine similarity to the question, taken before
+    ``config.similarity_threshold`` filters the hits, so a looser fast threshold still applies. Below
+    ``config.fast_confidence_threshold`` the agent adds Tavily results to the context, or,
+    with ``route_to_react=True``, hands the question to the inherited ReAct loop instead.
+    With no dense scores (``lexical`` strategy, or the dense search failed) any BM25 hit counts
+    as confident: BM25 scores are unbounded and not comparable with the cosine threshold.
+    """
+    
+    def __init__(self, vectorstore: FAISS, tavily_client: TavilyClient = None, config: RAGConfig = None,
+                 llm: BaseChatModel = None, sparse_index: BM25Index = None, route_to_react: bool = False,
+                 k: int = 5):
+        super().__init__(vectorstore, tavily_client, config, llm, sparse_index)
+        self.route_to_react = route_to_react
+        self.k = k
+        self.routes = {"fast": 0, "web": 0, "react": 0}
+        self._routes_lock = threading.Lock()
+    
+    def _dense_score_threshold(self) -> Optional[float]:
+        """No threshold in FAISS: confidence needs the top hit; ``_combine`` applies the threshold"""
+        return None
+    
+    def _combine(self, scored: Optional[List[Tuple[Document, float]]], query: str, k: int) -> List[Document]:
+        """Inherited combination of the dense hits within ``config.similarity_threshold``"""
+        if scored is not None:
+            higher_is_better = self.vectorstore.distance_strategy in (DistanceStrategy.MAX_INNER_PRODUCT,
+                                                                      DistanceStrategy.JACCARD)
+            compare = operator.ge if higher_is_better else operator.le
+            scored = [(doc, score) for doc, score in scored if compare(score, self.config.similarity_threshold)]
+        return super()._combine(scored, query, k)
+    
+    def _confidence(self, scored: Optional[List[Tuple[Document, float]]]) -> Optional[float]:
+        """Best cosine similarity among the unthresholded dense hits; None when there are none"""
+        if not scored:
+            return None
+        if self.vectorstore.distance_strategy == DistanceStrategy.MAX_INNER_PRODUCT:
+            return float(max(score for _, score in scored))
+        # Squared L2 distance between unit vectors: |a - b|^2 = 2 - 2cos
+        return float(1.0 - min(score for _, score in scored) / 2.0)
+    
+    def _route(self, confidence: Optional[float], lexical_hits: Optional[int] = None) -> str:
+        """``fast`` when retrieval is confident, else ``react`` or ``web`` (``fast`` if neither is available)
+        
+        ``lexical_hits`` is the number of BM25 results when no dense search ran.
+        """
+        if lexical_hits is not None:
+            confident = lexical_hits > 0
+        else:
+            confident = confidence is not None and confidence >= self.config.fast_confidence_threshold
+        if confident:
+            route = "fast"
+        elif self.route_to_react:
+            route = "react"
+        elif self.tavily_client is not None:
+            route = "web"
+        else:
+            route = "fast"
+        with self._routes_lock:
+            self.routes[route] += 1
+        return route
+    
+    def _messages(self, question: str, docs: List[Document], web_results: List[Dict[str, Any]]):
+        """Build the single generation prompt: retrieved chunks, then any web results"""
+        context = "\n\n".join(
+            [f"[{doc.metadata.get('source', 'Unknown')}]\n{doc.page_content}" for doc in docs] +
+            [f"[{result.get('url', 'Unknown')}]\n{result.get('content', '')}" for result in web_results]
+        ) or "No relevant documentation found."
+        return FAST_ANSWER_PROMPT.format_messages(context=context, question=question)
+    
+    def _web_results(self, question: str) -> List[Dict[str, Any]]:
+        """Fetch and record Tavily results for the web fallback; none if the search fails"""
+        try:
+            results = self._web_search(query=question, search_depth="basic", max_results=3).get("results", [])
+        except Exception as e:
+            print(f"⚠️ Web fallback failed, answering from documentation only: {e}")
+            return []
+        self._record_web_results(results)
+        return results
+    
+    async def _aweb_results(self, question: str) -> List[Dict[str, Any]]:
+        """Async ``_web_results``"""
+        try:
+            results = (await self._aweb_search(query=question, search_depth="basic", max_results=3)).get("results", [])
+        except Exception as e:
+            print(f"⚠️ Web fallback failed, answering from documentation only: {e}")
+            return []
+        self._record_web_results(results)
+        return results
+    
+    def _fast_response(self, answer: str, route: str, confidence: Optional[float], retrieved: List[Document],
+                       start_time: float, trace) -> Dict[str, Any]:
+        """``_build_response`` plus the route taken and the retrieval confidence"""
+        trace.attributes.update(route=route, confidence=confidence)
+        response = self._build_response(answer, retrieved, start_time, trace)
+        response.update(route=route, confidence=confidence)
+        return response
+    
+    def respond_to_rfp(self, question: str) -> Dict[str, Any]:
+        """Answer in one LLM call, or through the ReAct loop when routed there"""
+        start_time = time.time()
+        retrieved: List[Document] = []
+        token = _retrieved_documents.set(retrieved)
+        
+        with request_trace(agent=type(self).__name__) as trace:
+            try:
+                docs, scored = self._retrieve(question, self.k)
+                confidence = self._confidence(scored)
+                route = self._route(confidence, len(docs) if scored is None else None)
+                if route == "react":
+                    answer = self.agent.run(question, callbacks=[timing_handler])
+                else:
+                    _record_retrieval(docs)
+                    web_results = self._web_results(question) if route == "web" else []
+                    message = self.llm.invoke(self._messages(question, docs, web_results),
+                                              config={"callbacks": [timing_handler]})
+                    answer = str(message.content)
+                return self._fast_response(answer, route, confidence, retrieved, start_time, trace)
+            except Exception as e:
+                return self._error_response(e, start_time)
+            finally:
+                _retrieved_documents.reset(token)
+    
+    async def arespond_to_rfp(self, question: str,
+                              on_event: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+                              ) -> Dict[str, Any]:
+        """Async single-pass answer; ``on_event`` receives ``retrieval`` and ``token`` events as they happen"""
+        start_time = time.time()
+        retrieved: List[Document] = []
+        token = _retrieved_documents.set(retrieved)
+        
+        with request_trace(agent=type(self).__name__) as trace:
+            try:
+                docs, scored = await self._aretrieve(question, self.k)
+                confidence = self._confidence(scored)
+                route = self._route(confidence, len(docs) if scored is None else None)
+                if route == "react":
+                    answer = await self.agent.arun(question, callbacks=[timing_handler])
+                    return self._fast_response(answer, route, confidence, retrieved, start_time, trace)
+                
+                _record_retrieval(docs)
+                web_results = await self._aweb_results(question) if route == "web" else []
+                if on_event is not None:
+                    await on_event({
+                        "event": "retrieval",
+                        "tool": "retrieve" if route == "fast" else "retrieve+search_web",
+                        "documents": len(retrieved),
+                        "sources": self._extract_sources(retrieved),
+                        "confidence": confidence,
+                        "elapsed": time.time() - start_time
+                    })
+                messages = self._messages(question, docs, web_results)
+                config = {"callbacks": [timing_handler]}
+                if on_event is None:
+                    answer = str((await self.llm.ainvoke(messages, config=config)).content)
+                else:
+                    parts = []
+                    async for chunk in self.llm.astream(messages, config=config):
+                        text = str(chunk.content)
+                        if text:
+                            parts.append(text)
+                            await on_event({"event": "token", "text": text})
+                    answer = "".join(parts)
+                return self._fast_response(answer, route, confidence, retrieved, start_time, trace)
+            except Exception as e:
+                return self._error_response(e, start_time)
+            finally:
+                _retrieved_documents.reset(token)
+    
+    async def astream_rfp(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream ``retrieval``, ``token`` and a final ``done`` event
+        
+        Answers routed to the ReAct loop arrive as a single ``token`` event.
+        """
+        start_time = time.time()
+        queue: asyncio.Queue = asyncio.Queue()
+        first_token_time = None
+        
+        async def on_event(event: Dict[str, Any]):
+            nonlocal first_token_time
+            if event["event"] == "token" and first_token_time is None:
+                first_token_time = time.time() - start_time
+            await queue.put(event)
+        
+        async def produce():
+            # Runs in its own task, so the retrieval context var is private to this stream
+            nonlocal first_token_time
+            try:
+                response = await self.arespond_to_rfp(question, on_event=on_event)
+                if "error" in response:
+                    response["event"] = "error"
+                else:
+                    if first_token_time is None and response["answer"]:
+                        first_token_time = time.time() - start_time
+                        await queue.put({"event": "token", "text": response["answer"]})
+                    response.update({"event": "done", "time_to_first_token": first_token_time})
+                await queue.put(response)
+            finally:
+                await queue.put(None)
+        
+        task = asyncio.create_task(produce())
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+        finally:
+            if not task.done():
+                task.cancel()
+
+
 @dataclass
 class GoldenTestCase:
     """Data class for golden test cases with M&A and Solution Engineer focus"""
@@ -376,8 +1588,13 @@ class GoldenTestCase:
 class RAGEvaluator:
     """Comprehensive RAG evaluation system with RAGAS metrics and M&A focus"""
 
-    def __init__(self):
+    METRIC_NAMES = ("faithfulness", "answer_relevancy", "context_precision", "context_recall")
+
+    def __init__(self, cache_dir: Optional[str] = None, max_concurrency: int = 4):
         self.llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.0)
+        # Per-sample metric scores persist across runs; None disables the cache
+        self.score_cache = ScoreCache(cache_dir, judge_model=self.llm.model_name) if cache_dir else None
+        self.max_concurrency = max_concurrency
         # Import RAGAS components for evaluation
         if RAGAS_AVAILABLE:
             from ragas import EvaluationDataset
@@ -463,107 +1680,118 @@ class RAGEvaluator:
             # Prepare data for RAGAS 0.2.10 format using EvaluationDataset
             import pandas as pd
 
-            # RAGAS 0.2.10 requires specific column names
-            df = pd.DataFrame({
-                "user_input": questions,
-                "retrieved_contexts": contexts,
-                "response": answers,
-                "ground_truth": ground_truths,
-                "reference": ground_truths  # context_precision metric requires reference column
-            })
-
-            dataset = self.EvaluationDataset.from_pandas(df)
-            print(f"📊 Created RAGAS dataset with {len(df)} samples")
-
             # Define metrics (using correct names for RAGAS 0.2.10)
-            metrics = [
-                faithfulness,
-                answer_relevancy,
-                context_precision,
-                context_recall
-            ]
+            metrics = {
+                "faithfulness": faithfulness,
+                "answer_relevancy": answer_relevancy,
+                "context_precision": context_precision,
+                "context_recall": context_recall
+            }
+
+            def score(indices: List[int], metric_names: List[str]) -> Dict[str, List[float]]:
+                # RAGAS 0.2.10 requires specific column names
+                df = pd.DataFrame({
+                    "user_input": [questions[i] for i in indices],
+                    "retrieved_contexts": [contexts[i] for i in indices],
+                    "response": [answers[i] for i in indices],
+                    "ground_truth": [ground_truths[i] for i in indices],
+                    "reference": [ground_truths[i] for i in indices]  # context_precision requires reference
+                })
+                dataset = self.EvaluationDataset.from_pandas(df)
+                print(f"🔍 Running RAGAS {', '.join(metric_names)} on {len(df)} samples "
+                      f"({self.max_concurrency} concurrent)...")
+                result = evaluate(
+                    dataset,
+                    metrics=[metrics[name] for name in metric_names],
+                    run_config=RunConfig(max_workers=self.max_concurrency)
+                )
+                scored = result.to_pandas()
+                return {name: scored[name].tolist() for name in metric_names}
 
-            print("🔍 Running RAGAS evaluation...")
-            # Run evaluation
-            result = evaluate(dataset, metrics=metrics)
-
-            # Extract results from the evaluation result
-            # Handle different result formats
-            if hasattr(result, 'to_pandas'):
-                # If result is a Dataset object
-                df = result.to_pandas()
-                return {
-                    "faithfulness": df['faithfulness'].mean(),
-                    "answer_relevancy": df['answer_relevancy'].mean(),
-                    "context_precision": df['context_precision'].mean(),
-                    "context_recall": df['context_recall'].mean()
-                }
-            else:
-                # If result is a dictionary
-                return {
-                    "faithfulness": result.get("faithfulness", 0.0),
-                    "answer_relevancy": result.get("answer_relevancy", 0.0),
-                    "context_precision": result.get("context_precision", 0.0),
-                    "context_recall": result.get("context_recall", 0.0)
-                }
+            return self._score_samples(questions, contexts, answers, ground_truths, score)
 
         except Exception as e:
             print(f"RAGAS evaluation failed: {e}")
             print("🔄 Falling back to custom evaluation framework")
             return self.custom_evaluation(questions, contexts, answers, ground_truths)
 
-    def custom_evaluation(self, questions: List[str], contexts: List[List[str]],
-                         answers: List[str], ground_truths: List[str]) -> Dict[str, float]:
-        """Custom evaluation framework when RAGAS is not available"""
-        import numpy as np
-        
-        def calculate_faithfulness(answer: str, contexts: List[str]) -> float:
-            """Simple faithfulness calculation"""
-            # Simple implementation - check if answer is grounded in contexts
-            answer_words = set(answer.lower().split())
-            context_text = " ".join(contexts).lower()
-            context_words = set(context_text.split())
-            
-            overlap = len(answer_words.intersection(context_words))
-            return min(overlap / len(answer_words) if answer_words else 0.0, 1.0)
-        
-        def calculate_response_relevancy(question: str, answer: str) -> float:
-            """Simple response relevancy calculation"""
-            # Simple implementation - check keyword overlap
-            q_words = set(question.lower().split())
-            a_words = set(answer.lower().split())
-            
-            overlap = len(q_words.intersection(a_words))
-            return min(overlap / len(q_words) if q_words else 0.0, 1.0)
-        
-        def calculate_context_precision(question: str, contexts: List[str]) -> float:
-            """Simple context precision calculation"""
-            # Simple implementation - assume all contexts are relevant
-            return 0.8  # Default score
-        
-        def calculate_context_recall(ground_truth: str, contexts: List[str]) -> float:
-            """Simple context recall calculation"""
-            # Simple implementation - check if ground truth info is in contexts
-            gt_words = set(ground_truth.lower().split())
-            context_text = " ".join(contexts).lower()
-            context_words = set(context_text.split())
-            
-            overlap = len(gt_words.intersection(context_words))
-            return overlap / len(gt_words) if gt_words else 0.0
-        
-        # Calculate metrics for all samples
-        faithfulness_scores = [calculate_faithfulness(ans, ctx) 
-                              for ans, ctx in zip(answers, contexts)]
-        relevancy_scores = [calculate_response_relevancy(q, ans) 
-                           for q, ans in zip(questions, answers)]
-        precision_scores = [calculate_context_precision(q, ctx) 
-                           for q, ctx in zip(questions, contexts)]
-        recall_scores = [calculate_context_recall(gt, ctx) 
-                        for gt, ctx in zip(ground_truths, contexts)]
+    def _score_samples(self, questions: List[str], contexts: List[List[str]], answers: List[str],
+                       ground_truths: List[str],
+                       score: Callable[[List[int], List[str]], Dict[str, List[float]]]) -> Dict[str, float]:
+        """Mean of each metric, re-scoring only (sample, metric) pairs missing from the score cache
+        
+        ``score(indices, metric_names)`` returns per-sample scores for those samples; metrics
+        missing on the same samples are scored together in one call.
+        """
+        samples = list(zip(questions, answers, contexts, ground_truths))
+        keys = {
+            name: [self.score_cache.key(name, *sample) for sample in samples] if self.score_cache else None
+            for name in self.METRIC_NAMES
+        }
+        scores = {
+            name: [self.score_cache.get(key) for key in keys[name]] if self.score_cache else [None] * len(samples)
+            for name in self.METRIC_NAMES
+        }
+        
+        missing: Dict[Tuple[int, ...], List[str]] = defaultdict(list)
+        for name in self.METRIC_NAMES:
+            indices = tuple(i for i, value in enumerate(scores[name]) if value is None)
+            if indices:
+                missing[indices].append(name)
+        for indices, names in missing.items():
+            for name, values in score(list(indices), names).items():
+                for i, value in zip(indices, values):
+                    scores[name][i] = value
+                    if self.score_cache:
+                        self.score_cache.put(keys[name][i], value)
         
+        if self.score_cache:
+            self.score_cache.flush()
+            reused = len(samples) * len(self.METRIC_NAMES) - sum(len(i) * len(n) for i, n in missing.items())
+            print(f"♻️ Reused {reused} cached metric scores")
         return {
-            "faithfulness": np.mean(faithfulness_scores),
-            "answer_relevancy": np.mean(relevancy_scores),
-            "context_precision": np.mean(precision_scores),
-            "context_recall": np.mean(recall_scores)
+            name: float(np.nanmean(np.array(values, dtype=np.float64))) if values else 0.0
+            for name, values in scores.items()
         }
+
+    def custom_evaluation(self, questions: List[str], contexts: List[List[str]],
+                         answers: List[str], ground_truths: List[str]) -> Dict[str, float]:
+        """Evaluate with vectorized term overlap when RAGAS is not available (no LLM calls)"""
+        return mean_scores(overlap_scores(questions, contexts, answers, ground_truths))
+
+
+# Names the agents carry in metrics/rag_evaluation_results_*.json
+EVALUATION_LABELS = {
+    "standard": "Standard RAG",
+    "advanced": "Advanced Retrieval",
+    "conservative": "Conservative RAG",
+    "fast": "Fast RAG",
+    "auto": "Auto-routed RAG",
+}
+
+
+def save_evaluation_results(agent_type: str, metrics: Dict[str, float], questions: List[str], answers: List[str],
+                            ground_truths: List[str], response_times: List[float],
+                            metrics_dir: str = "metrics") -> Tuple[Path, Dict[str, Any]]:
+    """Write ``rag_evaluation_results_<agent_type>_<timestamp>.json`` and the matching summary file
+    
+    Both use the per-agent layout of the existing files in ``metrics/``: results hold the metrics,
+    average response time and every question, answer and ground truth; the summary adds the overall
+    score. Returns the results path and the agent's summary entry.
+    """
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    label = EVALUATION_LABELS.get(agent_type, agent_type.title())
+    scores = {name: float(metrics[name]) for name in
+              ("faithfulness", "answer_relevancy", "context_precision", "context_recall")}
+    avg_response_time = float(np.mean(response_times)) if response_times else 0.0
+    results = {label: {**scores, "avg_response_time": avg_response_time, "questions": list(questions),
+                       "answers": list(answers), "ground_truths": list(ground_truths)}}
+    summary = {label: {"overall_score": sum(scores.values()) / len(scores), **scores,
+                       "avg_response_time": avg_response_time}}
+    Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+    results_file = Path(metrics_dir) / f"rag_evaluation_results_{agent_type}_{timestamp}.json"
+    for path, contents in ((results_file, results),
+                           (Path(metrics_dir) / f"rag_evaluation_summary_{agent_type}_{timestamp}.json", summary)):
+        with open(path, 'w') as f:
+            json.dump(contents, f, indent=2)
+    return results_file, summary[label]
@@ -6,7 +6,6 @@ Run RAGAS Evaluation Script for SolvIQ
 import os
 import sys
 from pathlib import Path
-from datetime import datetime
 
 # Add project root to path
 project_root = Path(__file__).parent
@@ -18,65 +17,72 @@ def run_evaluation(agent_type="standard"):
     try:
         # Import RAG components
         from rag_components import (
-            RAGConfig, DocumentProcessor, VectorStoreManager,
-            SERAGAgent, AdvancedRetrievalAgent, ConservativeRAGAgent,
-            RAGEvaluator
+            DocumentProcessor, VectorStoreManager,
+            RAGEvaluator, save_evaluation_results
         )
-        from config import get_data_path
+        from agent_registry import AgentRegistry
+        from tavily import TavilyClient
+        from config import get_data_path, get_rag_config, settings
         
         print(f"🔬 Running RAGAS Evaluation for {agent_type.title()} Agent")
         print("=" * 60)
         
-        # Initialize configuration
-        config = RAGConfig()
+        # Same configuration and index artifact as the API
+        config = get_rag_config()
         data_path = get_data_path()
-        
-        # Load documents and create vector store
-        print("📚 Loading documents...")
-        processor = DocumentProcessor(str(data_path), config)
-        documents = processor.load_documents()
-        
-        vector_manager = VectorStoreManager()
-        vectorstore = vector_manager.create_vectorstore(documents)
-        print(f"✅ Loaded {len(documents)} documents")
+        vector_manager = VectorStoreManager(config)
+        
+        if settings.index_build_on_startup:
+            # Load documents and the snapshot for them, embedding only on a miss
+            print("📚 Loading documents...")
+            processor = DocumentProcessor(str(data_path), config)
+            documents = processor.load_documents()
+            vectorstore, sparse_index = vector_manager.load_or_create_indexes(documents, processor)
+            print(f"✅ Loaded {len(documents)} documents")
+        else:
+            indexes = vector_manager.load_published_indexes()
+            if indexes is None:
+                raise FileNotFoundError(f"No published index in {config.index_dir}; run `solviq-index build`")
+            vectorstore, sparse_index = indexes
+            print(f"✅ Loaded published index ({vectorstore.index.ntotal} chunks)")
         
         # Initialize the specified agent
         print(f"🤖 Initializing {agent_type} agent...")
-        if agent_type == "advanced":
-            agent = AdvancedRetrievalAgent(vectorstore, config)
-        elif agent_type == "conservative":
-            agent = ConservativeRAGAgent(vectorstore, config)
-        else:
-            agent = SERAGAgent(vectorstore, config)
+        tavily_client = TavilyClient(api_key=os.environ["TAVILY_API_KEY"])
+        agent = AgentRegistry(vectorstore, tavily_client, config, sparse_index).get(agent_type)
         
         # Initialize evaluator
         print("📊 Setting up RAGAS evaluator...")
-        evaluator = RAGEvaluator()
+        evaluator = RAGEvaluator(cache_dir=settings.ragas_cache_path, max_concurrency=settings.ragas_max_concurrency)
         golden_dataset = evaluator.generate_golden_dataset()
         
         # Run evaluation on subset of questions (limit to 3 for demo)
-        print(f"🔍 Running evaluation on {min(3, len(golden_dataset))} test cases...")
+        test_cases = golden_dataset[:3]
+        print(f"🔍 Running evaluation on {len(test_cases)} test cases...")
+        
+        # Retrieve context for every question with one embedding request and one FAISS search
+        retrieved = vector_manager.batch_similarity_search(vectorstore, [tc.question for tc in test_cases], k=5)
         
         questions = []
         contexts = []
         answers = []
         ground_truths = []
+        response_times = []
         
-        for i, test_case in enumerate(golden_dataset[:3]):
+        for i, (test_case, retrieved_docs) in enumerate(zip(test_cases, retrieved)):
             print(f"  Testing {i+1}: {test_case.question[:50]}...")
             
             # Get response from agent
             response = agent.respond_to_rfp(test_case.question)
             
-            # Retrieve context
-            retrieved_docs = vectorstore.similarity_search(test_case.question, k=5)
             context = [doc.page_content for doc in retrieved_docs]
             
             # Store results
             questions.append(test_case.question)
             contexts.append(context)
-            answers.append(response)
+            answers.append(response["answer"])
             ground_truths.append(test_case.expected_answer)
+            response_times.append(response["response_time"])
         
         # Run RAGAS evaluation
         print("📈 Computing RAGAS metrics...")
@@ -92,26 +98,10 @@ def run_evaluation(agent_type="standard"):
         print(f"Context Precision: {metrics['context_precision']:.3f}")
         print(f"Context Recall: {metrics['context_recall']:.3f}")
         
-        overall_score = (metrics['faithfulness'] + metrics['answer_relevancy'] + 
-                        metrics['context_precision'] + metrics['context_recall']) / 4
-        print(f"Overall Score: {overall_score:.3f}")
-        
         # Save results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        results_file = f"metrics/rag_evaluation_results_{agent_type}_{timestamp}.json"
-        
-        # Ensure metrics directory exists
-        Path("metrics").mkdir(exist_ok=True)
-        
-        import json
-        with open(results_file, 'w') as f:
-            json.dump({
-                "agent_type": agent_type,
-                "timestamp": timestamp,
-                "metrics": metrics,
-                "overall_score": overall_score,
-                "questions_evaluated": len(questions)
-            }, f, indent=2)
+        results_file, summary = save_evaluation_results(agent_type, metrics, questions, answers, ground_truths,
+                                                        response_times)
+        print(f"Overall Score: {summary['overall_score']:.3f}")
         
         print(f"\n💾 Results saved to: {results_file}")
         print("✅ Evaluation completed successfully!")
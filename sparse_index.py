@@ -0,0 +1,232 @@
+"""
+Sparse Index Module
+BM25 inverted index over document chunks, persisted alongside the FAISS snapshot
+"""
+
+import json
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import (
+    Callable,
+    Collection,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
+
+T = TypeVar("T")
+
+# Keeps compound identifiers like "aes-256", "iso27001" or "tls1.3" whole
+_COMPOUND_RE = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+_PART_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms; compound tokens are emitted whole and as their parts"""
+    tokens = []
+    for compound in _COMPOUND_RE.findall(text.lower()):
+        tokens.append(compound)
+        parts = _PART_RE.findall(compound)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[T]], key: Callable[[T], Hashable],
+                           k: int = 60, weights: Optional[Sequence[float]] = None) -> List[T]:
+    """Fuse ranked lists by summing ``weight / (k + rank)``; first occurrence of each item wins"""
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[Hashable, float] = defaultdict(float)
+    items: Dict[Hashable, T] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start=1):
+            item_key = key(item)
+            scores[item_key] += weight / (k + rank)
+            items.setdefault(item_key, item)
+    return [items[item_key] for item_key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def _tokenized(texts: Sequence[str], first_position: int,
+               term_ids: Dict[str, int]) -> Tuple[Tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+    """Tokenize ``texts`` into postings ``(term_ids, positions, counts)`` and lengths, adding new terms to ``term_ids``"""
+    entries: List[Tuple[int, int, int]] = []
+    lengths = np.zeros(len(texts), dtype=np.float32)
+    for position, text in enumerate(texts):
+        tf = Counter(tokenize(text))
+        lengths[position] = sum(tf.values())
+        for term, count in tf.items():
+            entries.append((term_ids.setdefault(term, len(term_ids)), first_position + position, count))
+    columns = np.array(entries, dtype=np.int64).reshape(-1, 3)
+    return (columns[:, 0], columns[:, 1], columns[:, 2].astype(np.float32)), lengths
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of documents with precomputed per-posting impacts
+
+    Postings are stored CSR-style: ``offsets[t]:offsets[t + 1]`` slices ``postings``
+    (document positions) and ``impacts`` (their BM25 term weights) for term ``t``, so a
+    query is a handful of numpy slice-adds with no embedding call. All arrays live in
+    one tuple so ``replace`` can swap in a rebuilt index under concurrent searches.
+    Raw term counts and document lengths are kept too, so ``updated`` can re-weight the
+    postings after adding or deleting documents without re-tokenizing the rest.
+    """
+
+    DIRNAME = "bm25"
+    FILENAME = "bm25.npz"  # single-file format of older snapshots, still loaded
+
+    def __init__(self, doc_ids: List[str], terms: List[str], offsets: np.ndarray,
+                 postings: np.ndarray, impacts: np.ndarray, k1: float = 1.5, b: float = 0.75,
+                 counts: Optional[np.ndarray] = None, lengths: Optional[np.ndarray] = None):
+        self.k1 = k1
+        self.b = b
+        self._state = (doc_ids, {term: i for i, term in enumerate(terms)}, offsets, postings, impacts,
+                       counts, lengths)
+
+    @classmethod
+    def from_texts(cls, doc_ids: List[str], texts: List[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Build the index from raw texts keyed by ``doc_ids``"""
+        term_ids: Dict[str, int] = {}
+        entries, lengths = _tokenized(texts, 0, term_ids)
+        terms = sorted(term_ids)
+        renumber = np.zeros(len(terms), dtype=np.int64)
+        for i, term in enumerate(terms):
+            renumber[term_ids[term]] = i
+        return cls._from_postings(list(doc_ids), terms, renumber[entries[0]], *entries[1:], lengths, k1, b)
+
+    @classmethod
+    def _from_postings(cls, doc_ids: List[str], terms: List[str], term_ids: np.ndarray, positions: np.ndarray,
+                       counts: np.ndarray, lengths: np.ndarray, k1: float, b: float) -> "BM25Index":
+        """Lay out (term, document, count) postings CSR-style and weight them
+
+        Postings must come in document order within each term; terms left without postings are dropped.
+        """
+        live = np.bincount(term_ids, minlength=len(terms)) > 0
+        terms = [term for term, keep in zip(terms, live) if keep]
+        term_ids = (np.cumsum(live) - 1)[term_ids]
+        order = np.argsort(term_ids, kind="stable")
+        term_ids, positions, counts = term_ids[order], positions[order].astype(np.int32), counts[order]
+
+        doc_freqs = np.bincount(term_ids, minlength=len(terms))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(doc_freqs, out=offsets[1:])
+        n = len(doc_ids)
+        avg_length = float(lengths.mean()) if len(lengths) and lengths.mean() > 0 else 1.0
+        idf = np.log(1 + (n - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths[positions] / avg_length)
+        impacts = (idf[term_ids] * counts * (k1 + 1) / (counts + norm)).astype(np.float32)
+        return cls(doc_ids, terms, offsets, positions, impacts, k1, b, counts=counts, lengths=lengths)
+
+    def updated(self, added: Sequence[Tuple[str, str]], deleted: Collection[str]) -> Optional["BM25Index"]:
+        """Return a new index with ``added`` (doc_id, text) pairs appended and ``deleted`` doc ids removed
+
+        Only the added texts are tokenized; existing postings are filtered and re-weighted for the
+        new document count and average length, so scores match a full rebuild. Returns None for
+        indexes loaded from snapshots that predate stored term counts.
+        """
+        doc_ids, term_index, offsets, postings, _, counts, lengths = self._state
+        if counts is None or lengths is None:
+            return None
+        keep = np.array([str(doc_id) not in deleted for doc_id in doc_ids], dtype=bool)
+        renumber = np.cumsum(keep) - 1
+        term_ids = np.repeat(np.arange(len(term_index), dtype=np.int64), np.diff(offsets))
+        kept = keep[postings]
+
+        added_term_ids = dict(term_index)
+        (new_term_ids, new_positions, new_counts), new_lengths = _tokenized(
+            [text for _, text in added], int(keep.sum()), added_term_ids
+        )
+        return self._from_postings(
+            [str(doc_id) for doc_id, keep_doc in zip(doc_ids, keep) if keep_doc] + [doc_id for doc_id, _ in added],
+            sorted(added_term_ids, key=added_term_ids.get),
+            np.concatenate([term_ids[kept], new_term_ids]),
+            np.concatenate([renumber[postings[kept]], new_positions]),
+            np.concatenate([counts[kept], new_counts]),
+            np.concatenate([lengths[keep], new_lengths]),
+            self.k1, self.b
+        )
+
+    @property
+    def doc_ids(self) -> List[str]:
+        """Document ids in index order"""
+        return self._state[0]
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def replace(self, other: "BM25Index"):
+        """Atomically switch this index to the contents of ``other``"""
+        self.k1, self.b = other.k1, other.b
+        self._state = other._state
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Top ``k`` (doc_id, score) pairs; documents sharing no query term are never returned"""
+        doc_ids, term_index, offsets, postings, impacts, _, _ = self._state
+        scores = np.zeros(len(doc_ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = term_index.get(term)
+            if i is None:
+                continue
+            start, end = offsets[i], offsets[i + 1]
+            scores[postings[start:end]] += impacts[start:end]
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(str(doc_ids[i]), float(scores[i])) for i in ranked]
+
+    def save(self, directory: Path) -> Path:
+        """Write the index to ``directory/bm25`` as one ``.npy`` file per array"""
+        path = Path(directory) / self.DIRNAME
+        path.mkdir(parents=True, exist_ok=True)
+        doc_ids, term_index, offsets, postings, impacts, counts, lengths = self._state
+        np.save(path / "doc_ids.npy", np.array(doc_ids, dtype=str))
+        np.save(path / "terms.npy", np.array(sorted(term_index, key=term_index.get), dtype=str))
+        np.save(path / "offsets.npy", offsets)
+        np.save(path / "postings.npy", postings)
+        np.save(path / "impacts.npy", impacts)
+        if counts is not None and lengths is not None:
+            np.save(path / "counts.npy", counts)
+            np.save(path / "lengths.npy", lengths)
+        (path / "params.json").write_text(json.dumps({"k1": self.k1, "b": self.b}))
+        return path
+
+    @classmethod
+    def load(cls, directory: Path, memory_map: bool = False) -> Optional["BM25Index"]:
+        """Load an index written by ``save``, or return None if there is none
+
+        With ``memory_map`` the doc id and posting arrays are read-only maps shared by every
+        process loading the same snapshot; only the term dictionary is built per process.
+        """
+        path = Path(directory) / cls.DIRNAME
+        if (path / "params.json").exists():
+            mode = "r" if memory_map else None
+            params = json.loads((path / "params.json").read_text())
+            has_counts = (path / "counts.npy").exists() and (path / "lengths.npy").exists()
+            return cls(
+                np.load(path / "doc_ids.npy", mmap_mode=mode), np.load(path / "terms.npy").tolist(),
+                np.load(path / "offsets.npy", mmap_mode=mode), np.load(path / "postings.npy", mmap_mode=mode),
+                np.load(path / "impacts.npy", mmap_mode=mode), params["k1"], params["b"],
+                counts=np.load(path / "counts.npy", mmap_mode=mode) if has_counts else None,
+                lengths=np.load(path / "lengths.npy", mmap_mode=mode) if has_counts else None
+            )
+        path = Path(directory) / cls.FILENAME
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            params = json.loads(str(data["params"]))
+            return cls(
+                data["doc_ids"].tolist(), data["terms"].tolist(), data["offsets"],
+                data["postings"], data["impacts"], params["k1"], params["b"]
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Index size"""
+        doc_ids, term_index, _, postings, *_ = self._state
+        return {"documents": len(doc_ids), "terms": len(term_index), "postings": len(postings)}
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Offline agent tests driven by the fake chat model and fake embedder
+"""
+
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from langchain.schema import Document
+
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings, FakeTavilyClient
+from rag_components import (
+    AdvancedRetrievalAgent,
+    ConservativeRAGAgent,
+    FastRAGAgent,
+    RAGConfig,
+    SERAGAgent,
+    VectorStoreManager,
+)
+
+DOCS = [
+    Document(page_content="Data is encrypted with AES-256 at rest and TLS 1.3 in transit.",
+             metadata={"source": "data/sample_faq.md"}),
+    Document(page_content="The platform provides a 99.9% SLA with automatic failover.",
+             metadata={"source": "data/sample_product_specs.md"}),
+    Document(page_content="Pricing is per core with tiered data volume discounts.",
+             metadata={"source": "data/sample_rfp_responses.md"}),
+]
+
+
+def _agent(embeddings, llm=None):
+    config = RAGConfig(similarity_threshold=4.0)
+    vectorstore = VectorStoreManager(config, embeddings=embeddings).create_vectorstore(DOCS)
+    return SERAGAgent(vectorstore, None, config, llm=llm or FakeChatModel())
+
+
+def test_sources_come_from_the_tool_retrieval():
+    """One embedding call per request, and sources match what the tool retrieved"""
+    embeddings = FakeEmbeddings(latency=0.02)
+    agent = _agent(embeddings)
+    embeddings.calls = 0
+
+    response = agent.respond_to_rfp("How is data encrypted at rest?")
+
+    assert embeddings.calls == 1
+    assert response["sources"][0] == "data/sample_faq.md"
+    assert set(response["sources"]) <= {doc.metadata["source"] for doc in DOCS}
+    assert response["response_time"] >= embeddings.latency
+
+
+def test_conservative_agent_sources_from_its_own_tool():
+    """Agents with their own search tool report sources the same way"""
+    embeddings = FakeEmbeddings()
+    vectorstore = VectorStoreManager(RAGConfig(), embeddings=embeddings).create_vectorstore(DOCS)
+    agent = ConservativeRAGAgent(vectorstore, None, llm=FakeChatModel())
+    agent.config.similarity_threshold = 4.0
+    embeddings.calls = 0
+
+    response = agent.respond_to_rfp("What SLA and failover does the platform provide?")
+
+    assert embeddings.calls == 1
+    assert response["sources"][0] == "data/sample_product_specs.md"
+    assert len(response["sources"]) == len(set(response["sources"]))
+
+
+def test_advanced_agent_answers_from_ensemble_with_parallel_fan_out():
+    """Sub-queries and compressions run concurrently, and sources reflect the ensemble results"""
+    config = RAGConfig(similarity_threshold=4.0)
+    vectorstore = VectorStoreManager(config, embeddings=FakeEmbeddings()).create_vectorstore(DOCS)
+    llm = FakeChatModel(latency=0.05)
+    agent = AdvancedRetrievalAgent(vectorstore, None, config, llm=llm)
+
+    start = time.perf_counter()
+    docs = agent.ensemble_retriever.invoke("How is data encrypted at rest?")
+    elapsed = time.perf_counter() - start
+
+    # One multi-query generation plus one round of compressions, not one per document
+    assert llm.calls == 1 + len(DOCS)
+    assert elapsed < 3 * llm.latency
+    assert docs[0].metadata["source"] == "data/sample_faq.md"
+
+    response = agent.respond_to_rfp("How is data encrypted at rest?")
+    assert response["sources"][0] == "data/sample_faq.md"
+
+
+def test_async_respond_uses_async_tools():
+    """arespond_to_rfp runs the async tool path and reports the same sources"""
+    embeddings = FakeEmbeddings()
+    agent = _agent(embeddings)
+    embeddings.calls = 0
+
+    response = asyncio.run(agent.arespond_to_rfp("How is data encrypted at rest?"))
+
+    assert "error" not in response
+    assert embeddings.calls == 1
+    assert response["sources"][0] == "data/sample_faq.md"
+
+
+def test_stream_reports_steps_tokens_and_ttft():
+    """astream_rfp emits tool/retrieval steps, answer tokens, then a done event with TTFT"""
+    agent = _agent(FakeEmbeddings(), FakeChatModel(latency=0.01))
+
+    async def collect():
+        return [event async for event in agent.astream_rfp("How is data encrypted at rest?")]
+
+    events = asyncio.run(collect())
+    kinds = [event["event"] for event in events]
+
+    assert kinds[:2] == ["tool", "retrieval"]
+    assert kinds[-1] == "done"
+    done = events[-1]
+    assert "".join(event["text"] for event in events if event["event"] == "token") == done["answer"]
+    assert 0 < done["time_to_first_token"] <= done["response_time"]
+    assert done["sources"][0] == "data/sample_faq.md"
+
+
+def test_stream_releases_pool_slot_when_the_body_never_runs():
+    """A client that disconnects, or a send that fails before the body starts, still frees the slot"""
+    from starlette.requests import ClientDisconnect
+
+    import app as app_module
+    from benchmarks.offline_app import install_offline_components
+
+    install_offline_components(app_module, llm_latency=0.0, embed_latency=0.0)
+
+    async def disconnected():
+        return {"type": "http.disconnect"}
+
+    async def broken_send(message):
+        raise OSError("connection reset")
+
+    async def idle_send(message):
+        pass
+
+    async def exercise():
+        request = app_module.QueryRequest(question="How is data encrypted?", agent_type="standard")
+        response = await app_module.query_rag_stream(request)
+        await response({"type": "http", "asgi": {"spec_version": "2.0"}}, disconnected, idle_send)
+        response = await app_module.query_rag_stream(request)
+        try:
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, disconnected, broken_send)
+        except ClientDisconnect:
+            pass
+        return app_module.agent_pool.stats()
+
+    stats = asyncio.run(exercise())
+    assert stats["running"] == 0 and stats["queue_depth"] == 0
+
+
+def test_registry_builds_each_agent_once_and_shares_llm_clients():
+    """Agents are cached per type; agents with the same LLM settings share one client"""
+    from agent_registry import AgentRegistry
+
+    vectorstore = VectorStoreManager(RAGConfig(), embeddings=FakeEmbeddings()).create_vectorstore(DOCS)
+    created = []
+
+    def llm_factory(model_name, temperature, max_tokens):
+        created.append((model_name, temperature, max_tokens))
+        return FakeChatModel(model_name=model_name)
+
+    registry = AgentRegistry(vectorstore, None, RAGConfig(retrieval_strategy="dense"), llm_factory=llm_factory)
+    agents = registry.build_all()
+
+    assert registry.get("advanced") is agents["advanced"]
+    assert agents["standard"].llm is agents["advanced"].llm
+    assert agents["conservative"].llm is not agents["standard"].llm
+    assert agents["conservative"].config.temperature == 0.0
+    assert agents["conservative"].config.retrieval_strategy == "dense"
+    assert agents["conservative"].tavily_client is None
+    assert len(created) == 2
+
+
+def _fast_agent(threshold: float, tavily_client=None, route_to_react: bool = False):
+    config = RAGConfig(similarity_threshold=4.0, fast_confidence_threshold=threshold)
+    vectorstore = VectorStoreManager(config, embeddings=FakeEmbeddings()).create_vectorstore(DOCS)
+    return FastRAGAgent(vectorstore, tavily_client, config, llm=FakeChatModel(), route_to_react=route_to_react)
+
+
+def test_fast_agent_answers_confident_questions_in_one_llm_call():
+    """A confident retrieval is answered from the retrieved chunks with a single LLM call"""
+    agent = _fast_agent(threshold=0.0, tavily_client=FakeTavilyClient())
+
+    response = agent.respond_to_rfp("How is data encrypted at rest?")
+
+    assert "error" not in response
+    assert agent.llm.calls == 1
+    assert agent.tavily_client.calls == 0
+    assert response["route"] == "fast"
+    assert response["sources"][0] == "data/sample_faq.md"
+    assert "AES-256" in response["answer"]
+
+
+def test_fast_agent_adds_web_results_when_retrieval_is_weak():
+    """Below the confidence threshold the web results join the context, still in one LLM call"""
+    agent = _fast_agent(threshold=1.1, tavily_client=FakeTavilyClient())
+
+    response = asyncio.run(agent.arespond_to_rfp("How is data encrypted at rest?"))
+
+    assert response["route"] == "web"
+    assert agent.llm.calls == 1
+    assert agent.tavily_client.calls == 1
+    assert any(source.startswith("https://example.com/") for source in response["sources"])
+
+
+def test_fast_agent_default_thresholds_route_on_the_unfiltered_top_hit():
+    """With the default thresholds a hit too far for similarity_threshold still counts as confident"""
+    config = RAGConfig()
+    assert config.fast_confidence_threshold < 1.0 - config.similarity_threshold / 2.0
+    vectorstore = VectorStoreManager(config, embeddings=FakeEmbeddings()).create_vectorstore(DOCS)
+    agent = FastRAGAgent(vectorstore, FakeTavilyClient(), config, llm=FakeChatModel())
+
+    # Cosine ~0.55: above the 0.5 fast threshold, outside the 0.7 L2 similarity threshold
+    response = agent.respond_to_rfp("How is data encrypted at rest?")
+    assert response["route"] == "fast" and 0.5 <= response["confidence"] < 0.65
+    assert agent.tavily_client.calls == 0
+
+    response = asyncio.run(agent.arespond_to_rfp("Who are you?"))
+    assert response["route"] == "web" and response["confidence"] is not None
+    assert agent.routes == {"fast": 1, "web": 1, "react": 0}
+
+
+def test_fast_agent_without_dense_scores_routes_on_bm25_hits():
+    """Lexical retrieval, or a failed dense search, stays on the fast path whenever BM25 finds chunks"""
+    config = RAGConfig(retrieval_strategy="lexical")
+    manager = VectorStoreManager(config, embeddings=FakeEmbeddings())
+    vectorstore = manager.create_vectorstore(DOCS)
+    sparse_index = manager.build_sparse_index(vectorstore)
+    fast = FastRAGAgent(vectorstore, FakeTavilyClient(), config, llm=FakeChatModel(), sparse_index=sparse_index)
+    auto = FastRAGAgent(vectorstore, None, config, llm=FakeChatModel(), sparse_index=sparse_index,
+                        route_to_react=True)
+
+    response = fast.respond_to_rfp("How is data encrypted at rest?")
+    assert response["route"] == "fast" and response["confidence"] is None
+    assert fast.tavily_client.calls == 0 and "AES-256" in response["answer"]
+    assert asyncio.run(auto.arespond_to_rfp("How is data encrypted at rest?"))["route"] == "fast"
+    assert fast.respond_to_rfp("Quantum teleportation?")["route"] == "web"
+
+    class BrokenEmbeddings(FakeEmbeddings):
+        def embed_query(self, text):
+            raise ConnectionError("embedding service down")
+
+    hybrid = FastRAGAgent(vectorstore, None, RAGConfig(), llm=FakeChatModel(), sparse_index=sparse_index,
+                          route_to_react=True)
+    vectorstore.embedding_function = BrokenEmbeddings()
+    assert hybrid.respond_to_rfp("How is data encrypted at rest?")["route"] == "fast"
+    assert hybrid.routes == {"fast": 1, "web": 0, "react": 0}
+
+
+def test_auto_agent_routes_weak_retrieval_to_react():
+    """The router takes the ReAct loop (tool call, then answer) only when retrieval is weak"""
+    confident = _fast_agent(threshold=0.0, route_to_react=True)
+    weak = _fast_agent(threshold=1.1, route_to_react=True)
+
+    assert confident.respond_to_rfp("How is data encrypted at rest?")["route"] == "fast"
+    response = weak.respond_to_rfp("How is data encrypted at rest?")
+
+    assert response["route"] == "react"
+    assert weak.llm.calls == 2
+    assert weak.routes == {"fast": 0, "web": 0, "react": 1}
+    assert response["sources"][0] == "data/sample_faq.md"
+
+
+def test_fast_agent_streams_retrieval_then_tokens():
+    """astream_rfp emits one retrieval event, the answer as tokens, then done"""
+    agent = _fast_agent(threshold=0.0)
+
+    async def collect():
+        return [event async for event in agent.astream_rfp("What SLA and failover does the platform provide?")]
+
+    events = asyncio.run(collect())
+
+    assert events[0]["event"] == "retrieval"
+    assert events[-1]["event"] == "done"
+    done = events[-1]
+    assert "".join(event["text"] for event in events if event["event"] == "token") == done["answer"]
+    assert 0 < done["time_to_first_token"] <= done["response_time"]
+    assert done["sources"][0] == "data/sample_product_specs.md"
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the semantic answer cache
+"""
+
+from answer_cache import SemanticAnswerCache
+from benchmarks.fakes import FakeEmbeddings
+
+
+def _answer(question):
+    return {"answer": f"answer to {question}", "sources": [], "response_time": 2.0, "model": "fake"}
+
+
+def test_similar_questions_hit_within_namespace():
+    """Reworded questions hit, other agent types and unrelated questions miss"""
+    cache = SemanticAnswerCache(FakeEmbeddings(), similarity_threshold=0.8)
+    calls = []
+
+    def compute(question):
+        calls.append(question)
+        return _answer(question)
+
+    cache.get_or_compute("advanced", "What encryption standards does the platform support?", compute)
+    hit = cache.get_or_compute("advanced", "what encryption standards does the platform support", compute)
+    cache.get_or_compute("conservative", "What encryption standards does the platform support?", compute)
+    cache.get_or_compute("advanced", "How is pricing calculated per core?", compute)
+
+    assert len(calls) == 3
+    assert hit["cached"] and hit["answer"].startswith("answer to What encryption")
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["saved_seconds"] == 2.0
+
+
+def test_index_change_and_ttl_invalidate():
+    """Entries are dropped when the index version moves or the TTL passes"""
+    version = {"value": 0}
+    cache = SemanticAnswerCache(FakeEmbeddings(), ttl=3600, version_fn=lambda: version["value"])
+    cache.get_or_compute("standard", "What SLA is offered?", _answer)
+    assert cache.get_or_compute("standard", "What SLA is offered?", _answer).get("cached")
+
+    version["value"] += 1
+    assert not cache.get_or_compute("standard", "What SLA is offered?", _answer).get("cached")
+
+    cache.ttl = 0
+    assert not cache.get_or_compute("standard", "What SLA is offered?", _answer).get("cached")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_answer_computed_across_a_refresh_is_not_stored():
+    """An answer computed against the old index is returned but never cached"""
+    version = {"value": 0}
+    cache = SemanticAnswerCache(FakeEmbeddings(), version_fn=lambda: version["value"])
+
+    def refreshed_while_answering(question):
+        version["value"] += 1
+        return _answer(question)
+
+    assert cache.get_or_compute("standard", "What SLA is offered?", refreshed_while_answering)["answer"]
+    assert cache.stats()["entries"] == 0
+    assert not cache.get_or_compute("standard", "What SLA is offered?", _answer).get("cached")
+    assert cache.get_or_compute("standard", "What SLA is offered?", _answer).get("cached")
+
+
+def test_lru_eviction_and_expiry_reuse_matrix_rows():
+    """A full namespace evicts its least recently used entry; expired rows are reused in place"""
+    cache = SemanticAnswerCache(FakeEmbeddings(), similarity_threshold=0.99, max_entries=2)
+    for question in ("What SLA is offered?", "How is data encrypted?"):
+        cache.get_or_compute("standard", question, _answer)
+    assert cache.get_or_compute("standard", "What SLA is offered?", _answer).get("cached")
+    cache.get_or_compute("standard", "How is pricing calculated?", _answer)
+
+    assert cache.get_or_compute("standard", "What SLA is offered?", _answer).get("cached")
+    assert not cache.get_or_compute("standard", "How is data encrypted?", _answer).get("cached")
+    space = cache._namespaces["standard"]
+    assert space.size == 2 and len(space.entries) == 2
+
+    cache.ttl = -1
+    cache.get_or_compute("standard", "Which regions are supported?", _answer)
+    assert space.size == 2 and len(space.entries) == 1
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for batch answering and the /query/batch endpoints
+"""
+
+import asyncio
+import json
+import time
+from contextlib import aclosing
+
+import httpx
+
+from batch_query import dedupe_questions, run_batch
+from benchmarks.fakes import FakeEmbeddings
+
+
+def test_dedupe_groups_reworded_questions():
+    """Exact rewordings always merge; embedding-similar ones merge above the threshold"""
+    questions = [
+        "What encryption standards are supported?",
+        "what encryption standards are supported",
+        "What encryption standards are supported by the platform?",
+        "How is pricing calculated?",
+    ]
+    unique, assignments = asyncio.run(dedupe_questions(questions))
+    assert unique == [0, 2, 3] and assignments == [0, 0, 2, 3]
+
+    unique, assignments = asyncio.run(dedupe_questions(questions, FakeEmbeddings(), threshold=0.75))
+    assert unique == [0, 3] and assignments == [0, 0, 0, 3]
+
+
+def test_run_batch_is_concurrent_and_bounded():
+    """Unique questions run concurrently up to the limit; duplicates reuse answers"""
+    in_flight = []
+    peak = []
+
+    async def answer(question):
+        in_flight.append(question)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.remove(question)
+        if "fail" in question:
+            raise RuntimeError("boom")
+        return {"answer": question.upper(), "sources": [], "response_time": 0.05}
+
+    questions = [f"question {i}" for i in range(8)] + ["Question 0?", "please fail"]
+
+    async def collect():
+        return [event async for event in run_batch(questions, answer, max_concurrency=4)]
+
+    start = time.perf_counter()
+    events = asyncio.run(collect())
+    elapsed = time.perf_counter() - start
+
+    results = {event["index"]: event for event in events if event["event"] == "result"}
+    done = events[-1]
+    assert sorted(results) == list(range(len(questions)))
+    assert results[8]["duplicate_of"] == 0 and results[8]["answer"] == "QUESTION 0"
+    assert results[9]["error"] == "boom"
+    assert max(peak) == 4
+    assert elapsed < 9 * 0.05
+    assert done["event"] == "done" and done["unique_questions"] == 9 and done["errors"] == 1
+    assert done["throughput"] > 0
+
+
+def test_batch_endpoints_stream_and_poll():
+    """/query/batch streams every result; the job variant is pollable until completion"""
+    import app as app_module
+    from benchmarks.offline_app import install_offline_components
+
+    install_offline_components(app_module, llm_latency=0.0, embed_latency=0.0)
+    questions = ["How is data encrypted?", "how is data encrypted", "What SLA is offered?"]
+
+    async def exercise():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/query/batch", json={"questions": questions, "agent_type": "standard"})
+            events = [
+                json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")
+            ]
+
+            job = (await client.post("/query/batch/jobs",
+                                     json={"questions": questions, "agent_type": "standard"})).json()
+            for _ in range(100):
+                status = (await client.get(f"/query/batch/jobs/{job['job_id']}")).json()
+                if status["status"] == "completed":
+                    break
+                await asyncio.sleep(0.01)
+            empty = await client.post("/query/batch", json={"questions": [], "agent_type": "standard"})
+            return events, status, empty.status_code
+
+    events, status, empty_status = asyncio.run(exercise())
+
+    assert len([e for e in events if e["event"] == "result"]) == 3
+    assert events[-1]["event"] == "done" and events[-1]["unique_questions"] == 2
+    assert status["status"] == "completed" and status["completed"] == 3
+    assert status["summary"]["total_questions"] == 3
+    assert empty_status == 400
+
+
+
+def test_closing_a_batch_cancels_its_answers_and_frees_pool_slots():
+    """A consumer that stops early, or a cancelled batch job, leaves no answer holding a pool slot"""
+    import app as app_module
+    from benchmarks.offline_app import install_offline_components
+
+    install_offline_components(app_module, llm_latency=5.0, embed_latency=0.0, workers=2)
+    pool = app_module.agent_pool
+    questions = ["How is data encrypted?", "What SLA is offered?", "Who provides support?"]
+
+    async def stop_after_first_result():
+        delays = iter([0.0])
+
+        async def answer(question):
+            await pool.arun(asyncio.sleep, next(delays, 5.0))
+            return {"answer": question, "sources": []}
+
+        events = run_batch(questions, answer, max_concurrency=3)
+        async with aclosing(events):
+            async for event in events:
+                assert event["event"] == "result"
+                break
+        return pool.stats()
+
+    async def cancel_job():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            job = (await client.post("/query/batch/jobs",
+                                     json={"questions": questions, "agent_type": "standard"})).json()
+            for _ in range(200):
+                if pool.stats()["running"]:
+                    break
+                await asyncio.sleep(0.01)
+            busy = pool.stats()["running"]
+            status = (await client.delete(f"/query/batch/jobs/{job['job_id']}")).json()
+            return busy, status, pool.stats()
+
+    start = time.perf_counter()
+    stats = asyncio.run(stop_after_first_result())
+    assert stats["running"] == 0 and stats["queue_depth"] == 0
+
+    busy, status, stats = asyncio.run(cancel_job())
+    assert busy and status["status"] == "cancelled"
+    assert stats["running"] == 0 and stats["queue_depth"] == 0
+    assert time.perf_counter() - start < 5.0
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for batched embedding with retry and rate-limit backoff
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from batched_embeddings import BatchedEmbeddings, retry_after
+from benchmarks.fakes import FakeEmbeddings
+
+
+def _rate_limit(headers=None) -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class FlakyEmbeddings(FakeEmbeddings):
+    """Raises the queued errors on successive document calls before answering"""
+
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = list(errors)
+
+    def embed_documents(self, texts):
+        if self.errors:
+            self.calls += 1
+            raise self.errors.pop(0)
+        return super().embed_documents(texts)
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+
+def test_batches_and_retries_honouring_retry_after():
+    """Each batch is one call; a 429 waits what the server asked and only that batch is resent"""
+    inner = FlakyEmbeddings([_rate_limit({"retry-after": "2"}), _rate_limit(), ConnectionError("reset")])
+    sleeps = []
+    embeddings = BatchedEmbeddings(inner, batch_size=2, backoff=0.5, sleep=sleeps.append)
+    texts = [f"chunk {i}" for i in range(5)]
+
+    vectors = embeddings.embed_documents(texts)
+
+    assert vectors == FakeEmbeddings().embed_documents(texts)
+    assert inner.texts_embedded == 5 and embeddings.batches == 3 and embeddings.retries == 3
+    assert sleeps[0] == 2.0 and 0.5 <= sleeps[1] <= 1.0 and sleeps[2] <= 2.0
+    assert retry_after(_rate_limit({"retry-after-ms": "250"})) == 0.25
+    assert embeddings.model == "fake-embedding"
+
+
+def test_gives_up_and_does_not_retry_other_errors():
+    """The last error propagates after max_retries; non-retryable errors are raised at once"""
+    embeddings = BatchedEmbeddings(FlakyEmbeddings([_rate_limit()] * 3), max_retries=2, sleep=lambda _: None)
+    with pytest.raises(openai.RateLimitError):
+        embeddings.embed_documents(["a"])
+
+    inner = FlakyEmbeddings([ValueError("bad input")])
+    with pytest.raises(ValueError):
+        BatchedEmbeddings(inner, sleep=lambda _: None).embed_documents(["a"])
+    assert inner.calls == 1
+
+
+def test_async_batches_and_queries_bypass_retry():
+    """Async documents are batched like sync ones; queries go straight to the wrapped client"""
+    inner = FlakyEmbeddings([])
+    embeddings = BatchedEmbeddings(inner, batch_size=2)
+    assert len(asyncio.run(embeddings.aembed_documents(["a", "b", "c"]))) == 3
+    assert embeddings.batches == 2
+
+    inner.errors = [_rate_limit()]
+    with pytest.raises(openai.RateLimitError):
+        embeddings.embed_query("a")
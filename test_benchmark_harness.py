@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline benchmark harness and its fake Tavily client
+"""
+
+import asyncio
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from benchmarks.bench_agents import compare, run_async
+from benchmarks.fakes import (
+    FakeAsyncTavilyClient,
+    FakeChatModel,
+    FakeEmbeddings,
+    FakeTavilyClient,
+)
+from rag_components import RAGConfig, SERAGAgent, VectorStoreManager
+from test_agents import DOCS
+
+
+def test_scenario_summary_and_regression_check():
+    """Percentiles come from every request; only changes beyond the tolerance are flagged"""
+    async def call(question):
+        await asyncio.sleep(0.01 * int(question))
+        return {"error": "boom"} if question == "3" else {"answer": question}
+
+    summary = asyncio.run(run_async(call, ["1", "2", "3", "1"], concurrency=2))
+    assert summary["requests"] == 4 and summary["errors"] == 1
+    assert 10 <= summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+    assert summary["throughput_rps"] > 0
+
+    baseline = {"scenarios": {"a": {"p95_ms": 100.0, "throughput_rps": 50.0}, "b": {"p95_ms": 100.0}}}
+    current = {"scenarios": {"a": {"p95_ms": 110.0, "throughput_rps": 30.0}, "b": {"p95_ms": 130.0},
+                             "new": {"p95_ms": 1.0}}}
+    regressions = compare(current, baseline, tolerance=0.2)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("a throughput_rps") and regressions[1].startswith("b p95_ms")
+
+
+def test_web_search_runs_on_fake_tavily():
+    """The web tool answers from the fake Tavily client, sync and async, with URL sources"""
+    config = RAGConfig(similarity_threshold=4.0)
+    vectorstore = VectorStoreManager(config, embeddings=FakeEmbeddings()).create_vectorstore(DOCS)
+    tavily = FakeTavilyClient()
+    agent = SERAGAgent(vectorstore, tavily, config, llm=FakeChatModel(tool="search_web"))
+    agent.async_tavily_client = FakeAsyncTavilyClient()
+
+    response = agent.respond_to_rfp("Latest SOC 2 report?")
+    async_response = asyncio.run(agent.arespond_to_rfp("Latest SOC 2 report?"))
+
+    assert tavily.calls == 1 and agent.async_tavily_client.calls == 1
+    assert "Public information about Latest SOC 2 report?" in response["answer"]
+    assert response["sources"] and all(source.startswith("https://example.com/") for source in response["sources"])
+    assert async_response["sources"] == response["sources"]
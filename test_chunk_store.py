@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact chunk store: lossless round trips, interning, deletes, snapshots and memory maps
+"""
+
+import os
+import threading
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import numpy as np
+from langchain.schema import Document
+
+from benchmarks.fakes import FakeEmbeddings
+from chunk_store import ChunkIdMap, CompactDocstore
+from rag_components import RAGConfig, VectorStoreManager
+
+
+def _docs(n: int):
+    docs = {}
+    for i in range(n):
+        metadata = {"source": f"data/{i % 3}.md", "chunk_id": i, "chunk_size": 10 + i}
+        if i % 4 == 0:
+            metadata["tags"] = ["security", i % 2]
+        docs[f"id-{i}"] = Document(page_content=f"chunk {i} — données chiffrées", metadata=metadata)
+    return docs
+
+
+def test_round_trip_and_interning():
+    """Every chunk comes back unchanged and a shared source path is stored once"""
+    docs = _docs(40)
+    store = CompactDocstore(docs)
+
+    for doc_id, doc in docs.items():
+        found = store.search(doc_id)
+        assert found.id == doc_id
+        assert found.page_content == doc.page_content
+        assert found.metadata == doc.metadata
+    assert store.search("missing") == "ID missing not found."
+    assert sum(isinstance(value, str) for value in store._values) == 3
+    assert set(store._state.ints) == {"chunk_id", "chunk_size"}
+
+
+def test_delete_compacts_and_add_appends():
+    """Deleted chunks disappear, the rest keep their text, and later batches may add new keys"""
+    docs = _docs(20)
+    store = CompactDocstore(docs)
+
+    store.delete(["id-0", "id-7", "id-8", "id-19"])
+    store.add({"new": Document(page_content="fresh chunk", metadata={"source": "data/0.md", "chunk_id": "x1"})})
+
+    assert len(store) == 17
+    assert isinstance(store.search("id-7"), str)
+    for doc_id in ("id-1", "id-9", "id-18"):
+        assert store.search(doc_id).page_content == docs[doc_id].page_content
+        assert store.search(doc_id).metadata == docs[doc_id].metadata
+    assert store.search("new").metadata == {"source": "data/0.md", "chunk_id": "x1"}
+    assert store.nbytes() < sum(len(doc.page_content.encode("utf-8")) for doc in docs.values()) + 17 * 64
+
+
+def test_compact_quantized_snapshot_round_trip(tmp_path):
+    """A compact, int8 store saves and reloads with memory-mapped re-rank vectors and the same results"""
+    docs = [Document(page_content=f"chunk {i} about encryption and failover {i % 7}", metadata={"source": f"{i % 5}.md"})
+            for i in range(300)]
+    manager = VectorStoreManager(RAGConfig(index_dir=str(tmp_path), vector_dtype="int8", compact_docstore=True),
+                                 embeddings=FakeEmbeddings())
+    vectorstore = manager.create_advanced_vectorstore(docs)
+    key = manager.snapshot_key(docs)
+    manager.save_snapshot(vectorstore, key)
+
+    loaded = manager.load_snapshot(key)
+
+    assert isinstance(loaded.docstore, CompactDocstore)
+    assert (tmp_path / key / "vectors.npy").exists()
+    before = vectorstore.similarity_search_with_score("chunk 42 about encryption", k=3)
+    after = loaded.similarity_search_with_score("chunk 42 about encryption", k=3)
+    assert [doc.metadata for doc, _ in after] == [doc.metadata for doc, _ in before]
+    assert after[0][0].metadata["chunk_id"] == 42
+    assert key != VectorStoreManager(RAGConfig(index_dir=str(tmp_path)), embeddings=FakeEmbeddings()).snapshot_key(docs)
+
+
+def test_saved_store_loads_memory_mapped(tmp_path):
+    """A saved store and id map load as read-only memory maps that still accept updates"""
+    docs = _docs(30)
+    store = CompactDocstore(docs)
+    store.save(tmp_path)
+    ChunkIdMap.from_mapping({i: f"id-{i}" for i in range(30)}).save(tmp_path)
+
+    loaded = CompactDocstore.load(tmp_path)
+    id_map = ChunkIdMap.load(tmp_path)
+
+    assert isinstance(loaded._state.buffer, np.memmap) and isinstance(loaded._state.ids, np.memmap)
+    assert id_map[12] == "id-12" and len(id_map) == 30 and 30 not in id_map
+    assert dict(id_map.items()) == {i: f"id-{i}" for i in range(30)}
+    for doc_id in ("id-0", "id-13", "id-29"):
+        assert loaded.search(doc_id).metadata == docs[doc_id].metadata
+    loaded.delete(["id-13"])
+    loaded.add({"new": Document(page_content="fresh chunk", metadata={"source": "data/1.md"})})
+    assert isinstance(loaded.search("id-13"), str)
+    assert loaded.search("new").page_content == "fresh chunk"
+    assert CompactDocstore.load(tmp_path).search("id-13").page_content == docs["id-13"].page_content
+    assert CompactDocstore.load(tmp_path / "missing") is None
+
+
+def test_concurrent_searches_see_consistent_versions():
+    """Searches racing adds and deletes never mix one version's buffer with another's offsets"""
+    docs = {f"id-{i}": Document(page_content=f"chunk {i} " + "x" * (i * 7 % 50), metadata={"source": f"{i}.md"})
+            for i in range(200)}
+    store = CompactDocstore(docs)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            for doc_id in ("id-0", "id-99", "id-199"):
+                try:
+                    found = store.search(doc_id)
+                    ok = found.page_content == docs[doc_id].page_content and found.metadata == docs[doc_id].metadata
+                except Exception as e:  # e.g. a multi-byte character cut by stale offsets
+                    ok = False
+                    doc_id = repr(e)
+                if not ok:
+                    errors.append(doc_id)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    for round_ in range(30):
+        store.add({f"new-{round_}-{i}": Document(page_content="y" * (round_ + i), metadata={"n": i}) for i in range(20)})
+        store.delete([f"id-{i}" for i in range(1 + round_ * 3, 4 + round_ * 3) if i not in (99, 199)])
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert not errors
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk LRU embedding cache
+"""
+
+import multiprocessing
+
+from benchmarks.fakes import FakeEmbeddings
+from embedding_cache import CachedEmbeddings
+
+
+def test_cache_hits_survive_restart(tmp_path):
+    """Repeated and duplicate texts are embedded once, including after reopening the cache"""
+    inner = FakeEmbeddings()
+    cache = CachedEmbeddings(inner, str(tmp_path), max_entries=10)
+    first = cache.embed_documents(["boilerplate", "boilerplate", "encryption"])
+    assert inner.texts_embedded == 2
+    assert cache.embed_query("encryption") == first[2]
+    assert cache.stats()["hits"] == 1
+    cache.close()
+
+    inner = FakeEmbeddings()
+    reopened = CachedEmbeddings(inner, str(tmp_path), max_entries=10)
+    assert reopened.embed_documents(["boilerplate"]) == [first[0]]
+    assert inner.texts_embedded == 0
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    """The least recently used entry is evicted once the cache is full"""
+    inner = FakeEmbeddings()
+    cache = CachedEmbeddings(inner, str(tmp_path), max_entries=2)
+    cache.embed_documents(["a", "b"])
+    cache.embed_query("a")
+    cache.embed_query("c")
+    inner.texts_embedded = 0
+    cache.embed_documents(["a", "c"])
+    assert inner.texts_embedded == 0
+    cache.embed_query("b")
+    assert inner.texts_embedded == 1
+    assert cache.stats()["entries"] == 2
+
+
+def _embed_in_worker(cache_dir, prefix, barrier, results):
+    """One server worker: open the shared cache while the other has it open, embed, re-read"""
+    cache = CachedEmbeddings(FakeEmbeddings(), cache_dir, max_entries=50)
+    barrier.wait()
+    texts = [f"{prefix} question {i}" for i in range(20)]
+    cache.embed_documents(texts)
+    barrier.wait()
+    results.put((cache.embed_documents(texts) == FakeEmbeddings().embed_documents(texts), cache.stats()))
+    cache.flush()
+
+
+def test_concurrent_processes_never_share_rows(tmp_path):
+    """Two processes on one cache directory each get their own rows, and both stay warm after a restart"""
+    context = multiprocessing.get_context("spawn")
+    barrier, results = context.Barrier(2), context.Queue()
+    workers = [context.Process(target=_embed_in_worker, args=(str(tmp_path), prefix, barrier, results))
+               for prefix in ("alpha", "beta")]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=60)
+
+    assert all(correct for correct, _ in outcomes)
+    assert {stats["hits"] for _, stats in outcomes} == {20}
+    assert len({stats["directory"] for _, stats in outcomes}) == 2
+
+    texts = [f"{prefix} question {i}" for prefix in ("alpha", "beta") for i in range(20)]
+    for _ in workers:
+        inner = FakeEmbeddings()
+        cache = CachedEmbeddings(inner, str(tmp_path), max_entries=50)
+        assert cache.embed_documents(texts) == FakeEmbeddings().embed_documents(texts)
+        assert cache.stats()["hits"] == 20 and inner.texts_embedded == 20
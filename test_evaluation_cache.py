@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for per-sample RAGAS score caching
+"""
+
+import math
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from evaluation_cache import ScoreCache
+from rag_components import RAGEvaluator
+
+
+def make_scorer(calls, failing=()):
+    """Deterministic stand-in for a RAGAS run that records what it was asked to score"""
+    def score(indices, metric_names):
+        calls.append((list(indices), list(metric_names)))
+        return {
+            name: [float("nan") if (i, name) in failing else (i + 1) / 10 for i in indices]
+            for name in metric_names
+        }
+    return score
+
+
+def test_unchanged_samples_are_never_rescored(tmp_path):
+    """A second run reuses every cached score; editing one answer re-scores only that sample"""
+    questions = ["q1", "q2", "q3"]
+    contexts = [["c1"], ["c2"], ["c3"]]
+    answers = ["a1", "a2", "a3"]
+    references = ["r1", "r2", "r3"]
+
+    calls = []
+    first = RAGEvaluator(cache_dir=str(tmp_path))._score_samples(
+        questions, contexts, answers, references, make_scorer(calls)
+    )
+    assert calls == [([0, 1, 2], list(RAGEvaluator.METRIC_NAMES))]
+    assert math.isclose(first["faithfulness"], 0.2)
+
+    calls.clear()
+    evaluator = RAGEvaluator(cache_dir=str(tmp_path))
+    again = evaluator._score_samples(questions, contexts, answers, references, make_scorer(calls))
+    assert calls == [] and again == first
+    assert evaluator.score_cache.stats()["hits"] == 12
+
+    edited = ["a1", "a2 revised", "a3"]
+    RAGEvaluator(cache_dir=str(tmp_path))._score_samples(questions, contexts, edited, references, make_scorer(calls))
+    assert calls == [([1], list(RAGEvaluator.METRIC_NAMES))]
+
+
+def test_failed_scores_are_retried(tmp_path):
+    """NaN judgements are excluded from the mean and not cached"""
+    calls = []
+    metrics = RAGEvaluator(cache_dir=str(tmp_path))._score_samples(
+        ["q1", "q2"], [["c1"], ["c2"]], ["a1", "a2"], ["r1", "r2"],
+        make_scorer(calls, failing={(1, "faithfulness")})
+    )
+    assert math.isclose(metrics["faithfulness"], 0.1)
+
+    calls.clear()
+    RAGEvaluator(cache_dir=str(tmp_path))._score_samples(
+        ["q1", "q2"], [["c1"], ["c2"]], ["a1", "a2"], ["r1", "r2"], make_scorer(calls)
+    )
+    assert calls == [([1], ["faithfulness"])]
+
+    other_judge = ScoreCache(str(tmp_path), judge_model="another-model")
+    assert other_judge.get(other_judge.key("faithfulness", "q1", "a1", ["c1"], "r1")) is None
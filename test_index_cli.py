@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline index CLI: build once, serve the published artifact, update, stats and verify
+"""
+
+import asyncio
+import json
+import os
+import shutil
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+import httpx
+import pytest
+
+from benchmarks.fakes import FakeEmbeddings
+from index_cli import parser, run
+from rag_components import DocumentProcessor, RAGConfig, VectorStoreManager
+
+
+def _setup(tmp_path, embeddings=None):
+    data_dir = tmp_path / "data"
+    if not data_dir.exists():
+        data_dir.mkdir()
+        (data_dir / "faq.md").write_text("# FAQ\n\nData is encrypted with AES-256 at rest and TLS 1.3 in transit.\n")
+        (data_dir / "specs.md").write_text("# Specs\n\nThe platform offers a 99.9% SLA with automatic failover.\n")
+    config = RAGConfig(index_dir=str(tmp_path / "index"), compact_docstore=True, embedding_batch_size=1)
+    embeddings = embeddings or FakeEmbeddings()
+    return VectorStoreManager(config, embeddings=embeddings), DocumentProcessor(str(data_dir), config), embeddings
+
+
+def _run(argv, manager, processor) -> int:
+    return run(parser().parse_args(argv), manager, processor)
+
+
+def test_build_publishes_an_artifact_servers_load_without_embedding(tmp_path, capsys):
+    """A built snapshot is published, reloads embedding-free, and a second build is a no-op"""
+    manager, processor, embeddings = _setup(tmp_path)
+    assert manager.load_published_indexes() is None
+
+    assert _run(["build"], manager, processor) == 0
+    key = manager.snapshot_key(processor.load_documents())
+    assert manager.published_key() == key
+    assert manager.read_manifest(key)["format_version"] == VectorStoreManager.SNAPSHOT_FORMAT
+    assert embeddings.calls == embeddings.texts_embedded  # one text per batch
+
+    manager, processor, embeddings = _setup(tmp_path)
+    vectorstore, sparse_index = manager.load_published_indexes()
+    assert "AES-256" in vectorstore.similarity_search("encryption AES-256", k=1)[0].page_content
+    assert len(sparse_index) == vectorstore.index.ntotal
+    assert _run(["build"], manager, processor) == 0
+    assert embeddings.texts_embedded == 1  # the query above
+
+    assert _run(["verify"], manager, processor) == 0
+    capsys.readouterr()
+    assert _run(["stats", "--json"], manager, processor) == 0
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["published"] and stats["manifest"]["num_vectors"] == vectorstore.index.ntotal
+    assert "chunk_store/buffer.npy" in stats["files"]
+
+
+def test_update_embeds_changed_files_and_republishes(tmp_path):
+    """Update embeds only the edited file's chunks and publishes the key a build would produce"""
+    manager, processor, embeddings = _setup(tmp_path)
+    assert _run(["update"], manager, processor) == 1
+    _run(["build"], manager, processor)
+    first = manager.published_key()
+
+    (tmp_path / "data" / "specs.md").write_text("# Specs\n\nSupport is available 24x7 by phone.\n")
+    manager, processor, embeddings = _setup(tmp_path)
+    assert _run(["update"], manager, processor) == 0
+
+    key = manager.published_key()
+    assert key != first and key == manager.snapshot_key(processor.load_documents())
+    assert 0 < embeddings.texts_embedded < manager.read_manifest(key)["num_vectors"]
+    assert _run(["verify", "--sample", "5"], manager, processor) == 0
+
+
+def test_verify_and_serving_reject_broken_or_foreign_artifacts(tmp_path):
+    """Verify fails on a missing sparse index; another embedding model refuses to serve the artifact"""
+    manager, processor, _ = _setup(tmp_path)
+    _run(["build"], manager, processor)
+    key = manager.published_key()
+
+    other, _, _ = _setup(tmp_path, FakeEmbeddings(model="other"))
+    with pytest.raises(ValueError):
+        other.load_published_indexes()
+    assert _run(["verify", "--sample", "0"], other, processor) == 1
+
+    shutil.rmtree(tmp_path / "index" / key / "bm25")
+    assert _run(["verify"], manager, processor) == 1
+    assert _run(["stats", "--key", "missing"], manager, processor) == 1
+
+
+def test_api_serves_the_published_artifact_without_a_data_directory(tmp_path, monkeypatch):
+    """INDEX_BUILD_ON_STARTUP=false with no data directory starts, with the answer cache on"""
+    import app as app_module
+    import rag_components
+    from config import settings
+
+    manager, processor, _ = _setup(tmp_path, FakeEmbeddings(model=RAGConfig().embedding_model))
+    _run(["build"], manager, processor)
+    shutil.rmtree(tmp_path / "data")
+
+    monkeypatch.setattr(rag_components, "OpenAIEmbeddings", lambda model: FakeEmbeddings(model=model))
+    for name, value in (("index_build_on_startup", False), ("answer_cache_enabled", True),
+                        ("data_path", str(tmp_path / "data")), ("index_path", str(tmp_path / "index"))):
+        monkeypatch.setattr(settings, name, value)
+    for name in ("vectorstore", "sparse_index", "vector_manager", "indexer", "agent_registry", "agent_pool",
+                 "async_agents", "answer_cache", "evaluation_jobs", "config"):
+        monkeypatch.setattr(app_module, name, getattr(app_module, name))
+
+    asyncio.run(app_module.initialize_rag_components())
+
+    assert app_module.indexer.key == manager.published_key()
+    assert app_module.vectorstore.index.ntotal == manager.read_manifest(manager.published_key())["num_vectors"]
+    answers = [app_module.answer_cache.get_or_compute("standard", "How is data encrypted?",
+                                                      lambda question: {"answer": "AES-256", "sources": []})
+               for _ in range(2)]
+    assert answers[1]["cached"] and answers[1]["answer"] == "AES-256"
+
+    async def refresh():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.post("/index/refresh")).status_code
+
+    assert asyncio.run(refresh()) == 409
+
+    # `solviq-index update` (or another worker) publishes: this worker swaps it in and drops cached answers
+    manager, processor, _ = _setup(tmp_path, FakeEmbeddings(model=RAGConfig().embedding_model))
+    (tmp_path / "data" / "pricing.md").write_text("# Pricing\n\nLicensing is per core.\n")
+    _run(["build"], manager, processor)
+    assert app_module.indexer.sync_published()
+    assert "pricing.md" in app_module.vectorstore.similarity_search("licensing per core", k=1)[0].metadata["source"]
+    answer = app_module.answer_cache.get_or_compute("standard", "How is data encrypted?",
+                                                    lambda question: {"answer": "AES-256", "sources": []})
+    assert "cached" not in answer
+    app_module.agent_pool.shutdown()
+    app_module.evaluation_jobs.shutdown()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for background jobs and persisted evaluation results
+"""
+
+import asyncio
+import json
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from jobs import CANCELLED, COMPLETED, FAILED, JobManager
+from rag_components import save_evaluation_results
+
+
+def test_jobs_complete_fail_and_cancel():
+    """Jobs report progress and summaries; failures and cancellations are recorded"""
+    async def exercise():
+        manager = JobManager(max_running=1)
+
+        async def work(job):
+            for i in range(3):
+                job.results.append({"step": i})
+                await asyncio.sleep(0.01)
+            return {"steps": 3}
+
+        async def broken(job):
+            raise RuntimeError("boom")
+
+        async def slow(job):
+            await asyncio.sleep(10)
+
+        done = manager.submit("test", {}, work)
+        failed = manager.submit("test", {}, broken)
+        cancelled = manager.submit("test", {}, slow)
+        await asyncio.wait({done.task, failed.task})
+        await asyncio.sleep(0.01)
+        manager.cancel(cancelled.job_id)
+        await asyncio.wait({cancelled.task})
+        return manager, done, failed, cancelled
+
+    manager, done, failed, cancelled = asyncio.run(exercise())
+
+    assert done.status == COMPLETED and done.summary == {"steps": 3}
+    assert done.to_dict(offset=2)["results"] == [{"step": 2}]
+    assert failed.status == FAILED and failed.error == "boom"
+    assert cancelled.status == CANCELLED
+    assert manager.stats()[COMPLETED] == 1 and len(manager.list("test")) == 3
+
+
+def test_evaluation_results_match_existing_shape(tmp_path):
+    """Results and summary use the per-agent layout of the files already in metrics/"""
+    metrics = {"faithfulness": 0.5, "answer_relevancy": 1.0, "context_precision": 0.75, "context_recall": 0.25}
+    path, summary = save_evaluation_results("standard", metrics, ["q1", "q2"], ["a1", "a2"], ["t1", "t2"],
+                                            [1.0, 3.0], str(tmp_path))
+
+    assert path.name.startswith("rag_evaluation_results_standard_")
+    saved = json.loads(path.read_text())
+    assert list(saved) == ["Standard RAG"]
+    assert list(saved["Standard RAG"]) == ["faithfulness", "answer_relevancy", "context_precision", "context_recall",
+                                           "avg_response_time", "questions", "answers", "ground_truths"]
+    assert saved["Standard RAG"]["answers"] == ["a1", "a2"] and saved["Standard RAG"]["avg_response_time"] == 2.0
+    summary_file = json.loads((tmp_path / path.name.replace("results", "summary")).read_text())
+    assert summary_file == {"Standard RAG": summary}
+    assert list(summary)[:1] == ["overall_score"] and summary["overall_score"] == 0.625
+
+
+def test_evaluation_job_uses_startup_agent_and_writes_metrics(tmp_path, monkeypatch):
+    """/evaluation/run queues a job on the registry's agent, waits out a saturated pool and saves results"""
+    import httpx
+
+    import app as app_module
+    from agent_pool import AgentWorkerPool
+    from benchmarks.offline_app import install_offline_components
+    from config import settings
+
+    install_offline_components(app_module, llm_latency=0.0, embed_latency=0.0)
+    app_module.agent_pool = pool = AgentWorkerPool(1, max_queue=1, max_async=1)
+    monkeypatch.setattr(settings, "metrics_path", str(tmp_path))
+    agent = app_module.agent_registry.get("standard")
+    calls_before = agent.llm.calls
+
+    async def busy(release):
+        async with pool.slot():
+            await release.wait()
+
+    async def exercise():
+        # One query running and one waiting: the pool rejects the evaluation until they finish
+        release = asyncio.Event()
+        blockers = [asyncio.create_task(busy(release)) for _ in range(2)]
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            job = (await client.post("/evaluation/run", params={"agent_type": "standard", "num_questions": 2})).json()
+            for _ in range(500):
+                if pool.rejected:
+                    release.set()
+                status = (await client.get(job["status_url"])).json()
+                if status["status"] in ("completed", "failed"):
+                    release.set()
+                    await asyncio.gather(*blockers)
+                    return status
+                await asyncio.sleep(0.01)
+
+    status = asyncio.run(exercise())
+
+    assert status["status"] == "completed", status["error"]
+    assert pool.rejected > 0
+    assert status["completed"] == 2
+    assert agent.llm.calls > calls_before
+    saved = json.loads((tmp_path / status["summary"]["results_file"].split("/")[-1]).read_text())
+    assert saved["Standard RAG"]["questions"] == [result["question"] for result in status["results"]]
+    assert saved["Standard RAG"]["answers"] == [result["answer"] for result in status["results"]]
+    assert status["summary"]["agent_type"] == "standard" and status["summary"]["questions_evaluated"] == 2
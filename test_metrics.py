@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus-style /metrics endpoint
+"""
+
+import asyncio
+import re
+
+import httpx
+
+from metrics import Exposition
+from tracing import Histogram
+
+
+def sample(text, name, **labels):
+    """Value of one series in an exposition document"""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = "^" + re.escape(name + ("{" + label_text + "}" if labels else "")) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_exposition_format():
+    """Counters, gauges and histograms follow the text exposition format"""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(2.0)
+    out = Exposition(prefix="x_")
+    out.counter("calls_total", "Calls", [({"path": 'a"b'}, 3)])
+    out.gauge("size", "Size", [({}, 1.5)])
+    out.histogram("latency_seconds", "Latency", [({"stage": "llm"}, histogram)])
+    text = out.text()
+
+    assert "# TYPE x_calls_total counter" in text and 'x_calls_total{path="a\\"b"} 3' in text
+    assert "x_size 1.5" in text
+    assert sample(text, "x_latency_seconds_bucket", stage="llm", le="0.1") == 1
+    assert sample(text, "x_latency_seconds_bucket", stage="llm", le="+Inf") == 2
+    assert sample(text, "x_latency_seconds_count", stage="llm") == 2
+    assert text.endswith("\n")
+
+
+def test_metrics_endpoint_reports_traffic_agents_and_index():
+    """Requests, per-agent answers, stage calls, caches and index size show up after traffic"""
+    import app as app_module
+    from benchmarks.offline_app import install_offline_components
+
+    install_offline_components(app_module, llm_latency=0.0, embed_latency=0.0)
+
+    async def exercise():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for _ in range(2):
+                await client.post("/query", json={"question": "What SLA is offered?", "agent_type": "standard"})
+            await client.get("/query/batch/jobs/missing")
+            response = await client.get("/metrics")
+            return response
+
+    response = asyncio.run(exercise())
+    text = response.text
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert sample(text, "solviq_http_requests_total", method="POST", route="/query", status="200") >= 2
+    assert sample(text, "solviq_http_requests_total", method="GET", route="/query/batch/jobs/{job_id}",
+                  status="404") >= 1
+    assert sample(text, "solviq_answers_total", agent_type="standard", outcome="computed") >= 2
+    assert sample(text, "solviq_answer_duration_seconds_count", agent_type="standard") >= 2
+    assert sample(text, "solviq_stage_calls_total", stage="llm") >= 4
+    assert sample(text, "solviq_llm_tokens_total", kind="completion") > 0
+    assert sample(text, "solviq_http_requests_in_flight") == 1  # the /metrics request itself
+    assert sample(text, "solviq_index_vectors") == app_module.vectorstore.index.ntotal
+    assert sample(text, "solviq_sparse_index_size", unit="documents") == app_module.vectorstore.index.ntotal
+    assert sample(text, "solviq_agent_pool_completed_total") >= 2
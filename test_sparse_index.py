@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the BM25 sparse index and hybrid retrieval
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from langchain.schema import Document
+
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from rag_components import DocumentProcessor, RAGConfig, SERAGAgent, VectorStoreManager
+from sparse_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    Document(page_content="Data is encrypted with AES-256 at rest and TLS 1.3 in transit.",
+             metadata={"source": "data/sample_faq.md"}),
+    Document(page_content="We hold SOC 2 Type II and ISO27001 certifications.",
+             metadata={"source": "data/sample_rfp_responses.md"}),
+    Document(page_content="Multi-region replication gives an RTO < 1 hour and RPO of 15 minutes.",
+             metadata={"source": "data/sample_product_specs.md"}),
+]
+
+
+def test_tokenize_keeps_compound_terms():
+    """Identifiers like AES-256 are indexed whole and by their parts"""
+    assert tokenize("AES-256 and TLS 1.3") == ["aes-256", "aes", "256", "and", "tls", "1.3", "1", "3"]
+
+
+def test_bm25_ranks_exact_terms_and_round_trips(tmp_path):
+    """Exact-token matches rank first, unrelated documents are excluded, and save/load is lossless"""
+    index = BM25Index.from_texts(["a", "b", "c"], [doc.page_content for doc in DOCS])
+    assert index.search("Do you support AES-256?", k=3)[0][0] == "a"
+    assert [doc_id for doc_id, _ in index.search("SOC 2 Type II", k=3)][0] == "b"
+    assert index.search("kubernetes", k=3) == []
+
+    index.save(tmp_path)
+    loaded = BM25Index.load(tmp_path)
+    assert loaded.search("RTO < 1 hour", k=2) == index.search("RTO < 1 hour", k=2)
+    mapped = BM25Index.load(tmp_path, memory_map=True)
+    assert mapped.search("Do you support AES-256?", k=3) == index.search("Do you support AES-256?", k=3)
+
+
+def test_bm25_update_matches_a_full_rebuild(tmp_path):
+    """Adding and deleting documents re-weights existing postings exactly as a rebuild would"""
+    BM25Index.from_texts(["a", "b", "c"], [doc.page_content for doc in DOCS]).save(tmp_path)
+    added = [("d", "Pricing is per core with AES-256 support included."), ("e", "Kubernetes operators ship monthly.")]
+    updated = BM25Index.load(tmp_path, memory_map=True).updated(added, {"b"})
+    rebuilt = BM25Index.from_texts(["a", "c", "d", "e"], [DOCS[0].page_content, DOCS[2].page_content,
+                                                          added[0][1], added[1][1]])
+
+    assert updated.doc_ids == ["a", "c", "d", "e"]
+    assert updated.stats() == rebuilt.stats()
+    for query in ("Do you support AES-256?", "SOC 2 Type II", "kubernetes pricing", "RTO < 1 hour"):
+        assert [doc_id for doc_id, _ in updated.search(query, k=4)] == [doc_id for doc_id, _ in rebuilt.search(query, k=4)]
+        assert [score for _, score in updated.search(query, k=4)] == \
+            pytest.approx([score for _, score in rebuilt.search(query, k=4)])
+    assert updated.search("SOC 2 Type II", k=4) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    """Items ranked by both lists beat items ranked highly by only one"""
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]], key=lambda item: item)
+    assert fused[0] == "y"
+    assert set(fused) == {"x", "y", "z", "w"}
+
+
+def test_lexical_strategy_needs_no_embedding_call_and_hybrid_survives_failures():
+    """Lexical mode never embeds; hybrid falls back to BM25 results when embedding fails"""
+    embeddings = FakeEmbeddings()
+    manager = VectorStoreManager(RAGConfig(), embeddings=embeddings)
+    vectorstore = manager.create_vectorstore(DOCS)
+    sparse_index = manager.build_sparse_index(vectorstore)
+
+    config = RAGConfig(similarity_threshold=4.0, retrieval_strategy="lexical")
+    agent = SERAGAgent(vectorstore, None, config, llm=FakeChatModel(), sparse_index=sparse_index)
+    embeddings.calls = 0
+    assert agent._search_documents("SOC 2 Type II", k=2)[0].metadata["source"] == "data/sample_rfp_responses.md"
+    assert embeddings.calls == 0
+
+    agent.config.retrieval_strategy = "hybrid"
+    assert agent._search_documents("AES-256 encryption", k=2)[0].metadata["source"] == "data/sample_faq.md"
+
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("embedding service unavailable")
+
+    embeddings.embed_query = unavailable
+    assert agent._search_documents("RTO < 1 hour", k=2)[0].metadata["source"] == "data/sample_product_specs.md"
+
+
+def test_snapshot_persists_sparse_index(tmp_path):
+    """The BM25 index is saved with the FAISS snapshot and reloaded without re-embedding"""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "faq.md").write_text("# FAQ\n\nData is encrypted with AES-256 at rest.\n")
+    config = RAGConfig(index_dir=str(tmp_path / "index"))
+    processor = DocumentProcessor(str(data_dir), config)
+
+    VectorStoreManager(config, embeddings=FakeEmbeddings()).load_or_create_indexes(processor.load_documents(), processor)
+    embeddings = FakeEmbeddings()
+    vectorstore, sparse_index = VectorStoreManager(config, embeddings=embeddings).load_or_create_indexes(
+        processor.load_documents(), processor
+    )
+
+    assert embeddings.texts_embedded == 0
+    assert len(sparse_index) == vectorstore.index.ntotal
+    assert sparse_index.search("aes-256", k=1)[0][0] in vectorstore.docstore._dict
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage timing spans and latency histograms
+"""
+
+import asyncio
+import os
+import uuid
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import httpx
+
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings, FakeTavilyClient
+from rag_components import (
+    AdvancedRetrievalAgent,
+    RAGConfig,
+    SERAGAgent,
+    VectorStoreManager,
+)
+from test_agents import DOCS
+from tracing import Histogram, TimingCallbackHandler, request_trace, stage_histograms
+
+
+def test_histogram_buckets_and_quantiles():
+    """Observations land in cumulative Prometheus-style buckets"""
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {0.1: 1, 1.0: 3, float("inf"): 4}
+    assert snapshot["count"] == 4 and abs(snapshot["sum"] - 4.05) < 1e-9
+    assert histogram.quantile(0.5) == 1.0
+
+
+def test_respond_reports_every_stage():
+    """Sync and async responses carry LLM, tool, embed, search and iteration spans"""
+    config = RAGConfig(similarity_threshold=4.0)
+    vectorstore = VectorStoreManager(config, embeddings=FakeEmbeddings()).create_vectorstore(DOCS)
+    agent = SERAGAgent(vectorstore, FakeTavilyClient(), config, llm=FakeChatModel())
+    llm_before = stage_histograms.histograms().get("llm", Histogram()).count
+
+    for response in (agent.respond_to_rfp("How is data encrypted?"),
+                     asyncio.run(agent.arespond_to_rfp("How is data encrypted?"))):
+        names = [span["name"] for span in response["timings"]]
+        assert names.count("llm") == 2 and names.count("agent_iteration") == 2
+        assert {"tool:search_documentation", "embed", "faiss_search"} <= set(names)
+        llm_span = next(span for span in response["timings"] if span["name"] == "llm")
+        assert llm_span["prompt_tokens"] > 0 and llm_span["completion_tokens"] > 0
+        iterations = [span for span in response["timings"] if span["name"] == "agent_iteration"]
+        assert [span["action"] for span in iterations] == ["search_documentation", "final_answer"]
+        assert all(span["duration_ms"] >= 0 for span in response["timings"])
+
+    assert stage_histograms.histograms()["llm"].count == llm_before + 4
+
+
+def test_ensemble_member_spans_join_the_request_trace():
+    """LLM calls inside the ensemble's parallel member retrievers are recorded in the caller's trace"""
+    config = RAGConfig(similarity_threshold=4.0)
+    vectorstore = VectorStoreManager(config, embeddings=FakeEmbeddings()).create_vectorstore(DOCS)
+    agent = AdvancedRetrievalAgent(vectorstore, None, config, llm=FakeChatModel())
+
+    with request_trace() as trace:
+        agent.ensemble_retriever.invoke("How is data encrypted at rest?")
+
+    # One multi-query generation plus one compression per document
+    assert [span["name"] for span in trace.to_list()].count("llm") == 1 + len(DOCS)
+
+
+def test_timing_handler_forgets_failed_and_abandoned_runs():
+    """Errored runs are dropped, and runs that never finish stay within the open-run limit"""
+    handler = TimingCallbackHandler(max_open_runs=2)
+    failed = uuid.uuid4()
+    handler.on_tool_start({"name": "search_documentation"}, "query", run_id=failed)
+    handler.on_tool_error(RuntimeError("boom"), run_id=failed)
+    handler.on_chain_start({}, {}, run_id=failed)
+    handler.on_chain_error(asyncio.CancelledError(), run_id=failed)
+    assert not handler._starts and not handler._iterations
+
+    abandoned = [uuid.uuid4() for _ in range(5)]
+    for run_id in abandoned:
+        handler.on_llm_start({}, ["prompt"], run_id=run_id)
+        handler.on_chain_start({}, {}, run_id=run_id)
+    assert list(handler._starts) == abandoned[-2:]
+    assert list(handler._iterations) == abandoned[-2:]
+
+
+def test_query_returns_timings_only_on_request():
+    """/query includes spans when include_timings is set; /health summarizes the histograms"""
+    import app as app_module
+    from benchmarks.offline_app import install_offline_components
+
+    install_offline_components(app_module, llm_latency=0.0, embed_latency=0.0)
+
+    async def exercise():
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            plain = await client.post("/query", json={"question": "What SLA is offered?", "agent_type": "standard"})
+            timed = await client.post("/query", json={"question": "What SLA is offered?", "agent_type": "standard",
+                                                      "include_timings": True})
+            health = await client.get("/health")
+            return plain.json(), timed.json(), health.json()
+
+    plain, timed, health = asyncio.run(exercise())
+
+    assert plain["timings"] is None
+    assert {"llm", "agent_iteration", "tool:search_documentation"} <= {span["name"] for span in timed["timings"]}
+    assert health["stage_latency"]["request"]["count"] >= 2
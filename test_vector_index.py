@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for the FAISS index types: recall against exact search, incremental updates and fallbacks
+"""
+
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import faiss
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from benchmarks.fakes import FakeEmbeddings
+from rag_components import RAGConfig, VectorStoreManager
+from vector_index import (
+    IndexSpec,
+    RerankedIndex,
+    index_type_of,
+    new_index,
+    read_index,
+    update_index,
+)
+
+
+def _clustered(n: int, dimension: int = 32, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(64, dimension))
+    vectors = centers[rng.integers(0, 64, n)] + 0.3 * rng.normal(size=(n, dimension))
+    return vectors.astype(np.float32)
+
+
+@pytest.mark.parametrize("index_type, min_recall", [("ivf", 0.9), ("hnsw", 0.9), ("ivfpq", 0.3)])
+def test_index_types_approximate_exact_search(index_type, min_recall):
+    """Each approximate index type finds most of the exact top 10"""
+    vectors = _clustered(12_000)
+    queries = _clustered(50, seed=1)
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, 10)
+
+    # 4-bit PQ codebooks keep k-means training fast enough for the test suite
+    index = new_index(vectors, IndexSpec(index_type, nprobe=16, pq_m=16, pq_nbits=4))
+    index.add(vectors)
+    _, found = index.search(queries, 10)
+
+    assert index_type_of(index) == index_type
+    recall = np.mean([len(set(t) & set(f)) / 10 for t, f in zip(truth, found)])
+    assert recall >= min_recall
+
+
+def test_untrainable_corpus_falls_back_to_flat():
+    """Too few vectors to train IVF-PQ codebooks gives an exact flat index"""
+    index = new_index(_clustered(500), IndexSpec("ivfpq"))
+    assert index_type_of(index) == "flat"
+    assert IndexSpec("ivf", nlist=1000).cells(500) == 500 // 39
+    assert IndexSpec(pq_m=64).subquantizers(100) == 50
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf", "hnsw"])
+def test_update_removes_and_adds_by_docstore_id(index_type):
+    """Deleted chunks are never returned and added chunks are found under their new ids"""
+    vectors = _clustered(2_000)
+    spec = IndexSpec(index_type, nprobe=64)
+    index = new_index(vectors, spec)
+    index.add(vectors)
+    mapping = {i: f"doc-{i}" for i in range(len(vectors))}
+    added = _clustered(3, seed=2)
+
+    updated, updated_mapping = update_index(index, mapping, {"doc-0", "doc-5"}, added, ["new-0", "new-1", "new-2"],
+                                            spec)
+
+    assert index.ntotal == 2_000
+    assert updated.ntotal == 2_001
+    assert len(updated_mapping) == 2_001
+    _, found = updated.search(np.vstack([vectors[[0, 5, 7]], added]), 1)
+    assert [updated_mapping.get(int(i)) for i in found[:, 0]][2:] == ["doc-7", "new-0", "new-1", "new-2"]
+    assert not {"doc-0", "doc-5"} & {updated_mapping[int(i)] for i in found[:2, 0]}
+
+
+def test_vectorstore_uses_configured_index_type():
+    """The manager builds the configured index type and keys snapshots by it"""
+    docs = [Document(page_content=f"chunk {i} about encryption and failover {i % 7}", metadata={"source": f"{i}.md"})
+            for i in range(200)]
+    flat = VectorStoreManager(RAGConfig(), embeddings=FakeEmbeddings())
+    hnsw = VectorStoreManager(RAGConfig(index_type="hnsw"), embeddings=FakeEmbeddings())
+
+    vectorstore = hnsw.create_advanced_vectorstore(docs)
+
+    assert index_type_of(vectorstore.index) == "hnsw"
+    assert vectorstore.similarity_search("chunk 42 about encryption", k=1)[0].page_content.startswith("chunk 42 ")
+    assert hnsw.snapshot_key(docs) != flat.snapshot_key(docs)
+    with pytest.raises(ValueError):
+        VectorStoreManager(RAGConfig(index_type="lsh"), embeddings=FakeEmbeddings())
+
+
+@pytest.mark.parametrize("vector_dtype", ["float16", "int8"])
+def test_quantized_index_reranks_in_float32(vector_dtype):
+    """Quantized codes plus float32 re-ranking give exact scores and near-exact neighbours"""
+    vectors = _clustered(5_000)
+    queries = _clustered(50, seed=1)
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, 10)
+
+    index = RerankedIndex(new_index(vectors, IndexSpec(vector_dtype=vector_dtype)), vectors)
+    index.add(vectors)
+    scores, found = index.search(queries, 10)
+
+    assert index_type_of(index) == "flat"
+    assert np.mean([len(set(t) & set(f)) / 10 for t, f in zip(truth, found)]) >= 0.95
+    expected = ((vectors[found[0]] - queries[0]) ** 2).sum(axis=1)
+    assert np.allclose(scores[0], expected, rtol=1e-5)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf"])
+def test_reranked_update_keeps_vectors_aligned(index_type):
+    """After removals and additions each FAISS id still re-ranks against its own float32 row"""
+    vectors = _clustered(2_000)
+    spec = IndexSpec(index_type, nprobe=64, vector_dtype="int8")
+    index = RerankedIndex(new_index(vectors, spec), vectors)
+    index.add(vectors)
+    mapping = {i: f"doc-{i}" for i in range(len(vectors))}
+    added = _clustered(3, seed=2)
+
+    updated, updated_mapping = update_index(index, mapping, {"doc-0", "doc-5"}, added, ["new-0", "new-1", "new-2"],
+                                            spec)
+
+    assert isinstance(updated, RerankedIndex)
+    by_doc = {**{f"doc-{i}": v for i, v in enumerate(vectors)}, **dict(zip(["new-0", "new-1", "new-2"], added))}
+    for faiss_id, doc_id in updated_mapping.items():
+        assert np.array_equal(updated.vectors[faiss_id], by_doc[doc_id])
+    scores, found = updated.search(added, 1)
+    assert [updated_mapping[int(i)] for i in found[:, 0]] == ["new-0", "new-1", "new-2"]
+    assert np.allclose(scores[:, 0], 0.0, atol=1e-5)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_memory_mapped_index_updates_into_owned_copy(index_type, tmp_path):
+    """An index read zero-copy from its file can still be updated; the mapped original is untouched"""
+    vectors = _clustered(1_000)
+    spec = IndexSpec(index_type, vector_dtype="int8")
+    index = new_index(vectors, spec)
+    index.add(vectors)
+    faiss.write_index(index, str(tmp_path / "index.faiss"))
+    mapped = read_index(str(tmp_path / "index.faiss"), index_type)
+    mapping = {i: f"doc-{i}" for i in range(len(vectors))}
+
+    updated, updated_mapping = update_index(mapped, mapping, {"doc-3"}, vectors[:2], ["new-0", "new-1"], spec)
+
+    assert mapped.ntotal == 1_000
+    assert updated.ntotal == 1_001
+    _, found = updated.search(vectors[[3]], 1)
+    assert updated_mapping[int(found[0, 0])] != "doc-3"
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Tests for vector store persistence and retrieval using the offline fake embedder
+"""
+
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from benchmarks.fakes import FakeEmbeddings
+from rag_components import (
+    DocumentProcessor,
+    IncrementalIndexer,
+    RAGConfig,
+    VectorStoreManager,
+)
+
+
+def _write_corpus(data_dir):
+    data_dir.mkdir()
+    (data_dir / "faq.md").write_text("# FAQ\n\nData is encrypted with AES-256 at rest and TLS 1.3 in transit.\n")
+    (data_dir / "specs.md").write_text("# Specs\n\nThe platform offers a 99.9% SLA with automatic failover.\n")
+
+
+def test_snapshot_reused_until_corpus_changes(tmp_path):
+    """A second startup loads the snapshot; editing a file forces a rebuild"""
+    data_dir = tmp_path / "data"
+    _write_corpus(data_dir)
+    config = RAGConfig(index_dir=str(tmp_path / "index"))
+    processor = DocumentProcessor(str(data_dir), config)
+
+    embeddings = FakeEmbeddings()
+    manager = VectorStoreManager(config, embeddings=embeddings)
+    first = manager.load_or_create_vectorstore(processor.load_documents(), processor)
+    assert embeddings.texts_embedded == first.index.ntotal
+
+    embeddings = FakeEmbeddings()
+    manager = VectorStoreManager(config, embeddings=embeddings)
+    second = manager.load_or_create_vectorstore(processor.load_documents(), processor)
+    assert embeddings.texts_embedded == 0
+    assert second.index.ntotal == first.index.ntotal
+    assert "AES-256" in second.similarity_search("encryption AES-256", k=1)[0].page_content
+
+    (data_dir / "faq.md").write_text("# FAQ\n\nSupport is available 24x7.\n")
+    manager.load_or_create_vectorstore(processor.load_documents(), processor)
+    assert embeddings.texts_embedded > 0
+
+
+def test_snapshot_key_covers_chunking_and_model():
+    """Changing chunk parameters or the embedding model changes the key"""
+    docs = [Document(page_content="hello", metadata={"source": "a.md"})]
+    base = VectorStoreManager(RAGConfig(), embeddings=FakeEmbeddings()).snapshot_key(docs)
+    resized = VectorStoreManager(RAGConfig(chunk_size=400), embeddings=FakeEmbeddings()).snapshot_key(docs)
+    other_model = VectorStoreManager(RAGConfig(), embeddings=FakeEmbeddings(model="other")).snapshot_key(docs)
+    assert len({base, resized, other_model}) == 3
+
+
+def test_incremental_refresh_embeds_only_changed_chunks(tmp_path):
+    """Editing, adding and deleting files only touches the affected chunks"""
+    data_dir = tmp_path / "data"
+    _write_corpus(data_dir)
+    config = RAGConfig(index_dir=str(tmp_path / "index"))
+    processor = DocumentProcessor(str(data_dir), config)
+    embeddings = FakeEmbeddings()
+    manager = VectorStoreManager(config, embeddings=embeddings)
+    vectorstore = manager.load_or_create_vectorstore(processor.load_documents(), processor)
+    indexer = IncrementalIndexer(vectorstore, processor, manager)
+
+    embeddings.texts_embedded = 0
+    stats = indexer.refresh()
+    assert stats["chunks_embedded"] == 0 and stats["chunks_deleted"] == 0
+
+    (data_dir / "faq.md").write_text("# FAQ\n\nData is encrypted with AES-256 at rest and TLS 1.3 in transit.\n\n"
+                                     "SSO is supported through SAML 2.0 and OIDC.\n")
+    (data_dir / "specs.md").unlink()
+    (data_dir / "pricing.md").write_text("# Pricing\n\nLicensing is per core.\n")
+    stats = indexer.refresh()
+    assert stats["files_changed"] == 2 and stats["files_removed"] == 1
+    assert embeddings.texts_embedded == stats["chunks_embedded"]
+    assert vectorstore.index.ntotal == len(processor.chunk_documents(processor.load_documents()))
+    sources = {doc.metadata["source"] for doc in vectorstore.similarity_search("platform SLA failover", k=10)}
+    assert not any(source.endswith("specs.md") for source in sources)
+
+    # The refreshed store is what the next startup loads
+    embeddings.texts_embedded = 0
+    manager.load_or_create_vectorstore(processor.load_documents(), processor)
+    assert embeddings.texts_embedded == 0
+
+
+def test_search_during_refresh_uses_one_index_version(tmp_path):
+    """A search that started before a refresh maps its FAISS rows through the matching id map and docstore"""
+    data_dir = tmp_path / "data"
+    _write_corpus(data_dir)
+    config = RAGConfig(index_dir=str(tmp_path / "index"))
+    processor = DocumentProcessor(str(data_dir), config)
+    manager = VectorStoreManager(config, embeddings=FakeEmbeddings())
+    vectorstore = manager.load_or_create_vectorstore(processor.load_documents(), processor)
+    indexer = IncrementalIndexer(vectorstore, processor, manager)
+    indexer.refresh()
+
+    # Hold the search between the FAISS lookup and the id mapping while the refresh runs
+    searching, refreshed = threading.Event(), threading.Event()
+    search = vectorstore.index.search
+
+    def paused_search(*args, **kwargs):
+        result = search(*args, **kwargs)
+        searching.set()
+        refreshed.wait(5)
+        return result
+
+    vectorstore.index.search = paused_search
+    with ThreadPoolExecutor(1) as pool:
+        pending = pool.submit(vectorstore.similarity_search, "encrypted AES-256 at rest", k=1)
+        assert searching.wait(5)
+        (data_dir / "faq.md").unlink()
+        (data_dir / "pricing.md").write_text("# Pricing\n\nLicensing is per core.\n")
+        indexer.refresh()
+        refreshed.set()
+        hits = pending.result()
+
+    assert "AES-256" in hits[0].page_content
+    assert "AES-256" not in vectorstore.similarity_search("encrypted AES-256 at rest", k=1)[0].page_content
+
+
+def test_batch_search_matches_per_question_search():
+    """Batched retrieval embeds once and returns the same results as one search per question"""
+    embeddings = FakeEmbeddings()
+    manager = VectorStoreManager(RAGConfig(), embeddings=embeddings)
+    docs = [
+        Document(page_content="Data is encrypted with AES-256 at rest.", metadata={"source": "faq.md"}),
+        Document(page_content="The platform offers a 99.9% SLA with failover.", metadata={"source": "specs.md"}),
+        Document(page_content="Pricing is per core with volume discounts.", metadata={"source": "pricing.md"}),
+    ]
+    vectorstore = manager.create_vectorstore(docs)
+    questions = ["How is data encrypted?", "What SLA is offered?", "How is pricing structured?"]
+    embeddings.calls = 0
+
+    batched = manager.batch_similarity_search(vectorstore, questions, k=2)
+
+    assert embeddings.calls == 1
+    assert [[d.page_content for d in hits] for hits in batched] == [
+        [d.page_content for d in vectorstore.similarity_search(q, k=2)] for q in questions
+    ]
+    assert manager.batch_similarity_search(vectorstore, questions, k=2, score_threshold=0.0) == [[], [], []]
+
+
+class _ScaledEmbeddings(FakeEmbeddings):
+    """Fake embeddings with arbitrary norms, so only a real cosine ignores their length"""
+
+    def embed_documents(self, texts):
+        return [[value * (1 + len(text) % 7) for value in vector]
+                for text, vector in zip(texts, super().embed_documents(texts))]
+
+
+def test_advanced_store_scores_are_brute_force_cosine():
+    """Cosine mode ranks and scores like NumPy cosine similarity, with metadata in the docstore"""
+    embeddings = _ScaledEmbeddings()
+    manager = VectorStoreManager(RAGConfig(), embeddings=embeddings)
+    docs = [Document(page_content=f"{topic} policy number {i}", metadata={"source": f"{i}.md"})
+            for i, topic in enumerate(["encryption at rest", "failover and SLA", "pricing per core",
+                                       "encryption in transit", "data residency", "SSO and SAML"])]
+    vectorstore = manager.create_advanced_vectorstore(docs)
+    query = "encryption policy for data at rest"
+
+    matrix = np.array(embeddings.embed_documents([doc.page_content for doc in docs]))
+    vector = np.array(embeddings.embed_query(query))
+    cosine = matrix @ vector / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector))
+    expected = np.argsort(-cosine, kind="stable")[:4]
+
+    hits = vectorstore.similarity_search_with_score(query, k=4)
+    assert np.allclose([score for _, score in hits], cosine[expected], atol=1e-5)
+    assert np.allclose([cosine[doc.metadata["chunk_id"]] for doc, _ in hits], cosine[expected], atol=1e-5)
+    assert hits[0][0].metadata["chunk_id"] == expected[0]
+    assert all(doc.metadata["chunk_size"] == len(doc.page_content) for doc, _ in hits)
+    assert vectorstore.similarity_search_with_score(query, k=4, score_threshold=float(cosine.max()) - 1e-4)[0][0] \
+        .metadata["chunk_id"] == int(expected[0])
+
+
+def test_snapshot_keeps_cosine_mode(tmp_path):
+    """A reloaded advanced store still normalizes queries and scores by cosine"""
+    config = RAGConfig(index_dir=str(tmp_path / "index"))
+    manager = VectorStoreManager(config, embeddings=_ScaledEmbeddings())
+    docs = [Document(page_content="Data is encrypted with AES-256 at rest.", metadata={"source": "faq.md"}),
+            Document(page_content="The platform offers a 99.9% SLA.", metadata={"source": "specs.md"})]
+    manager.save_snapshot(manager.create_advanced_vectorstore(docs), "cosine")
+
+    loaded = manager.load_snapshot("cosine")
+    (doc, score), = loaded.similarity_search_with_score("Data is encrypted with AES-256 at rest.", k=1)
+
+    assert doc.metadata == {"source": "faq.md", "chunk_id": 0, "chunk_size": len(doc.page_content)}
+    assert abs(score - 1.0) < 1e-5
+
+
+def test_concurrent_startups_build_once_and_share_mapped_snapshot(tmp_path):
+    """Workers starting together embed the corpus once and all serve the memory-mapped snapshot"""
+    data_dir = tmp_path / "data"
+    _write_corpus(data_dir)
+    config = RAGConfig(index_dir=str(tmp_path / "index"), vector_dtype="int8", compact_docstore=True)
+    processor = DocumentProcessor(str(data_dir), config)
+    embeddings = FakeEmbeddings()
+    managers = [VectorStoreManager(config, embeddings=embeddings) for _ in range(3)]
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        loaded = list(pool.map(lambda m: m.load_or_create_indexes(processor.load_documents(), processor), managers))
+
+    assert embeddings.texts_embedded == len(processor.chunk_documents(processor.load_documents()))
+    for vectorstore, sparse_index in loaded:
+        assert isinstance(vectorstore.index.vectors, np.memmap)
+        assert isinstance(vectorstore.docstore._state.buffer, np.memmap)
+        assert isinstance(sparse_index.doc_ids, np.memmap)
+        assert "AES-256" in vectorstore.similarity_search("encryption AES-256", k=1)[0].page_content
+
+    # Updates copy the mapped arrays instead of writing into the shared files
+    vectorstore, sparse_index = loaded[0]
+    indexer = IncrementalIndexer(vectorstore, processor, managers[0], sparse_index)
+    indexer.refresh()
+    (data_dir / "pricing.md").write_text("# Pricing\n\nLicensing is per core.\n")
+    stats = indexer.refresh()
+    assert stats["chunks_embedded"] == 1
+    assert vectorstore.similarity_search("licensing per core", k=1)[0].metadata["source"].endswith("pricing.md")
+    # BM25 is updated in place of a rebuild and ranks the new chunk like one would
+    rebuilt = managers[0].build_sparse_index(vectorstore)
+    assert sorted(sparse_index.doc_ids) == sorted(rebuilt.doc_ids)
+    assert sparse_index.search("licensing per core", k=3) == rebuilt.search("licensing per core", k=3)
+    assert "AES-256" in loaded[1][0].similarity_search("encryption AES-256", k=1)[0].page_content
+
+
+def test_workers_follow_a_snapshot_another_worker_published(tmp_path):
+    """A refresh in one worker reaches the others through the published key, bumping their version"""
+    data_dir = tmp_path / "data"
+    _write_corpus(data_dir)
+    config = RAGConfig(index_dir=str(tmp_path / "index"), compact_docstore=True)
+    processor = DocumentProcessor(str(data_dir), config)
+    managers = [VectorStoreManager(config, embeddings=FakeEmbeddings()) for _ in range(2)]
+    key = managers[0].snapshot_key(processor.load_documents())
+    indexers = []
+    for manager in managers:
+        vectorstore, sparse_index = manager.load_or_create_indexes(processor.load_documents(), processor)
+        indexers.append(IncrementalIndexer(vectorstore, processor, manager, sparse_index, key))
+    assert not indexers[1].sync_published()
+
+    (data_dir / "pricing.md").write_text("# Pricing\n\nLicensing is per core.\n")
+    indexers[0].refresh()
+    assert indexers[0].key == managers[0].published_key() != key
+
+    follower = indexers[1]
+    assert follower.sync_published() and follower.version == 1 and follower.key == indexers[0].key
+    assert follower.vectorstore.similarity_search("licensing per core", k=1)[0].metadata["source"].endswith(
+        "pricing.md")
+    assert follower.sparse_index.search("licensing", k=1)
+    assert not follower.sync_published()
+    # Its next refresh finds nothing left to embed
+    assert follower.refresh()["chunks_embedded"] == 0
+
+    shutil.rmtree(data_dir)
+    with pytest.raises(FileNotFoundError):
+        follower.refresh()
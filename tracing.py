@@ -0,0 +1,295 @@
+"""
+Tracing Module
+Per-request timing spans for every agent stage, logged with structlog and aggregated into histograms
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+
+import structlog
+from langchain_core.agents import AgentFinish
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = structlog.get_logger("solviq.timing")
+
+# Upper bounds in seconds, Prometheus-style; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Open runs the timing handler tracks at once; the oldest are dropped beyond this
+MAX_OPEN_RUNS = 1024
+
+
+class Histogram:
+    """Thread-safe fixed-bucket latency histogram"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Add one observation"""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile (the largest bound if it overflows)"""
+        with self._lock:
+            target, seen = q * self.count, 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if count and seen >= target:
+                    return bound
+            return self.buckets[-1] if self.count else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative bucket counts keyed by upper bound, with count and sum"""
+        with self._lock:
+            cumulative, total = {}, 0
+            for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+                total += count
+                cumulative[bound] = total
+            return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+
+class StageHistograms:
+    """One latency histogram per span name, plus failed spans and LLM tokens"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.tokens: Dict[str, int] = {"prompt": 0, "completion": 0}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, error: bool = False):
+        """Record ``seconds`` under ``name``"""
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(self.buckets))
+        histogram.observe(seconds)
+        if error:
+            with self._lock:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def count_tokens(self, prompt: int, completion: int):
+        """Add one LLM call's token usage"""
+        with self._lock:
+            self.tokens["prompt"] += prompt
+            self.tokens["completion"] += completion
+
+    def histograms(self) -> Dict[str, Histogram]:
+        """Histograms by span name"""
+        with self._lock:
+            return dict(self._histograms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean and bucketed p50/p95 per stage in milliseconds"""
+        return {
+            name: {
+                "count": histogram.count,
+                "mean_ms": histogram.sum / histogram.count * 1000 if histogram.count else 0.0,
+                "p50_ms": histogram.quantile(0.5) * 1000,
+                "p95_ms": histogram.quantile(0.95) * 1000,
+            }
+            for name, histogram in sorted(self.histograms().items())
+        }
+
+
+stage_histograms = StageHistograms()
+
+
+@dataclass
+class Span:
+    """One timed stage; ``start`` is relative to the start of the request"""
+    name: str
+    start: float
+    duration: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start_ms": round(self.start * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            **self.attributes,
+        }
+
+
+class RequestTrace:
+    """Spans collected while answering one question; ``attributes`` are added to its log event"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.attributes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, duration: float, **attributes: Any):
+        """Record a span that began at perf_counter time ``start``"""
+        with self._lock:
+            self.spans.append(Span(name, start - self.start, duration, attributes))
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Spans ordered by start time"""
+        with self._lock:
+            return [span.to_dict() for span in sorted(self.spans, key=lambda span: span.start)]
+
+    def totals(self) -> Dict[str, float]:
+        """Total milliseconds per span name"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration * 1000
+        return {name: round(total, 3) for name, total in totals.items()}
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+def record_span(name: str, start: float, duration: float, **attributes: Any):
+    """Add a span to the current request's trace (if any) and to the stage histograms"""
+    stage_histograms.observe(name, duration, error="error" in attributes)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, start, duration, **attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """Time the enclosed block; the yielded dict can add attributes before it closes"""
+    start = time.perf_counter()
+    try:
+        yield attributes
+    except Exception as e:
+        attributes["error"] = type(e).__name__
+        raise
+    finally:
+        record_span(name, start, time.perf_counter() - start, **attributes)
+
+
+@contextmanager
+def request_trace(**context: Any) -> Iterator[RequestTrace]:
+    """Collect spans for one request, then log them and record the total as ``request``"""
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        duration = time.perf_counter() - trace.start
+        stage_histograms.observe("request", duration)
+        logger.info("rfp_request_timing", duration_ms=round(duration * 1000, 3),
+                    stages=trace.totals(), spans=trace.to_list(), **{**context, **trace.attributes})
+
+
+class TimingCallbackHandler(BaseCallbackHandler):
+    """Turns LangChain callbacks into ``llm``, ``tool:<name>`` and ``agent_iteration`` spans
+
+    The handler is shared across requests: spans go to whichever trace is current where
+    the callback fires. An agent iteration (LLM step plus tool call) runs from the end of
+    the previous one, or the start of the run, to the end of its tool call or the final answer.
+
+    Runs are forgotten on their end or error callback. LangChain skips the error callback for
+    some cancellations (a tool cancelled mid-call), so at most ``max_open_runs`` runs are kept
+    and the oldest are dropped without a span.
+    """
+
+    run_inline = True
+
+    def __init__(self, max_open_runs: int = MAX_OPEN_RUNS):
+        self.max_open_runs = max_open_runs
+        self._starts: Dict[UUID, tuple] = {}
+        self._iterations: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _track(self, runs: Dict[UUID, tuple], run_id: UUID, value: tuple):
+        """Store an open run, dropping the oldest past the limit; call with the lock held"""
+        runs[run_id] = value
+        while len(runs) > self.max_open_runs:
+            del runs[next(iter(runs))]
+
+    def _begin(self, run_id: UUID, name: str, **attributes: Any):
+        with self._lock:
+            self._track(self._starts, run_id, (name, time.perf_counter(), attributes))
+
+    def _end(self, run_id: UUID, **attributes: Any):
+        with self._lock:
+            started = self._starts.pop(run_id, None)
+        if started is not None:
+            name, start, begin_attributes = started
+            record_span(name, start, time.perf_counter() - start, **begin_attributes, **attributes)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *,
+                            run_id: UUID, **kwargs: Any):
+        self._begin(run_id, "llm", model=(kwargs.get("metadata") or {}).get("ls_model_name"))
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any):
+        self._begin(run_id, "llm", model=(kwargs.get("metadata") or {}).get("ls_model_name"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        stage_histograms.count_tokens(usage.get("prompt_tokens") or 0, usage.get("completion_tokens") or 0)
+        self._end(run_id, **{key: usage[key] for key in ("prompt_tokens", "completion_tokens") if key in usage})
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error=type(error).__name__)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any):
+        self._begin(run_id, f"tool:{(serialized or {}).get('name', 'unknown')}")
+
+    def _end_tool(self, run_id: UUID, parent_run_id: Optional[UUID], **attributes: Any):
+        with self._lock:
+            name = self._starts.get(run_id, ("tool:unknown",))[0]
+        self._end(run_id, **attributes)
+        if parent_run_id is not None:
+            self._step(parent_run_id, action=name.split(":", 1)[1])
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any):
+        self._end_tool(run_id, parent_run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, parent_run_id: Optional[UUID] = None,
+                      **kwargs: Any):
+        self._end_tool(run_id, parent_run_id, error=type(error).__name__)
+
+    def on_chain_start(self, serialized: Dict[str, Any], inputs: Dict[str, Any], *, run_id: UUID,
+                       parent_run_id: Optional[UUID] = None, **kwargs: Any):
+        if parent_run_id is None:
+            with self._lock:
+                self._track(self._iterations, run_id, (time.perf_counter(), 1))
+
+    def on_chain_end(self, outputs: Dict[str, Any], *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            self._iterations.pop(run_id, None)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            self._iterations.pop(run_id, None)
+
+    def _step(self, run_id: UUID, **attributes: Any):
+        now = time.perf_counter()
+        with self._lock:
+            started = self._iterations.get(run_id)
+            if started is None:
+                return
+            start, iteration = started
+            self._iterations[run_id] = (now, iteration + 1)
+        record_span("agent_iteration", start, now - start, iteration=iteration, **attributes)
+
+    def on_agent_finish(self, finish: AgentFinish, *, run_id: UUID, **kwargs: Any):
+        self._step(run_id, action="final_answer")
+
+
+timing_handler = TimingCallbackHandler()
@@ -0,0 +1,272 @@
+"""
+Vector Index Module
+FAISS index types (flat, IVF, HNSW, IVF-PQ) built, tuned and updated behind one spec
+"""
+
+import math
+import mmap
+import os
+import tempfile
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+
+# Stored vector encoding -> faiss factory code (float16/int8 are per-dimension scalar quantizers)
+VECTOR_DTYPES = {"float32": "Flat", "float16": "SQfp16", "int8": "SQ8"}
+
+# k-means wants about this many training points per centroid (faiss warns below 39)
+MIN_POINTS_PER_CENTROID = 39
+
+
+@dataclass
+class IndexSpec:
+    """FAISS index type with its build-time and query-time parameters
+
+    - flat: exact brute-force search (LangChain's default)
+    - ivf: ``nlist`` k-means cells, ``nprobe`` of them scanned per query
+    - hnsw: graph with ``hnsw_m`` links per node, ``ef_construction``/``ef_search`` beam widths
+    - ivfpq: IVF cells holding ``pq_m``-byte product-quantized codes (at 8 bits per sub-quantizer)
+
+    ``vector_dtype`` stores flat, IVF and HNSW vectors as float16 or int8 codes instead of float32.
+    """
+    index_type: str = "flat"
+    nlist: int = 0  # 0 picks 4 * sqrt(n)
+    nprobe: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    ef_search: int = 64
+    pq_m: int = 64
+    pq_nbits: int = 8
+    vector_dtype: str = "float32"
+
+    def __post_init__(self):
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index_type: {self.index_type}")
+        if self.vector_dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector_dtype: {self.vector_dtype}")
+
+    @property
+    def quantized(self) -> bool:
+        """Whether the index holds lossy codes rather than the float32 vectors"""
+        return self.index_type == "ivfpq" or self.vector_dtype != "float32"
+
+    def key(self) -> str:
+        """Build-time identity for snapshot keys; empty for float32 flat so existing snapshots stay valid"""
+        if self.index_type == "flat" and self.vector_dtype == "float32":
+            return ""
+        key = f"{self.index_type}:{self.nlist}:{self.hnsw_m}:{self.ef_construction}:{self.pq_m}:{self.pq_nbits}"
+        return key if self.vector_dtype == "float32" else f"{key}:{self.vector_dtype}"
+
+    def cells(self, n: int) -> int:
+        """IVF cell count for ``n`` training vectors"""
+        nlist = self.nlist or int(4 * math.sqrt(n))
+        return max(1, min(nlist, n // MIN_POINTS_PER_CENTROID))
+
+    def subquantizers(self, dimension: int) -> int:
+        """Largest divisor of ``dimension`` not above ``pq_m``"""
+        return max(m for m in range(1, min(self.pq_m, dimension) + 1) if dimension % m == 0)
+
+    def trainable(self, n: int) -> bool:
+        """Whether ``n`` vectors are enough to train this index type"""
+        if self.index_type == "ivf":
+            return n >= 2 * MIN_POINTS_PER_CENTROID
+        if self.index_type == "ivfpq":
+            return n >= MIN_POINTS_PER_CENTROID * 2 ** self.pq_nbits
+        return True
+
+    def factory_string(self, dimension: int, n: int) -> str:
+        """``faiss.index_factory`` description for ``n`` vectors of ``dimension``"""
+        encoding = VECTOR_DTYPES[self.vector_dtype]
+        if self.index_type == "ivf":
+            return f"IVF{self.cells(n)},{encoding}"
+        if self.index_type == "hnsw":
+            return f"HNSW{self.hnsw_m}" if self.vector_dtype == "float32" else f"HNSW{self.hnsw_m}_{encoding}"
+        if self.index_type == "ivfpq":
+            return f"IVF{self.cells(n)},PQ{self.subquantizers(dimension)}x{self.pq_nbits}"
+        return encoding
+
+
+class RerankedIndex:
+    """Quantized index whose ``k * factor`` nearest codes are re-scored against exact float32 vectors
+
+    ``vectors`` is indexed by FAISS id and is usually a read-only memory map of the snapshot's
+    ``vectors.npy``, so only the candidate rows of each query are paged in. Everything other
+    than ``search`` is delegated to the wrapped index.
+    """
+
+    def __init__(self, index: faiss.Index, vectors: np.ndarray, factor: int = 4):
+        self.index = index
+        self.vectors = vectors
+        self.factor = factor
+
+    def __getattr__(self, name):
+        if name == "index":
+            raise AttributeError(name)
+        return getattr(self.index, name)
+
+    def search(self, x: np.ndarray, k: int):
+        """Search with the ``faiss.Index.search`` contract: (scores, ids), -1 ids padding short rows"""
+        inner_product = self.index.metric_type == faiss.METRIC_INNER_PRODUCT
+        _, candidates = self.index.search(x, k * self.factor)
+        scores = np.full((len(x), k), -np.inf if inner_product else np.inf, dtype=np.float32)
+        ids = np.full((len(x), k), -1, dtype=np.int64)
+        for row, (query, found) in enumerate(zip(x, candidates)):
+            found = found[found >= 0]
+            if not len(found):
+                continue
+            exact = np.asarray(self.vectors[found], dtype=np.float32)
+            if inner_product:
+                found_scores = exact @ query
+                order = np.argsort(-found_scores, kind="stable")[:k]
+            else:
+                found_scores = ((exact - query) ** 2).sum(axis=1)
+                order = np.argsort(found_scores, kind="stable")[:k]
+            scores[row, :len(order)] = found_scores[order]
+            ids[row, :len(order)] = found[order]
+        return scores, ids
+
+    def updated(self, index: faiss.Index, index_to_docstore_id: Dict[int, str], updated_mapping: Dict[int, str],
+                vectors: Optional[np.ndarray], new_ids: List[str]) -> "RerankedIndex":
+        """Wrap the updated ``index`` with float32 rows re-laid-out to its FAISS ids"""
+        previous = {doc_id: i for i, doc_id in index_to_docstore_id.items()}
+        added = {doc_id: j for j, doc_id in enumerate(new_ids)}
+        # IVF ids are sparse after removals; the holes are never returned by the index
+        laid_out = np.zeros((max(updated_mapping, default=-1) + 1, self.index.d), dtype=np.float32)
+        old = [(i, previous[doc_id]) for i, doc_id in updated_mapping.items() if doc_id in previous]
+        new = [(i, added[doc_id]) for i, doc_id in updated_mapping.items() if doc_id not in previous]
+        if old:
+            targets, sources = map(np.array, zip(*old))
+            laid_out[targets] = self.vectors[sources]
+        if new:
+            targets, sources = map(np.array, zip(*new))
+            laid_out[targets] = vectors[sources]
+        return RerankedIndex(index, laid_out, self.factor)
+
+
+def read_index(path: str, index_type: str, memory_map: bool = True) -> faiss.Index:
+    """Read a saved index, mapping flat-code storage (flat, float16/int8, HNSW) zero-copy from the file
+
+    A mapped index lives in the page cache, so every process reading the same file shares one copy.
+    IVF lists are always read into memory: faiss cannot copy mapped lists for incremental updates.
+    """
+    memory_map = memory_map and index_type in ("flat", "hnsw")
+    return faiss.read_index(path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if memory_map else 0)
+
+
+def load_vectors(path: str, memory_map: bool = True) -> np.ndarray:
+    """Float32 re-rank rows saved with ``np.save``, memory-mapped read-only by default
+
+    Queries read a few scattered rows, so kernel readahead is turned off to keep RSS to the rows touched.
+    """
+    vectors = np.load(path, mmap_mode="r" if memory_map else None)
+    mapped = getattr(vectors, "_mmap", None)
+    if mapped is not None and hasattr(mmap, "MADV_RANDOM"):
+        mapped.madvise(mmap.MADV_RANDOM)
+    return vectors
+
+
+def unwrap(index) -> faiss.Index:
+    """Return the FAISS index behind a ``RerankedIndex`` (or ``index`` itself)"""
+    return index.index if isinstance(index, RerankedIndex) else index
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """Return the ``INDEX_TYPES`` name of a built index"""
+    index = faiss.downcast_index(unwrap(index))
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+
+def configure_search(index: faiss.Index, spec: IndexSpec):
+    """Apply ``spec``'s query-time parameters (nprobe, efSearch) to ``index``"""
+    index = faiss.downcast_index(unwrap(index))
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = spec.nprobe
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = spec.ef_search
+
+
+def new_index(vectors: np.ndarray, spec: IndexSpec, metric: int = faiss.METRIC_L2) -> faiss.Index:
+    """Create an empty index of ``spec``'s type, trained on ``vectors`` if the type needs training
+
+    Falls back to flat when there are too few vectors to train the requested type.
+    """
+    n, dimension = vectors.shape
+    if not spec.trainable(n):
+        print(f"⚠️ {n} vectors are too few to train a {spec.index_type} index; using flat")
+        spec = replace(spec, index_type="flat")
+    index = faiss.index_factory(dimension, spec.factory_string(dimension, n), metric)
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efConstruction = spec.ef_construction
+    if not index.is_trained:
+        index.train(vectors)
+    configure_search(index, spec)
+    return index
+
+
+def update_index(index: faiss.Index, index_to_docstore_id: Dict[int, str], deleted: set,
+                 vectors: Optional[np.ndarray], new_ids: List[str],
+                 spec: IndexSpec) -> Tuple[faiss.Index, Dict[int, str]]:
+    """Copy of ``index`` without the vectors of ``deleted`` docstore ids and with ``vectors`` added
+
+    Returns the new index and its FAISS id -> docstore id map. Flat indexes renumber on
+    removal, IVF indexes keep their ids (new vectors get fresh ones), and HNSW graphs,
+    which cannot delete, are rebuilt from their stored vectors. A ``RerankedIndex`` keeps
+    its float32 rows aligned with the new ids.
+    """
+    if isinstance(index, RerankedIndex):
+        updated, mapping = update_index(index.index, index_to_docstore_id, deleted, vectors, new_ids, spec)
+        return index.updated(updated, index_to_docstore_id, mapping, vectors, new_ids), mapping
+
+    kind = index_type_of(index)
+    removed = [i for i, doc_id in index_to_docstore_id.items() if doc_id in deleted]
+    kept = {i: doc_id for i, doc_id in sorted(index_to_docstore_id.items()) if doc_id not in deleted}
+
+    if kind == "hnsw" and removed:
+        stored = index.reconstruct_n(0, index.ntotal)
+        kept_vectors = stored[np.array(list(kept), dtype=np.int64)]
+        if vectors is not None:
+            kept_vectors = np.vstack([kept_vectors, vectors])
+        rebuilt = new_index(kept_vectors, replace(spec, index_type="hnsw"), index.metric_type)
+        rebuilt.add(kept_vectors)
+        return rebuilt, dict(enumerate(list(kept.values()) + new_ids))
+
+    # Concurrent searches keep using the old index object until the caller swaps this one in. A
+    # serialized round trip, unlike clone_index, gives memory-mapped storage an owned, writable copy
+    index = faiss.deserialize_index(faiss.serialize_index(index))
+    configure_search(index, spec)
+    if removed:
+        index.remove_ids(np.array(removed, dtype=np.int64))
+    if kind in ("ivf", "ivfpq"):
+        if vectors is not None:
+            start = max(index_to_docstore_id, default=-1) + 1
+            ids = np.arange(start, start + len(vectors), dtype=np.int64)
+            index.add_with_ids(vectors, ids)
+            kept.update(zip(ids.tolist(), new_ids))
+        return index, kept
+    if vectors is not None:
+        index.add(vectors)
+    return index, dict(enumerate(list(kept.values()) + new_ids))
+
+
+def index_size_bytes(index: faiss.Index) -> int:
+    """Measure the serialized size of ``index``, a close proxy for its memory footprint
+
+    Excludes a ``RerankedIndex``'s float32 rows, which are memory-mapped from disk.
+    """
+    fd, path = tempfile.mkstemp(suffix=".faiss")
+    os.close(fd)
+    try:
+        faiss.write_index(unwrap(index), path)
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)